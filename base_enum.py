@@ -8,7 +8,18 @@ class BaseEnum(Enum):
         has issues when classes are imported from two different locations
 
         As such we define equality to work on a string comparison instead.
+        Members are almost always compared with members of the same class,
+        so identity is checked first and the string comparison is only the fallback.
         """
+        if self is __value:
+            return True
         if self.__class__.__name__ == __value.__class__.__name__:
             return self.value == __value.value
         return False
+
+    def __hash__(self) -> int:
+        """
+        Consistent with __eq__: members equal by class name and value hash the same,
+        so members can be used as dict keys and in sets.
+        """
+        return hash((self.__class__.__name__, self.value))
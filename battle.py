@@ -1,11 +1,13 @@
 from __future__ import annotations
 from enum import auto
-from typing import Optional
+from typing import Callable, Iterator, Optional
 import math
 
 from base_enum import BaseEnum
 from team import MonsterTeam
-from elements import EffectivenessCalculator
+from elements import EffectivenessCalculator, Element
+from battle_cache import BattleCache, CachedOutcome
+from battle_events import BattleEvent, EventKind
 from data_structures.referential_array import ArrayR
 
 
@@ -21,13 +23,66 @@ class Battle:
         TEAM2 = auto()
         DRAW = auto()
 
-    def __init__(self, verbosity=0) -> None:
+    def __init__(self, verbosity=0, cache: Optional[BattleCache] = None) -> None:
         """
 
+        :param cache: An optional cache of outcomes for battles between deterministic teams
         :complexity: O(1) both best/worst case
         """
         self.verbosity = verbosity
         self.result = None
+        self.cache = cache
+        self.listeners = []
+        self.turn_number = 0
+
+    def subscribe(self, listener: Callable[[BattleEvent], None]) -> None:
+        """
+        Registers a function to be called with every event of every following battle.
+        While no listener is subscribed, no events are built.
+
+        :complexity: O(1)
+        """
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[BattleEvent], None]) -> None:
+        """
+        Stops sending events to a listener.
+
+        :complexity: O(l) where l is the number of listeners
+        """
+        self.listeners.remove(listener)
+
+    def emit(self, kind: EventKind, team: int = 0, **data) -> None:
+        """
+        Sends an event to every listener. Callers should check self.listeners first
+        so no event is built when nobody is listening.
+
+        :complexity: O(l) where l is the number of listeners
+        """
+        event = BattleEvent(kind, self.turn_number, team, data)
+        for listener in self.listeners:
+            listener(event)
+
+    def perform_attack(self, attacker, defender, attacker_team: int) -> None:
+        """
+        Makes one monster attack another, emitting an ATTACK event if anyone is listening.
+
+        :complexity: O(l * e) where l is the number of letters in the longest element name and
+        e is the number of elements
+        """
+        if not self.listeners:
+            attacker.attack(defender)
+            return
+        hp_before = defender.get_hp()
+        attacker.attack(defender)
+        multiplier = EffectivenessCalculator.get_effectiveness(
+            Element.from_string(attacker.get_element()), Element.from_string(defender.get_element())
+        )
+        self.emit(
+            EventKind.ATTACK, attacker_team,
+            attacker=attacker.get_name(), defender=defender.get_name(),
+            damage=hp_before - defender.get_hp(), multiplier=multiplier, hp=defender.get_hp(),
+        )
 
     def process_turn(self) -> Optional[Battle.Result]:
         """
@@ -58,53 +113,68 @@ class Battle:
 
         """
 
-        if self.team1.choose_action(self.out1, self.out2) == self.Action.SPECIAL:
+        action = self.team1.choose_action(self.out1, self.out2)
+        if self.listeners:
+            self.emit(EventKind.ACTION, 1, action=action.name)
+        if action == self.Action.SPECIAL:
             self.team1.special()
-        elif self.team1.choose_action(self.out1, self.out2) == self.Action.SWAP:
+            if self.listeners:
+                self.emit(EventKind.SPECIAL, 1)
+        elif action == self.Action.SWAP:
             temp = self.out1
             self.out1 = self.team1.retrieve_from_team()
             self.team1.add_to_team(temp)
-        if self.team2.choose_action(self.out2, self.out1) == self.Action.SPECIAL:
+            if self.listeners:
+                self.emit(EventKind.SWAP, 1, out=temp.get_name(), into=self.out1.get_name())
+
+        action = self.team2.choose_action(self.out2, self.out1)
+        if self.listeners:
+            self.emit(EventKind.ACTION, 2, action=action.name)
+        if action == self.Action.SPECIAL:
             self.team2.special()
-        elif self.team2.choose_action(self.out2, self.out1) == self.Action.SWAP:
+            if self.listeners:
+                self.emit(EventKind.SPECIAL, 2)
+        elif action == self.Action.SWAP:
             temp = self.out2
             self.out2 = self.team2.retrieve_from_team()
             self.team2.add_to_team(temp)
+            if self.listeners:
+                self.emit(EventKind.SWAP, 2, out=temp.get_name(), into=self.out2.get_name())
 
         #We save the monster so we can check process the attack on the monster that been attacked instead of the present monster alive
         monster1 = self.out1
         monster2 = self.out2
         if self.team1.choose_action(self.out1, self.out2) == self.Action.ATTACK and self.team2.choose_action(self.out2, self.out1) == self.Action.ATTACK:
             if monster1.get_speed () > monster2.get_speed():
-                monster1.attack(monster2)
+                self.perform_attack(monster1, monster2, 1)
                 self.process_post_attack(monster2, self.team2, 2, monster1)
 
                 #It cant retaliate if it just died
                 if monster2.alive():
-                    monster2.attack(monster1)
+                    self.perform_attack(monster2, monster1, 2)
                     self.process_post_attack(monster1, self.team1, 1, monster2)
                 
             elif monster1.get_speed () < monster2.get_speed():
-                monster2.attack(monster1)
+                self.perform_attack(monster2, monster1, 2)
                 self.process_post_attack(monster1, self.team1, 1, monster2)
                 
                 if monster1.alive():
-                    monster1.attack(monster2)
+                    self.perform_attack(monster1, monster2, 1)
                     self.process_post_attack(monster2, self.team2, 2, monster1)
                     
             else: #The equal logic will not be able to follow the structure in process_post_attack() due to this being the only way for a draw to occur
-                monster1.attack(monster2)
-                monster2.attack(monster1)
+                self.perform_attack(monster1, monster2, 1)
+                self.perform_attack(monster2, monster1, 2)
 
                 self.process_post_attack(monster1, self.team1, 1, monster2, True)
                 self.process_post_attack(monster2, self.team2, 2, monster1, True)
                 
         elif self.team2.choose_action(monster2, monster1) == self.Action.ATTACK:
-            monster2.attack(monster1)
+            self.perform_attack(monster2, monster1, 2)
             self.process_post_attack(monster1, self.team1, 1, monster2)
             
         elif self.team1.choose_action(monster1, monster2) == self.Action.ATTACK:
-            monster1.attack(monster2)
+            self.perform_attack(monster1, monster2, 1)
             self.process_post_attack(monster2, self.team2, 2, monster1)
 
         if monster1.alive() and monster2.alive(): #If neither monster dies, we must decrement their health by 1
@@ -138,6 +208,8 @@ class Battle:
         :complexity: O(1) 
         """
         if attacked_monster.get_hp() <= 0:   
+            if self.listeners:
+                self.emit(EventKind.FAINT, team_num, monster=attacked_monster.get_name())
             if team.team.is_empty():
                 if self.result:
                     self.result = self.Result.DRAW
@@ -155,6 +227,8 @@ class Battle:
 
             if attacking_monster.get_hp():
                 attacking_monster.level_up()
+                if self.listeners:
+                    self.emit(EventKind.LEVEL_UP, 3 - team_num, monster=attacking_monster.get_name(), level=attacking_monster.get_level())
                 if attacking_monster.ready_to_evolve():
                     if not use_draw_logic:
                         if team_num == 1:
@@ -166,6 +240,9 @@ class Battle:
                             self.out2 = attacking_monster.evolve() 
                         elif team_num == 2 and  attacking_monster.get_hp(): 
                             self.out1 = attacking_monster.evolve()
+                    if self.listeners and (not use_draw_logic or attacking_monster.get_hp()):
+                        evolved = self.out2 if team_num == 1 else self.out1
+                        self.emit(EventKind.EVOLVE, 3 - team_num, monster=attacking_monster.get_name(), into=evolved.get_name())
 
     def battle(self, team1: MonsterTeam, team2: MonsterTeam) -> Battle.Result:
         """
@@ -176,6 +253,9 @@ class Battle:
         
         :returns: A result indicating the outcome of the battle
 
+        When the outcome comes from the cache, the battle is not played, but the teams,
+        out1 and out2 are left exactly as the cached battle left them, evolutions included.
+
         :complexity: 
             Best case: O(n) 
             Worst case: O(m) 
@@ -184,19 +264,80 @@ class Battle:
             m is the total health of the monsters on the team with the least total health. This will occur when no attacks are chosen.
         """
         
+        self.begin(team1, team2)
+        while self.result is None:
+            if self.verbosity > 1:
+                print(self.out1, self.out2)
+            self.process_turn()
+            self.turn_number += 1
+        return self.finish()
+
+    def stream(self, team1: MonsterTeam, team2: MonsterTeam) -> Iterator[BattleEvent]:
+        """
+        Simulates a battle between two monster teams, yielding its events turn by turn.
+        The result is available in self.result once the generator is exhausted.
+
+        :complexity: Same as battle()
+        """
+        buffer = []
+        self.subscribe(buffer.append)
+        try:
+            self.begin(team1, team2)
+            while self.result is None:
+                self.process_turn()
+                self.turn_number += 1
+                yield from buffer
+                buffer.clear()
+            self.finish()
+            yield from buffer
+        finally:
+            self.unsubscribe(buffer.append)
+
+    def begin(self, team1: MonsterTeam, team2: MonsterTeam) -> None:
+        """
+        Pregame logic: sends out the first monster of each team, or looks up the
+        whole battle in the cache, in which case self.result is already set.
+        While listeners are subscribed the cache is only written to, never read,
+        so they see every event of the battle.
+
+        :complexity: O(n + m) where n and m are the sizes of the teams
+        """
         EffectivenessCalculator.make_singleton()
         if self.verbosity > 0:
             print(f"Team 1: {team1} vs. Team 2: {team2}")
         # Add any pregame logic here.
+        self.result = None
         self.turn_number = 0
         self.team1 = team1
         self.team2 = team2
+
+        self.cache_key = None
+        if self.cache is not None:
+            self.cache_key, self.cache_tracked = self.cache.prepare(team1, team2)
+            outcome = None
+            if self.cache_key is not None and not self.listeners:
+                outcome = self.cache.get(self.cache_key)
+            if outcome is not None:
+                # The teams and monsters out are left as the cached battle left them.
+                outcome.apply(self.cache_tracked, self)
+                self.cache_key = None
+                self.turn_number = outcome.turns
+                self.result = outcome.result
+                return
+
         self.out1 = team1.retrieve_from_team()
         self.out2 = team2.retrieve_from_team()
-        while self.result is None:
-            print(self.out1, self.out2)            
-            self.process_turn()
-       
+
+    def finish(self) -> Battle.Result:
+        """
+        Postgame logic: caches the outcome and reports the result.
+
+        :complexity: O(n + m) where n and m are the sizes of the teams
+        """
+        if self.cache_key is not None:
+            self.cache.put(self.cache_key, CachedOutcome.record(self, self.cache_tracked))
+        if self.listeners:
+            self.emit(EventKind.RESULT, result=self.result.name, turns=self.turn_number)
         return self.result
 
 
@@ -0,0 +1,271 @@
+"""
+Memoized battle outcomes.
+
+Battle towers replay the same enemy teams against the same player team many
+times. When both teams use a deterministic policy the outcome of a battle is
+fully determined by the teams' starting states, so it can be looked up instead
+of simulated.
+
+Usage:
+```
+cache = BattleCache(maxsize=4096)
+battle = Battle(cache=cache)
+battle.battle(team1, team2)   # simulated
+...
+battle.battle(team1, team2)   # same starting state: returned from the cache
+print(cache.hits, cache.misses)
+```
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, TYPE_CHECKING
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from battle import Battle
+    from monster_base import MonsterBase
+    from team import MonsterTeam
+
+
+def deterministic_policy(func: Callable) -> Callable:
+    """
+    Marks a choose_action policy as deterministic, i.e. its choice only depends on
+    the state of the monsters and the team. Only battles between teams using
+    deterministic policies are cached.
+    """
+    func.__deterministic__ = True
+    return func
+
+
+def monster_ref(monster: MonsterBase | None, index_of: dict) -> tuple | None:
+    """
+    How a cached outcome refers to a monster left after the battle: ("tracked", i) for the
+    i-th tracked monster, or ("new", class, simple mode, initial level, level, hp) for one
+    created during the battle, i.e. an evolution.
+
+    :complexity: O(1)
+    """
+    if monster is None:
+        return None
+    i = index_of.get(id(monster))
+    if i is not None:
+        return ("tracked", i)
+    return ("new", type(monster), monster.simple_mode, monster.init_level, monster.curr_level, monster.get_hp())
+
+
+def resolve_ref(ref: tuple | None, tracked: ArrayR[MonsterBase]) -> MonsterBase | None:
+    """
+    The monster a monster_ref() refers to in a new battle, creating evolutions afresh.
+
+    :complexity: O(1)
+    """
+    if ref is None:
+        return None
+    if ref[0] == "tracked":
+        return tracked[ref[1]]
+    _, cls, simple_mode, init_level, level, hp = ref
+    monster = cls(simple_mode, init_level)
+    monster.curr_level = level
+    monster.set_hp(hp)
+    return monster
+
+
+class CachedOutcome:
+    """
+    What a battle did to the teams that took part in it.
+
+    Attributes:
+        result (Battle.Result): the result of the battle
+        turns (int): the number of turns the battle took
+        final_states (ArrayR[tuple[int, int]]): level and hp of each tracked monster after the battle
+        teams (tuple): for each team, refs to the monsters left in it in retrieval order,
+            and for OPTIMISE teams their keys and the descending flag
+        outs (tuple): refs to the monsters out on each side when the battle ended
+    """
+
+    def __init__(self, result: Battle.Result, turns: int, final_states: ArrayR[tuple[int, int]],
+                 teams: tuple = (None, None), outs: tuple = (None, None)) -> None:
+        self.result = result
+        self.turns = turns
+        self.final_states = final_states
+        self.teams = teams
+        self.outs = outs
+
+    @classmethod
+    def record(cls, battle: Battle, tracked: ArrayR[MonsterBase]) -> CachedOutcome:
+        """
+        Records the outcome of a battle that has just been simulated.
+
+        :complexity: O(n) where n is the number of tracked monsters
+        """
+        final_states = ArrayR(len(tracked))
+        index_of = {}
+        for i in range(len(tracked)):
+            final_states[i] = (tracked[i].curr_level, tracked[i].get_hp())
+            index_of[id(tracked[i])] = i
+        teams = (cls.team_state(battle.team1, index_of), cls.team_state(battle.team2, index_of))
+        outs = (monster_ref(battle.out1, index_of), monster_ref(battle.out2, index_of))
+        return cls(battle.result, battle.turn_number, final_states, teams, outs)
+
+    @staticmethod
+    def team_state(team: MonsterTeam, index_of: dict) -> tuple:
+        """
+        :complexity: O(n) where n is the number of monsters in the team
+        """
+        monsters = team.monsters_in_order()
+        refs = tuple(monster_ref(monsters[i], index_of) for i in range(len(monsters)))
+        if team.team_mode == team.TeamMode.OPTIMISE:
+            return refs, tuple(team.team.key_at(i) for i in range(len(monsters))), team.descending
+        return refs, None, None
+
+    @staticmethod
+    def restore_team(team: MonsterTeam, state: tuple, tracked: ArrayR[MonsterBase]) -> None:
+        """
+        Refills a team with the monsters it was left with, in the same order.
+
+        :complexity: O(n) where n is the number of monsters in the team
+        """
+        refs, keys, descending = state
+        team.backend.reset()
+        if keys is not None:
+            # Append in order so monsters with equal keys keep their order.
+            for ref, key in zip(refs, keys):
+                team.team.append_sorted(resolve_ref(ref, tracked), key)
+            team.descending = descending
+        elif team.team_mode == team.TeamMode.FRONT:
+            for ref in reversed(refs):
+                team.add_to_team(resolve_ref(ref, tracked))
+        else:
+            for ref in refs:
+                team.add_to_team(resolve_ref(ref, tracked))
+
+    def apply(self, tracked: ArrayR[MonsterBase], battle: Battle) -> None:
+        """
+        Puts a new battle in the state the cached battle ended in: the level ups and damage,
+        what is left in each team, and the monsters out, evolved ones included.
+
+        :complexity: O(n) where n is the number of tracked monsters
+        """
+        for i in range(len(tracked)):
+            level, hp = self.final_states[i]
+            tracked[i].curr_level = level
+            tracked[i].set_hp(hp)
+        self.restore_team(battle.team1, self.teams[0], tracked)
+        self.restore_team(battle.team2, self.teams[1], tracked)
+        battle.out1 = resolve_ref(self.outs[0], tracked)
+        battle.out2 = resolve_ref(self.outs[1], tracked)
+
+
+class BattleCache:
+    """
+    LRU cache of battle outcomes keyed by the canonical starting state of both teams.
+
+    The key of a team is made from its class, mode, sort key and direction, policy,
+    and the class, stats mode, levels and hp of every monster in retrieval order.
+    Battles where either team's policy is not marked with @deterministic_policy bypass the cache.
+
+    Attributes:
+        maxsize (int): the maximum number of outcomes kept
+        hits (int): lookups answered from the cache
+        misses (int): lookups that had to be simulated
+        bypasses (int): battles that could not be cached
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        """
+        :complexity: O(1)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize should be at least 1.")
+        self.maxsize = maxsize
+        self.entries: OrderedDict[tuple, CachedOutcome] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def team_key(team: MonsterTeam, monsters: ArrayR[MonsterBase]) -> tuple | None:
+        """
+        Canonical key for a team about to start a battle.
+
+        :param monsters: The team's monsters in retrieval order
+        :returns: The key, or None if the team's policy is not deterministic
+        :complexity: O(n) where n is the number of monsters in the team
+        """
+        policy = team.choose_action
+        if not getattr(policy, "__deterministic__", False):
+            return None
+        policy = getattr(policy, "__func__", policy)
+
+        if team.team_mode == team.TeamMode.OPTIMISE:
+            ordering = (team.sort_mode.value, team.descending)
+        else:
+            ordering = None
+
+        states = []
+        for i in range(len(monsters)):
+            monster = monsters[i]
+            states.append((type(monster), monster.simple_mode, monster.init_level, monster.curr_level, monster.get_hp()))
+        return (type(team), team.team_mode.value, ordering, policy, tuple(states))
+
+    def prepare(self, team1: MonsterTeam, team2: MonsterTeam) -> tuple[tuple | None, ArrayR[MonsterBase]]:
+        """
+        Works out the cache key of a battle and the monsters whose state it depends on.
+
+        :returns: The key (None if the battle cannot be cached) and the tracked monsters
+        :complexity: O(n + m) where n and m are the sizes of the teams
+        """
+        monsters1 = team1.monsters_in_order()
+        monsters2 = team2.monsters_in_order()
+        tracked = ArrayR(len(monsters1) + len(monsters2))
+        for i in range(len(monsters1)):
+            tracked[i] = monsters1[i]
+        for i in range(len(monsters2)):
+            tracked[len(monsters1) + i] = monsters2[i]
+
+        key1 = self.team_key(team1, monsters1)
+        key2 = self.team_key(team2, monsters2)
+        if key1 is None or key2 is None:
+            self.bypasses += 1
+            return None, tracked
+        return (key1, key2), tracked
+
+    def get(self, key: tuple) -> CachedOutcome | None:
+        """
+        Looks up an outcome, marking it as most recently used.
+
+        :complexity: O(1) amortised
+        """
+        outcome = self.entries.get(key)
+        if outcome is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return outcome
+
+    def put(self, key: tuple, outcome: CachedOutcome) -> None:
+        """
+        Stores an outcome, evicting the least recently used one if the cache is full.
+
+        :complexity: O(1) amortised
+        """
+        self.entries[key] = outcome
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Removes all outcomes and resets the counters."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def __str__(self) -> str:
+        return f"BattleCache({len(self)}/{self.maxsize} entries, {self.hits} hits, {self.misses} misses, {self.bypasses} bypasses)"
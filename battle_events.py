@@ -0,0 +1,244 @@
+"""
+Structured battle events, and a compact log that can be replayed.
+
+A Battle emits a BattleEvent to every subscribed listener when an action is
+chosen, a monster attacks, faints, levels up or evolves, a team swaps or uses
+its special, and when the battle ends. Nothing is built while no listener is
+subscribed.
+
+BattleLogWriter records a battle as JSON lines: a header with the RandomGen seed
+and both starting lineups, then one line per event. replay_battle() rebuilds the
+teams from the header, reruns the battle and checks it produces the same events.
+
+Usage:
+```
+with open("battle.jsonl", "w") as f:
+    record_battle(Battle(), team1, team2, f, seed=1234)
+with open("battle.jsonl") as f:
+    result = replay_battle(f)
+```
+"""
+from __future__ import annotations
+
+import json
+from enum import auto
+from typing import IO, TYPE_CHECKING
+
+from base_enum import BaseEnum
+from random_gen import RandomGen
+
+if TYPE_CHECKING:
+    from battle import Battle
+    from team import MonsterTeam
+
+
+class EventKind(BaseEnum):
+
+    ACTION = auto()
+    ATTACK = auto()
+    FAINT = auto()
+    LEVEL_UP = auto()
+    EVOLVE = auto()
+    SWAP = auto()
+    SPECIAL = auto()
+    RESULT = auto()
+
+
+class BattleEvent:
+    """
+    Something that happened during a battle.
+
+    Attributes:
+        kind (EventKind): what happened
+        turn (int): the turn it happened on, starting from 0
+        team (int): the team it happened to (1 or 2), 0 for the whole battle
+        data (dict): details of the event, e.g. damage and multiplier for an attack
+    """
+
+    def __init__(self, kind: EventKind, turn: int, team: int, data: dict) -> None:
+        self.kind = kind
+        self.turn = turn
+        self.team = team
+        self.data = data
+
+    def to_dict(self) -> dict:
+        """
+        A JSON-friendly representation of the event.
+
+        :complexity: O(d) where d is the number of details
+        """
+        event = {"k": self.kind.name.lower(), "t": self.turn, "team": self.team}
+        event.update(self.data)
+        return event
+
+    @classmethod
+    def from_dict(cls, event: dict) -> BattleEvent:
+        """
+        Rebuilds an event from to_dict()
+
+        :complexity: O(d) where d is the number of details
+        """
+        data = dict(event)
+        kind = EventKind[data.pop("k").upper()]
+        turn = data.pop("t")
+        team = data.pop("team")
+        return cls(kind, turn, team, data)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, BattleEvent) and self.to_dict() == other.to_dict()
+
+    def __str__(self) -> str:
+        details = ", ".join(f"{key}={value}" for key, value in self.data.items())
+        return f"Turn {self.turn} team {self.team} {self.kind.name}({details})"
+
+
+def team_spec(team: MonsterTeam) -> dict:
+    """
+    Describes a team's mode and monsters (in retrieval order) as plain data.
+
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    monsters = team.monsters_in_order()
+    spec = {"mode": team.team_mode.name, "monsters": []}
+    optimise = team.team_mode == team.TeamMode.OPTIMISE
+    if optimise:
+        spec["sort"] = team.sort_mode.name
+        spec["descending"] = team.descending
+    for i in range(len(monsters)):
+        monster = monsters[i]
+        entry = [monster.get_name(), monster.simple_mode, monster.init_level, monster.curr_level, monster.get_hp()]
+        if optimise:
+            entry.append(team.team.key_at(i))
+        spec["monsters"].append(entry)
+    return spec
+
+
+def team_from_spec(spec: dict) -> MonsterTeam:
+    """
+    Builds a live team from team_spec(), with its monsters in the same order.
+
+    :raises ValueError: if a monster is not defined in monsters.yaml
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    from team import MonsterTeam
+    from helpers import get_all_monsters
+    from data_structures.referential_array import ArrayR
+
+    classes = {}
+    all_monsters = get_all_monsters()
+    for i in range(len(all_monsters)):
+        classes[all_monsters[i].get_name()] = all_monsters[i]
+
+    team_mode = MonsterTeam.TeamMode[spec["mode"]]
+    sort_key = MonsterTeam.SortMode[spec["sort"]] if "sort" in spec else None
+    team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR(0), sort_key=sort_key)
+
+    monsters = ArrayR(len(spec["monsters"]))
+    for i, entry in enumerate(spec["monsters"]):
+        if entry[0] not in classes:
+            raise ValueError(f"{entry[0]} is not a monster defined in monsters.yaml")
+        monster = classes[entry[0]](entry[1], entry[2])
+        monster.curr_level = entry[3]
+        monster.set_hp(entry[4])
+        monsters[i] = monster
+
+    if team_mode == MonsterTeam.TeamMode.OPTIMISE:
+        # Append in order so monsters with equal keys keep their order.
+        team.descending = spec["descending"]
+        for i, entry in enumerate(spec["monsters"]):
+            team.team.append_sorted(monsters[i], entry[5])
+    elif team_mode == MonsterTeam.TeamMode.FRONT:
+        for i in range(len(monsters) - 1, -1, -1):
+            team.add_to_team(monsters[i])
+    else:
+        for i in range(len(monsters)):
+            team.add_to_team(monsters[i])
+    for i in range(len(monsters)):
+        team.monsters.append(monsters[i])
+    return team
+
+
+class BattleLogWriter:
+    """
+    Battle listener writing one compact JSON line per event.
+
+    Attributes:
+        stream (IO[str]): where the log is written
+    """
+
+    SEPARATORS = (",", ":")
+
+    def __init__(self, stream: IO[str], seed: int, team1: MonsterTeam, team2: MonsterTeam) -> None:
+        """
+        Writes the log header. Must be created before the battle starts, while the
+        teams still hold their starting lineups.
+
+        :complexity: O(n + m) where n and m are the sizes of the teams
+        """
+        self.stream = stream
+        header = {"seed": seed, "team1": team_spec(team1), "team2": team_spec(team2)}
+        self.stream.write(json.dumps(header, separators=self.SEPARATORS) + "\n")
+
+    def __call__(self, event: BattleEvent) -> None:
+        self.stream.write(json.dumps(event.to_dict(), separators=self.SEPARATORS) + "\n")
+
+
+def record_battle(battle: Battle, team1: MonsterTeam, team2: MonsterTeam, stream: IO[str], seed: int) -> Battle.Result:
+    """
+    Seeds RandomGen, then runs a battle while writing its log to stream.
+
+    :complexity: Same as Battle.battle
+    """
+    RandomGen.set_seed(seed)
+    writer = BattleLogWriter(stream, seed, team1, team2)
+    battle.subscribe(writer)
+    try:
+        return battle.battle(team1, team2)
+    finally:
+        battle.unsubscribe(writer)
+
+
+def read_log(stream: IO[str]) -> tuple[dict, list[BattleEvent]]:
+    """
+    Reads a log written by BattleLogWriter.
+
+    :returns: The header and the events of the battle
+    :complexity: O(v) where v is the number of events
+    """
+    header = json.loads(stream.readline())
+    events = []
+    for line in stream:
+        if line.strip():
+            events.append(BattleEvent.from_dict(json.loads(line)))
+    return header, events
+
+
+def replay_battle(stream: IO[str], battle: Battle | None = None) -> Battle.Result:
+    """
+    Reruns a logged battle from its seed and starting lineups.
+
+    :raises ValueError: if the rerun battle does not produce the logged events
+    :returns: The result of the battle
+    :complexity: Same as Battle.battle, plus O(v) to compare the v events
+    """
+    from battle import Battle
+
+    header, expected = read_log(stream)
+    battle = battle or Battle(verbosity=0)
+    RandomGen.set_seed(header["seed"])
+    team1 = team_from_spec(header["team1"])
+    team2 = team_from_spec(header["team2"])
+
+    got = []
+    battle.subscribe(got.append)
+    try:
+        result = battle.battle(team1, team2)
+    finally:
+        battle.unsubscribe(got.append)
+
+    for i in range(min(len(got), len(expected))):
+        if got[i] != expected[i]:
+            raise ValueError(f"Replay diverged at event {i}: expected {expected[i]}, got {got[i]}")
+    if len(got) != len(expected):
+        raise ValueError(f"Replay produced {len(got)} events, the log has {len(expected)}")
+    return result
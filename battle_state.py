@@ -0,0 +1,183 @@
+"""
+Canonical, compact encoding of a battle in progress.
+
+The state of a battle between turns is spread over Battle.out1/out2, the team
+ADTs and the monster objects. encode_battle() packs it into a few dozen bytes:
+for each side, the monster out and the monsters waiting in retrieval order
+(class id, stats mode, level, initial level, hp), the team mode and, for
+OPTIMISE teams, the sort mode, the descending flag and each monster's key.
+Waiting monsters are always written from the team's cursor, so two battles in
+the same state encode to the same bytes whatever the internal array layout.
+The bytes are hashable, so they can key caches and transposition tables.
+
+decode_battle() rebuilds a live Battle, with fresh teams and monsters, that
+continues exactly as the encoded one would have.
+
+Usage:
+```
+state = encode_battle(battle)
+copy = decode_battle(state)
+while copy.result is None:
+    copy.process_turn()
+```
+"""
+from __future__ import annotations
+
+import struct
+
+from battle import Battle
+from team import MonsterTeam
+from helpers import get_all_monsters
+
+from data_structures.referential_array import ArrayR
+
+VERSION = 1
+# version, result value (0 while the battle is on)
+HEADER = struct.Struct("<BB")
+# class id + 1 (0 for no monster), simple mode, level, initial level, hp
+MONSTER = struct.Struct("<B?HHi")
+NO_MONSTER = MONSTER.pack(0, False, 0, 0, 0)
+# mode, sort mode (0 for none), descending, number of waiting monsters
+TEAM = struct.Struct("<BBBB")
+KEY = struct.Struct("<i")
+
+_class_ids = None
+
+
+def class_ids() -> dict:
+    """
+    Id of every monster class, its index in get_all_monsters().
+
+    :complexity: O(m) the first time, where m is the number of monsters, O(1) after
+    """
+    global _class_ids
+    if _class_ids is None:
+        all_monsters = get_all_monsters()
+        _class_ids = {all_monsters[i]: i for i in range(len(all_monsters))}
+    return _class_ids
+
+
+def encode_monster(monster, ids: dict) -> bytes:
+    """
+    :raises ValueError: if the monster's class is not defined in monsters.yaml
+    :complexity: O(1)
+    """
+    if monster is None:
+        return NO_MONSTER
+    class_id = ids.get(type(monster))
+    if class_id is None:
+        raise ValueError(f"{type(monster).__name__} is not a monster defined in monsters.yaml")
+    return MONSTER.pack(class_id + 1, monster.simple_mode, monster.curr_level, monster.init_level, monster.get_hp())
+
+
+def decode_monster(data: bytes, pos: int):
+    """
+    :complexity: O(1)
+    """
+    class_id, simple_mode, level, init_level, hp = MONSTER.unpack_from(data, pos)
+    if class_id == 0:
+        return None
+    monster = get_all_monsters()[class_id - 1](simple_mode, init_level)
+    monster.curr_level = level
+    monster.set_hp(hp)
+    return monster
+
+
+def encode_team(team: MonsterTeam) -> bytes:
+    """
+    Encodes the monsters waiting in a team, in retrieval order.
+
+    :raises ValueError: if a monster's class is not defined in monsters.yaml
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    ids = class_ids()
+    monsters = team.monsters_in_order()
+    optimise = team.team_mode == MonsterTeam.TeamMode.OPTIMISE
+    if optimise:
+        sort_mode = team.sort_mode.value if team.sort_mode is not None else 0
+        parts = [TEAM.pack(team.team_mode.value, sort_mode, team.descending, len(monsters))]
+        for i in range(len(monsters)):
+            parts.append(encode_monster(monsters[i], ids))
+            parts.append(KEY.pack(team.team.key_at(i)))
+    else:
+        parts = [TEAM.pack(team.team_mode.value, 0, False, len(monsters))]
+        for i in range(len(monsters)):
+            parts.append(encode_monster(monsters[i], ids))
+    return b"".join(parts)
+
+
+def decode_team(data: bytes, pos: int = 0) -> tuple[MonsterTeam, int]:
+    """
+    Rebuilds a team from encode_team(), with new monster instances.
+
+    :returns: The team and the position just after it in data
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    mode, sort_mode, descending, n = TEAM.unpack_from(data, pos)
+    pos += TEAM.size
+    team_mode = MonsterTeam.TeamMode(mode)
+    sort_key = MonsterTeam.SortMode(sort_mode) if sort_mode else None
+    team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR(0), sort_key=sort_key)
+
+    monsters = ArrayR(n)
+    for i in range(n):
+        monsters[i] = decode_monster(data, pos)
+        pos += MONSTER.size
+        if team_mode == MonsterTeam.TeamMode.OPTIMISE:
+            # Append in order so monsters with equal keys keep their order.
+            team.team.append_sorted(monsters[i], KEY.unpack_from(data, pos)[0])
+            pos += KEY.size
+    if team_mode == MonsterTeam.TeamMode.OPTIMISE:
+        team.descending = bool(descending)
+    elif team_mode == MonsterTeam.TeamMode.FRONT:
+        for i in range(n - 1, -1, -1):
+            team.add_to_team(monsters[i])
+    else:
+        for i in range(n):
+            team.add_to_team(monsters[i])
+    return team, pos
+
+
+def encode_battle(battle: Battle) -> bytes:
+    """
+    Encodes a battle between turns.
+
+    :raises ValueError: if a monster's class is not defined in monsters.yaml
+    :complexity: O(n + m) where n and m are the sizes of the teams
+    """
+    ids = class_ids()
+    result = battle.result.value if battle.result is not None else 0
+    return b"".join((
+        HEADER.pack(VERSION, result),
+        encode_monster(battle.out1, ids),
+        encode_monster(battle.out2, ids),
+        encode_team(battle.team1),
+        encode_team(battle.team2),
+    ))
+
+
+def decode_battle(data: bytes, battle: Battle | None = None) -> Battle:
+    """
+    Rebuilds a battle from encode_battle(), ready for its next process_turn().
+    The teams' revival rosters are not part of the state, so they are left empty.
+
+    :param battle: The Battle to load the state into, a new one by default
+    :raises ValueError: if the data is from another version
+    :complexity: O(n + m) where n and m are the sizes of the teams
+    """
+    version, result = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ValueError(f"not a version {VERSION} battle state")
+    battle = battle or Battle(verbosity=0)
+    pos = HEADER.size
+    out1 = decode_monster(data, pos)
+    out2 = decode_monster(data, pos + MONSTER.size)
+    team1, pos = decode_team(data, pos + 2 * MONSTER.size)
+    team2, pos = decode_team(data, pos)
+
+    battle.team1, battle.team2 = team1, team2
+    battle.out1, battle.out2 = out1, out2
+    battle.result = Battle.Result(result) if result else None
+    battle.turn_number = 0
+    battle.cache_key = None
+    return battle
@@ -0,0 +1,623 @@
+"""
+Reproducible performance benchmarks for the battle stack.
+
+Each benchmark case builds its inputs from a fixed RandomGen seed, is run a few
+times untimed to warm up, then timed over several repetitions. Results are
+summarised (min, median, mean, standard deviation and throughput) and can be
+written to JSON. Two JSON files can be compared to flag regressions.
+
+Usage:
+```
+python -m benchmark run --output before.json
+python -m benchmark run --filter battle --quick --output after.json
+python -m benchmark compare before.json after.json --threshold 0.1
+python -m benchmark list
+```
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+from typing import Callable
+from unittest import mock
+
+from random_gen import RandomGen
+from battle import Battle
+from team import MonsterTeam
+from tower import BattleTower, tournament_balanced, bracket_balanced
+from stats import ComplexStats
+from helpers import get_all_monsters
+from team_optimizer import TeamOptimizer
+from battle_state import encode_battle, decode_battle
+from tournament import parse_bracket, seeded_bracket, random_entrants, play_tournament
+
+from data_structures.referential_array import ArrayR, ArrayRList
+from data_structures.stack_adt import ArrayStack
+from data_structures.queue_adt import CircularQueue
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.parallel_sorted_list import ParallelArraySortedList
+from data_structures.sorted_list_adt import ListItem
+from data_structures.bset import BSet
+
+DEFAULT_SEED = 1008
+
+# A case maps a size to a setup function. Setup runs untimed before every repetition
+# and returns the function that is timed, which returns how many operations it did.
+Setup = Callable[[], Callable[[], int]]
+
+
+class Case:
+    """
+    A named benchmark.
+
+    Attributes:
+        name (str): the name results are reported under
+        make (Callable[[int], Setup]): builds the setup function for a size
+        size (int): the size of the workload
+        large (bool): whether the case is skipped by --quick
+    """
+
+    def __init__(self, name: str, make: Callable[[int], Setup], size: int, large: bool = False) -> None:
+        self.name = name
+        self.make = make
+        self.size = size
+        self.large = large
+
+
+CASES: list[Case] = []
+
+
+def register(name: str, sizes: tuple[int, ...], large_from: int | None = None):
+    """
+    Registers a benchmark for each size. Sizes from large_from upwards are skipped by --quick.
+    """
+    def decorator(make: Callable[[int], Setup]) -> Callable[[int], Setup]:
+        for size in sizes:
+            CASES.append(Case(f"{name}[{size}]", make, size, large_from is not None and size >= large_from))
+        return make
+    return decorator
+
+
+### Cases
+
+def random_team(team_mode: MonsterTeam.TeamMode, sort_key: MonsterTeam.SortMode = MonsterTeam.SortMode.HP) -> MonsterTeam:
+    return MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+
+
+def _battle_case(team_mode: MonsterTeam.TeamMode):
+    def make(size: int) -> Setup:
+        def setup():
+            pairs = [(random_team(team_mode), random_team(team_mode)) for _ in range(size)]
+
+            def run():
+                for team1, team2 in pairs:
+                    Battle(verbosity=0).battle(team1, team2)
+                return size
+            return run
+        return setup
+    return make
+
+
+for _mode in MonsterTeam.TeamMode:
+    register(f"battle.{_mode.name.lower()}", (200,))(_battle_case(_mode))
+
+
+@register("enum.turn_compares", (100000,))
+def enum_compare_case(size: int) -> Setup:
+    def setup():
+        # The action and result comparisons process_turn makes, on members of the same class
+        actions = [action for action in Battle.Action]
+        results = [result for result in Battle.Result]
+
+        def run():
+            matches = 0
+            for i in range(size // 4):
+                action = actions[i % len(actions)]
+                matches += action == Battle.Action.ATTACK
+                matches += action == Battle.Action.SPECIAL
+                matches += action == Battle.Action.SWAP
+                matches += results[i % len(results)] != Battle.Result.DRAW
+            return size // 4 * 4
+        return run
+    return setup
+
+
+def _churn_case(team_mode: MonsterTeam.TeamMode):
+    def make(size: int) -> Setup:
+        def setup():
+            teams = [random_team(team_mode, sort_key) for sort_key in MonsterTeam.SortMode]
+
+            def run():
+                for i in range(size):
+                    team = teams[i % len(teams)]
+                    team.add_to_team(team.retrieve_from_team())
+                    if i % 16 == 0:
+                        team.special()
+                return size
+            return run
+        return setup
+    return make
+
+
+for _mode in MonsterTeam.TeamMode:
+    register(f"team.churn_{_mode.name.lower()}", (20000,))(_churn_case(_mode))
+
+
+def _special_case(team_mode: MonsterTeam.TeamMode):
+    def make(size: int) -> Setup:
+        def setup():
+            teams = [random_team(team_mode) for _ in range(16)]
+            # Full teams and a team of 5, which does not fill the deque
+            teams[0] = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED,
+                                   provided_monsters=ArrayR.from_list([get_all_monsters()[0]] * MonsterTeam.TEAM_LIMIT))
+            teams[1] = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED,
+                                   provided_monsters=ArrayR.from_list([get_all_monsters()[0]] * (MonsterTeam.TEAM_LIMIT - 1)))
+
+            def run():
+                for i in range(size):
+                    teams[i % len(teams)].special()
+                return size
+            return run
+        return setup
+    return make
+
+
+for _mode in (MonsterTeam.TeamMode.FRONT, MonsterTeam.TeamMode.BACK):
+    register(f"team.special_{_mode.name.lower()}", (20000,))(_special_case(_mode))
+
+
+@register("tower.full_run", (10, 1000, 100000), large_from=100000)
+def tower_case(size: int) -> Setup:
+    def setup():
+        def run():
+            tower = BattleTower(Battle(verbosity=0))
+            tower.set_my_team(random_team(MonsterTeam.TeamMode.BACK))
+            tower.generate_teams(size)
+            battles = 0
+            while tower.battles_remaining():
+                tower.next_battle()
+                battles += 1
+            return size + battles
+        return run
+    return setup
+
+
+COMPLEX_FORMULAS = (
+    ["5", "6", "+"],
+    ["9", "2", "8", "middle"],
+    ["level", "3", "power", "1", "2", "3", "middle", "*"],
+    ["level", "5", "-", "sqrt", "1", "10", "middle"],
+)
+
+
+@register("stats.complex_calculate", (10000,))
+def complex_stats_case(size: int) -> Setup:
+    def setup():
+        stats = ComplexStats(*(ArrayR.from_list(formula) for formula in COMPLEX_FORMULAS))
+
+        def run():
+            for i in range(size // 4):
+                level = 6 + i % 50
+                stats.get_attack(level)
+                stats.get_defense(level)
+                stats.get_speed(level)
+                stats.get_max_hp(level)
+            return size // 4 * 4
+        return run
+    return setup
+
+
+@register("stats.complex_monster_reads", (10000,))
+def complex_monster_case(size: int) -> Setup:
+    def setup():
+        monsters = get_all_monsters()
+        instances = [monsters[i](False, 1 + i % 10) for i in range(len(monsters))]
+
+        def run():
+            for i in range(size // 4):
+                monster = instances[i % len(instances)]
+                monster.get_attack()
+                monster.get_defense()
+                monster.get_speed()
+                monster.get_max_hp()
+            return size // 4 * 4
+        return run
+    return setup
+
+
+def _selection_case(selection_mode: MonsterTeam.SelectionMode):
+    def make(size: int) -> Setup:
+        def setup():
+            monsters = get_all_monsters()
+            spawnable = [i for i in range(len(monsters)) if monsters[i].can_be_spawned()]
+            provided = [
+                ArrayR.from_list([monsters[RandomGen.random_choice(spawnable)] for _ in range(MonsterTeam.TEAM_LIMIT)])
+                for _ in range(size)
+            ]
+            answers = []
+            for _ in range(size):
+                answers.append(str(MonsterTeam.TEAM_LIMIT))
+                answers.extend(str(RandomGen.random_choice(spawnable) + 1) for _ in range(MonsterTeam.TEAM_LIMIT))
+
+            def run():
+                if selection_mode == MonsterTeam.SelectionMode.MANUAL:
+                    with mock.patch("builtins.input", side_effect=answers):
+                        for _ in range(size):
+                            MonsterTeam(MonsterTeam.TeamMode.BACK, selection_mode)
+                elif selection_mode == MonsterTeam.SelectionMode.PROVIDED:
+                    for i in range(size):
+                        MonsterTeam(MonsterTeam.TeamMode.BACK, selection_mode, provided_monsters=provided[i])
+                else:
+                    for _ in range(size):
+                        MonsterTeam(MonsterTeam.TeamMode.BACK, selection_mode)
+                return size
+            return run
+        return setup
+    return make
+
+
+for _selection in MonsterTeam.SelectionMode:
+    register(f"team.select_{_selection.name.lower()}", (1000,))(_selection_case(_selection))
+
+
+@register("adt.stack_push_pop", (100000,))
+def stack_case(size: int) -> Setup:
+    def setup():
+        stack = ArrayStack(size)
+
+        def run():
+            for i in range(size):
+                stack.push(i)
+            for _ in range(size):
+                stack.pop()
+            return 2 * size
+        return run
+    return setup
+
+
+@register("adt.queue_append_serve", (100000,))
+def queue_case(size: int) -> Setup:
+    def setup():
+        queue = CircularQueue(size)
+
+        def run():
+            for i in range(size):
+                queue.append(i)
+            for _ in range(size):
+                queue.serve()
+            return 2 * size
+        return run
+    return setup
+
+
+@register("adt.list_queue_add_serve", (100000,))
+def list_queue_case(size: int) -> Setup:
+    def setup():
+        def run():
+            # Starts small, so this includes growing the array
+            lst = ArrayRList()
+            for i in range(size):
+                lst.add(i)
+            for _ in range(size):
+                lst.serve()
+            lst.extend(range(size))
+            return 3 * size
+        return run
+    return setup
+
+
+@register("adt.sorted_list_add_delete", (2000,))
+def sorted_list_case(size: int) -> Setup:
+    def setup():
+        keys = [RandomGen.randint(0, size) for _ in range(size)]
+        sorted_list = ArraySortedList(size)
+
+        def run():
+            for key in keys:
+                sorted_list.add(ListItem(key, key))
+            for _ in range(size):
+                sorted_list.delete_at_index(0)
+            return 2 * size
+        return run
+    return setup
+
+
+@register("adt.parallel_sorted_list_add_delete", (2000,))
+def parallel_sorted_list_case(size: int) -> Setup:
+    def setup():
+        keys = [RandomGen.randint(0, size) for _ in range(size)]
+        sorted_list = ParallelArraySortedList(size)
+
+        def run():
+            for key in keys:
+                sorted_list.add_pair(key, key)
+            for _ in range(size):
+                sorted_list.delete_value_at_index(0)
+            return 2 * size
+        return run
+    return setup
+
+
+@register("adt.sorted_list_contains", (10000,))
+def sorted_list_contains_case(size: int) -> Setup:
+    def setup():
+        sorted_list = ArraySortedList(size)
+        items = []
+        for i in range(size):
+            # Keys repeat, like monsters with equal stats.
+            item = ListItem(i, RandomGen.randint(0, size // 10))
+            sorted_list.add(item)
+            items.append(item)
+        lookups = [items[RandomGen.randint(0, size - 1)] for _ in range(1000)]
+
+        def run():
+            for item in lookups:
+                item in sorted_list
+            return len(lookups)
+        return run
+    return setup
+
+
+@register("adt.bset_add_contains", (100000,))
+def bset_case(size: int) -> Setup:
+    def setup():
+        items = [RandomGen.randint(1, 18) for _ in range(size)]
+
+        def run():
+            s = BSet()
+            for item in items:
+                s.add(item)
+            for item in items:
+                item in s
+            return 2 * size
+        return run
+    return setup
+
+
+def _battle_states(count: int) -> list[Battle]:
+    """Battles paused at their first turn, between random teams of every mode."""
+    battles = []
+    for i in range(count):
+        team_mode = list(MonsterTeam.TeamMode)[i % 3]
+        battle = Battle(verbosity=0)
+        battle.begin(random_team(team_mode), random_team(team_mode))
+        battles.append(battle)
+    return battles
+
+
+@register("state.encode", (10000,))
+def encode_case(size: int) -> Setup:
+    def setup():
+        battles = _battle_states(100)
+
+        def run():
+            for i in range(size):
+                encode_battle(battles[i % 100])
+            return size
+        return run
+    return setup
+
+
+@register("state.decode", (10000,))
+def decode_case(size: int) -> Setup:
+    def setup():
+        states = [encode_battle(battle) for battle in _battle_states(100)]
+
+        def run():
+            for i in range(size):
+                decode_battle(states[i % 100])
+            return size
+        return run
+    return setup
+
+
+@register("optimizer.generations", (5,))
+def optimizer_case(size: int) -> Setup:
+    def setup():
+        optimizer = TeamOptimizer(population_size=16, reference_size=8, seed=RandomGen.randint(0, 1000), workers=1)
+
+        def run():
+            optimizer.run(size)
+            return size
+        return run
+    return setup
+
+
+@register("tournament.parse", (2 ** 10, 2 ** 16))
+def tournament_parse_case(size: int) -> Setup:
+    def setup():
+        bracket = seeded_bracket([f"T{i}" for i in range(size)])
+
+        def run():
+            parse_bracket(bracket)
+            return len(bracket)
+        return run
+    return setup
+
+
+@register("tournament.balanced", (2 ** 10,))
+def tournament_balanced_case(size: int) -> Setup:
+    def setup():
+        bracket = seeded_bracket([f"T{i}" for i in range(size)])
+
+        def run():
+            tournament_balanced(bracket)
+            return len(bracket)
+        return run
+    return setup
+
+
+def _bracket_stream(n_entrants: int):
+    """The tokens of a balanced bracket, generated one at a time."""
+    for i in range(n_entrants):
+        yield f"T{i}"
+        j = i + 1
+        while j % 2 == 0:
+            yield "+"
+            j //= 2
+
+
+@register("tournament.validate_stream", (10 ** 6,))
+def tournament_validate_case(size: int) -> Setup:
+    # size is the number of tokens, rounded up to a full bracket
+    n_entrants = 1 << ((size + 1) // 2 - 1).bit_length()
+
+    def setup():
+        def run():
+            if not bracket_balanced(_bracket_stream(n_entrants)):
+                raise AssertionError("bracket should be balanced")
+            return 2 * n_entrants - 1
+        return run
+    return setup
+
+
+@register("tournament.play", (256,))
+def tournament_play_case(size: int) -> Setup:
+    def setup():
+        entrants = random_entrants(size, seed=RandomGen.randint(0, 1000))
+        bracket = seeded_bracket(list(entrants))
+
+        def run():
+            for _ in play_tournament(bracket, entrants, workers=1):
+                pass
+            return size - 1
+        return run
+    return setup
+
+
+### Running
+
+def run_case(case: Case, seed: int, warmup: int, repeat: int) -> dict:
+    """
+    Times one case.
+
+    :returns: A summary of the repetitions
+    :complexity: O((warmup + repeat) * w) where w is the cost of the workload
+    """
+    RandomGen.set_seed(seed)
+    setup = case.make(case.size)
+    for _ in range(warmup):
+        setup()()
+
+    times = []
+    ops = 0
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        ops = run()
+        times.append(time.perf_counter() - start)
+
+    median = statistics.median(times)
+    return {
+        "size": case.size,
+        "repeat": repeat,
+        "ops": ops,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "ops_per_sec": ops / median if median > 0 else float("inf"),
+    }
+
+
+def run_benchmarks(pattern: str = "", quick: bool = False, seed: int = DEFAULT_SEED, warmup: int = 1, repeat: int = 5, stream=sys.stdout) -> dict:
+    """
+    Runs every registered case matching pattern.
+
+    :returns: The JSON-ready report
+    """
+    results = {}
+    for case in CASES:
+        if not re.search(pattern, case.name) or (quick and case.large):
+            continue
+        result = run_case(case, seed, warmup, repeat)
+        results[case.name] = result
+        if stream is not None:
+            stream.write(f"{case.name:<40} median {result['median'] * 1e3:10.3f} ms  "
+                         f"(+- {result['stdev'] * 1e3:.3f})  {result['ops_per_sec']:14.1f} ops/s\n")
+            stream.flush()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "warmup": warmup,
+            "repeat": repeat,
+            "timestamp": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(old: dict, new: dict) -> list[tuple[str, float, float, float]]:
+    """
+    Compares the medians of two reports.
+
+    :returns: (name, old median, new median, relative change) for each case in both
+    reports, where a positive change means slower
+    """
+    rows = []
+    for name, old_result in old["results"].items():
+        new_result = new["results"].get(name)
+        if new_result is None:
+            continue
+        change = new_result["median"] / old_result["median"] - 1 if old_result["median"] > 0 else 0.0
+        rows.append((name, old_result["median"], new_result["median"], change))
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmark", description="Battle stack benchmarks.")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run benchmarks.")
+    run_p.add_argument("-f", "--filter", default="", help="Only run cases whose name matches this regex.")
+    run_p.add_argument("-q", "--quick", action="store_true", help="Skip the largest workloads.")
+    run_p.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    run_p.add_argument("--warmup", type=int, default=1)
+    run_p.add_argument("--repeat", type=int, default=5)
+    run_p.add_argument("-o", "--output", help="Write the results to this JSON file.")
+
+    cmp_p = sub.add_parser("compare", help="Compare two result files.")
+    cmp_p.add_argument("old")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("-t", "--threshold", type=float, default=0.1, help="Relative slowdown flagged as a regression.")
+
+    sub.add_parser("list", help="List the benchmark cases.")
+    args = p.parse_args(argv)
+
+    if args.command == "list":
+        for case in CASES:
+            print(case.name + (" (large)" if case.large else ""))
+        return 0
+
+    if args.command == "run":
+        report = run_benchmarks(args.filter, args.quick, args.seed, args.warmup, args.repeat)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=4)
+        return 0
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = 0
+    for name, old_median, new_median, change in compare(old, new):
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  improved"
+        print(f"{name:<40} {old_median * 1e3:10.3f} ms -> {new_median * 1e3:10.3f} ms  {change:+7.1%}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,373 @@
+"""
+Checkpointing and resuming of BattleTower runs.
+
+A checkpoint holds everything that decides how the rest of a tower run goes:
+the player team, every enemy team in queue order with its lives (including the
+pending part of a lazy queue), the seen elements, the RandomGen state and the
+number of battles fought so far. It is a small versioned binary file, written
+atomically, so a run that dies can be resumed from its last checkpoint and
+continues exactly as if it had never stopped.
+
+Usage:
+```
+run_with_checkpoints(tower, "tower.ckpt", every=10000)
+...
+tower, battles = load_tower("tower.ckpt")
+run_with_checkpoints(tower, "tower.ckpt", every=10000, battles=battles)
+```
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower, LazyTeamQueue
+from helpers import get_all_monsters
+
+from data_structures.referential_array import ArrayR, ArrayRList
+from data_structures.queue_adt import CircularQueue
+
+MAGIC = b"BTCK"
+VERSION = 1
+# magic, version, flags, RandomGen seed, battles fought, seen elements
+HEADER = struct.Struct("<4sHHQQQ")
+LAZY_FLAG = 1
+
+# mode, sort mode (0 for none), descending, lives, number of instances, team size, roster size
+TEAM = struct.Struct("<BBBiBBB")
+# simple mode, initial level, current level, hp
+MONSTER = struct.Struct("<?iiq")
+KEY = struct.Struct("<q")
+COUNT = struct.Struct("<Q")
+
+
+def monster_classes() -> dict:
+    """
+    The monster classes defined in monsters.yaml, by name.
+
+    :complexity: O(m) where m is the number of monsters
+    """
+    classes = {}
+    all_monsters = get_all_monsters()
+    for i in range(len(all_monsters)):
+        classes[all_monsters[i].get_name()] = all_monsters[i]
+    return classes
+
+
+class Writer:
+    """Appends packed values to a bytearray."""
+
+    def __init__(self) -> None:
+        self.data = bytearray()
+
+    def pack(self, fmt: struct.Struct, *values) -> None:
+        self.data += fmt.pack(*values)
+
+    def string(self, value: str) -> None:
+        encoded = value.encode()
+        self.data += struct.pack("<B", len(encoded))
+        self.data += encoded
+
+
+class Reader:
+    """Reads packed values from bytes, front to back.
+
+    Every read checks that enough bytes are left, so a truncated checkpoint
+    raises ValueError instead of a struct or index error.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.pos = 0
+
+    def need(self, n: int) -> None:
+        """
+        :raises ValueError: if fewer than n bytes are left
+        :complexity: O(1)
+        """
+        if self.pos + n > len(self.data):
+            raise ValueError("truncated checkpoint")
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        self.need(fmt.size)
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def byte(self) -> int:
+        self.need(1)
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def string(self) -> str:
+        length = self.byte()
+        self.need(length)
+        value = self.data[self.pos:self.pos + length].decode()
+        self.pos += length
+        return value
+
+    def index(self, n: int) -> int:
+        """
+        Reads a one byte index into n items.
+
+        :raises ValueError: if the index is not below n
+        :complexity: O(1)
+        """
+        i = self.byte()
+        if i >= n:
+            raise ValueError(f"corrupt checkpoint: index {i} out of {n}")
+        return i
+
+    def finish(self) -> None:
+        """
+        :raises ValueError: if there are bytes left over
+        :complexity: O(1)
+        """
+        if self.pos != len(self.data):
+            raise ValueError(f"corrupt checkpoint: {len(self.data) - self.pos} trailing bytes")
+
+
+def write_team(out: Writer, team: MonsterTeam, classes: dict) -> None:
+    """
+    Writes a team: its settings, then each distinct monster instance, then the
+    team's current order and the revival roster as indices into those instances.
+    The same instance may be both in the team and in the roster.
+
+    :raises ValueError: if a monster is not defined in monsters.yaml
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    ordered = team.monsters_in_order()
+    roster = ArrayR(len(team.monsters))
+    for i in range(len(roster)):
+        roster[i] = team.monsters.array[(team.monsters.front + i) % len(team.monsters.array)]
+
+    instances = []
+    index_of = {}
+    for monsters in (ordered, roster):
+        for i in range(len(monsters)):
+            if id(monsters[i]) not in index_of:
+                index_of[id(monsters[i])] = len(instances)
+                instances.append(monsters[i])
+
+    optimise = team.team_mode == MonsterTeam.TeamMode.OPTIMISE
+    sort_mode = team.sort_mode.value if optimise and team.sort_mode is not None else 0
+    descending = team.descending if optimise else False
+    out.pack(TEAM, team.team_mode.value, sort_mode, descending, team.lives, len(instances), len(ordered), len(roster))
+    for monster in instances:
+        name = monster.get_name()
+        if classes.get(name) is not type(monster):
+            raise ValueError(f"{type(monster).__name__} is not a monster defined in monsters.yaml")
+        out.string(name)
+        out.pack(MONSTER, monster.simple_mode, monster.init_level, monster.curr_level, monster.get_hp())
+    for i in range(len(ordered)):
+        out.data.append(index_of[id(ordered[i])])
+        if optimise:
+            out.pack(KEY, team.team.key_at(i))
+    for i in range(len(roster)):
+        out.data.append(index_of[id(roster[i])])
+
+
+def read_team(reader: Reader, classes: dict) -> MonsterTeam:
+    """
+    Rebuilds a team written by write_team()
+
+    :raises ValueError: if the data is truncated or holds an unknown mode, monster or index
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    mode, sort_mode, descending, lives, n_instances, n_team, n_roster = reader.unpack(TEAM)
+    try:
+        team_mode = MonsterTeam.TeamMode(mode)
+        sort_key = MonsterTeam.SortMode(sort_mode) if sort_mode else None
+    except ValueError:
+        raise ValueError(f"corrupt checkpoint: unknown team mode {mode} or sort mode {sort_mode}") from None
+    if n_team > MonsterTeam.TEAM_LIMIT or n_roster > MonsterTeam.TEAM_LIMIT:
+        raise ValueError(f"corrupt checkpoint: team of {n_team} with a roster of {n_roster}")
+    if team_mode == MonsterTeam.TeamMode.OPTIMISE and sort_key is None:
+        raise ValueError("corrupt checkpoint: OPTIMISE team without a sort mode")
+    team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR(0), sort_key=sort_key)
+    team.lives = lives
+
+    instances = ArrayR(n_instances)
+    for i in range(n_instances):
+        name = reader.string()
+        if name not in classes:
+            raise ValueError(f"corrupt checkpoint: unknown monster {name!r}")
+        cls = classes[name]
+        simple_mode, init_level, curr_level, hp = reader.unpack(MONSTER)
+        monster = cls(simple_mode, init_level)
+        monster.curr_level = curr_level
+        monster.set_hp(hp)
+        instances[i] = monster
+
+    ordered = ArrayR(n_team)
+    for i in range(n_team):
+        ordered[i] = instances[reader.index(n_instances)]
+        if team_mode == MonsterTeam.TeamMode.OPTIMISE:
+            # Append in order so monsters with equal keys keep their order.
+            team.team.append_sorted(ordered[i], reader.unpack(KEY)[0])
+    if team_mode == MonsterTeam.TeamMode.OPTIMISE:
+        team.descending = descending
+    elif team_mode == MonsterTeam.TeamMode.FRONT:
+        for i in range(n_team - 1, -1, -1):
+            team.add_to_team(ordered[i])
+    else:
+        for i in range(n_team):
+            team.add_to_team(ordered[i])
+
+    for _ in range(n_roster):
+        team.monsters.append(instances[reader.index(n_instances)])
+    return team
+
+
+def encode_tower(tower: BattleTower, battles: int = 0) -> bytes:
+    """
+    Encodes the state of a tower between battles.
+
+    :param battles: The number of battles fought so far, kept for the resumed run
+    :raises ValueError: if a team holds a monster not defined in monsters.yaml
+    :complexity: O(t * n) where t is the number of live enemy teams and n the team size
+    """
+    classes = monster_classes()
+    queue = tower.enemy_teams
+    lazy = isinstance(queue, LazyTeamQueue)
+    out = Writer()
+    out.pack(HEADER, MAGIC, VERSION, LAZY_FLAG if lazy else 0, RandomGen.seed, battles, tower.seen_elements.elems)
+    write_team(out, tower.player_team, classes)
+
+    if lazy:
+        out.pack(COUNT, queue.pending)
+        out.pack(COUNT, queue.seed)
+        out.data.append(queue.next_team is not None)
+        if queue.next_team is not None:
+            write_team(out, queue.next_team, classes)
+        live = queue.live
+    else:
+        live = queue
+    out.pack(COUNT, len(live.array))
+    out.pack(COUNT, len(live))
+    for i in range(len(live)):
+        write_team(out, live.array[(live.front + i) % len(live.array)], classes)
+    return bytes(out.data)
+
+
+def decode_tower(data: bytes, battle: Battle | None = None) -> tuple[BattleTower, int]:
+    """
+    Rebuilds a tower from encode_tower(), and restores the RandomGen state.
+
+    :raises ValueError: if the data is not a checkpoint of this version, or is truncated or corrupt
+    :returns: The tower and the number of battles fought before the checkpoint
+    :complexity: O(t * n) where t is the number of live enemy teams and n the team size
+    """
+    reader = Reader(data)
+    magic, version, flags, seed, battles, seen = reader.unpack(HEADER)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"not a version {VERSION} tower checkpoint")
+
+    classes = monster_classes()
+    tower = BattleTower(battle)
+    tower.seen_elements.elems = seen
+    tower.player_team = read_team(reader, classes)
+
+    if flags & LAZY_FLAG:
+        pending, = reader.unpack(COUNT)
+        gen_seed, = reader.unpack(COUNT)
+        queue = LazyTeamQueue(pending, gen_seed, tower.new_enemy_team)
+        if reader.index(2):
+            queue.next_team = read_team(reader, classes)
+    capacity, = reader.unpack(COUNT)
+    n_live, = reader.unpack(COUNT)
+    if n_live > capacity:
+        raise ValueError(f"corrupt checkpoint: {n_live} teams in a queue of {capacity}")
+    # Every team takes at least TEAM.size bytes, so this rejects most truncated files up front.
+    reader.need(n_live * TEAM.size)
+    try:
+        if flags & LAZY_FLAG:
+            queue.live = live = ArrayRList[MonsterTeam](capacity)
+        else:
+            queue = live = CircularQueue[MonsterTeam](capacity)
+    except (MemoryError, OverflowError):
+        raise ValueError(f"corrupt checkpoint: queue capacity {capacity}") from None
+    for _ in range(n_live):
+        live.append(read_team(reader, classes))
+    reader.finish()
+    tower.enemy_teams = queue
+
+    RandomGen.seed = seed
+    return tower, battles
+
+
+def save_tower(tower: BattleTower, path: str, battles: int = 0) -> None:
+    """
+    Writes a checkpoint, replacing any previous one only once it is fully written.
+
+    :complexity: Same as encode_tower
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_tower(tower, battles))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_tower(path: str, battle: Battle | None = None) -> tuple[BattleTower, int]:
+    """
+    Reads a checkpoint written by save_tower()
+
+    :raises ValueError: if the file is not a checkpoint of this version, or is truncated or corrupt
+    :complexity: Same as decode_tower
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        return decode_tower(data, battle)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+def run_with_checkpoints(tower: BattleTower, path: str, every: int = 1000, battles: int = 0, max_battles: int | None = None) -> int:
+    """
+    Runs the tower, saving a checkpoint every `every` battles and once it stops.
+
+    :param battles: The number of battles already fought, e.g. from load_tower()
+    :param max_battles: Stop after this many battles in total
+    :returns: The number of battles fought in total
+    :complexity: O(b * m) where b is the number of battles and m the cost of one battle
+    """
+    if every < 1:
+        raise ValueError("every should be at least 1.")
+    while tower.battles_remaining() and (max_battles is None or battles < max_battles):
+        tower.next_battle()
+        battles += 1
+        if battles % every == 0:
+            save_tower(tower, path, battles)
+    save_tower(tower, path, battles)
+    return battles
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Run a BattleTower with checkpoints, or resume one.")
+    p.add_argument("path", help="Checkpoint file.")
+    p.add_argument("--resume", action="store_true", help="Continue from the checkpoint at path.")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--teams", type=int, default=1000, help="Number of enemy teams.")
+    p.add_argument("--lazy", action="store_true", help="Create enemy teams on demand.")
+    p.add_argument("--every", type=int, default=1000, help="Battles between checkpoints.")
+    p.add_argument("--max-battles", type=int, default=None)
+    args = p.parse_args()
+
+    if args.resume:
+        tower, battles = load_tower(args.path)
+    else:
+        RandomGen.set_seed(args.seed)
+        tower = BattleTower(Battle(verbosity=0))
+        tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+        tower.generate_teams(args.teams, lazy=args.lazy)
+        battles = 0
+    battles = run_with_checkpoints(tower, args.path, args.every, battles, args.max_battles)
+    print(f"{battles} battles fought, player has {tower.player_team.lives} lives, {len(tower.enemy_teams)} enemy teams left")
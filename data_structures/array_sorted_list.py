@@ -50,21 +50,22 @@ class ArraySortedList(SortedList[T]):
             raise IndexError('Element should be inserted in sorted order')
 
     def __contains__(self, item: ListItem):
-        """ Checks if value is in the list. """
-        for i in range(len(self)):
-            if self.array[i] == item:
-                return True
-        return False
+        """ Checks if an item with the same key and value is in the list.
+        :complexity: O(log n + d) where d is the number of items with the item's key
+        """
+        try:
+            self.index(item)
+        except ValueError:
+            return False
+        return True
 
     def _shuffle_right(self, index: int) -> None:
         """ Shuffle items to the right up to a given position. """
-        for i in range(len(self), index, -1):
-            self.array[i] = self.array[i - 1]
+        self.array.shift(index, len(self), 1)
 
     def _shuffle_left(self, index: int) -> None:
         """ Shuffle items starting at a given position to the left. """
-        for i in range(index, len(self)):
-            self.array[i] = self.array[i + 1]
+        self.array.shift(index + 1, len(self) + 1, -1)
 
     def _resize(self) -> None:
         """ Resize the list. """
@@ -72,8 +73,7 @@ class ArraySortedList(SortedList[T]):
         new_array = ArrayR(2 * len(self.array))
 
         # copying the contents
-        for i in range(self.length):
-            new_array[i] = self.array[i]
+        new_array.copy_from(self.array, 0, 0, self.length)
 
         # referring to the new array
         self.array = new_array
@@ -88,12 +88,53 @@ class ArraySortedList(SortedList[T]):
         return item
 
     def index(self, item: ListItem) -> int:
-        """ Find the position of a given item in the list. """
-        pos = self._index_to_add(item)
-        if pos < len(self) and self[pos] == item:
-            return pos
+        """ Find the first position of an item with the same key and value.
+        :raises ValueError: if there is no such item
+        :complexity: O(log n + d) where d is the number of items with the item's key
+        """
+        for pos in range(self.bisect_left(item.key), self.bisect_right(item.key)):
+            if self.array[pos] is item or self.array[pos].value == item.value:
+                return pos
         raise ValueError('item not in list')
 
+    def bisect_left(self, key) -> int:
+        """ Position of the first item with a key greater than or equal to key.
+        :complexity: O(log n)
+        """
+        low = 0
+        high = len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if self.array[mid].key < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def bisect_right(self, key) -> int:
+        """ Position of the first item with a key greater than key.
+        :complexity: O(log n)
+        """
+        low = 0
+        high = len(self)
+        while low < high:
+            mid = (low + high) // 2
+            if key < self.array[mid].key:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def items_between(self, lo, hi) -> ArrayR[ListItem]:
+        """ The items with lo <= key <= hi, in order.
+        :complexity: O(log n + k) where k is the number of items returned
+        """
+        start = self.bisect_left(lo)
+        stop = max(start, self.bisect_right(hi))
+        items = ArrayR(stop - start)
+        items.copy_from(self.array, start, 0, stop - start)
+        return items
+
     def is_full(self):
         """ Check if the list is full. """
         return len(self) >= len(self.array)
@@ -0,0 +1,226 @@
+""" Double-ended queue implemented as a ring buffer.
+
+Defines a circular deque using arrays, which can be used both as a queue
+(append/serve) and as a stack (push/pop), and can reverse or rotate its
+elements in place. Also defines UnitTests for the class.
+"""
+__author__ = "Maria Garcia de la Banda for the base"+"XXXXX student for"
+__docformat__ = 'reStructuredText'
+
+import unittest
+from data_structures.referential_array import ArrayR, T
+from data_structures.queue_adt import Queue
+
+class CircularDeque(Queue[T]):
+    """ Circular implementation of a double-ended queue with arrays.
+
+    The front of the deque is the front of the queue and the rear is the top of the stack,
+    so append/serve behave like CircularQueue and push/pop like ArrayStack.
+
+    Attributes:
+         length (int): number of elements in the deque (inherited)
+         front (int): index of the element at the front of the deque
+         rear (int): index of the first empty space at the rear of the deque
+         array (ArrayR[T]): array storing the elements of the deque
+
+    ArrayR cannot create empty arrays. So MIN_CAPACITY used to avoid this.
+    """
+    MIN_CAPACITY = 1
+
+    def __init__(self, max_capacity: int) -> None:
+        Queue.__init__(self)
+        self.front = 0
+        self.rear = 0
+        self.array = ArrayR(max(self.MIN_CAPACITY, max_capacity))
+
+    def append(self, item: T) -> None:
+        """ Adds an element to the rear of the deque.
+        :pre: deque is not full
+        :raises Exception: if the deque is full
+        :complexity: O(1)
+        """
+        if self.is_full():
+            raise Exception("Deque is full")
+
+        self.array[self.rear] = item
+        self.length += 1
+        self.rear = (self.rear + 1) % len(self.array)
+
+    def append_front(self, item: T) -> None:
+        """ Adds an element to the front of the deque.
+        :pre: deque is not full
+        :raises Exception: if the deque is full
+        :complexity: O(1)
+        """
+        if self.is_full():
+            raise Exception("Deque is full")
+
+        self.front = (self.front - 1) % len(self.array)
+        self.array[self.front] = item
+        self.length += 1
+
+    def serve(self) -> T:
+        """ Deletes and returns the element at the deque's front.
+        :pre: deque is not empty
+        :raises Exception: if the deque is empty
+        :complexity: O(1)
+        """
+        if self.is_empty():
+            raise Exception("Deque is empty")
+
+        self.length -= 1
+        item = self.array[self.front]
+        self.front = (self.front + 1) % len(self.array)
+        return item
+
+    def pop(self) -> T:
+        """ Deletes and returns the element at the deque's rear.
+        :pre: deque is not empty
+        :raises Exception: if the deque is empty
+        :complexity: O(1)
+        """
+        if self.is_empty():
+            raise Exception("Deque is empty")
+
+        self.length -= 1
+        self.rear = (self.rear - 1) % len(self.array)
+        return self.array[self.rear]
+
+    def push(self, item: T) -> None:
+        """ Adds an element to the rear of the deque, the top when used as a stack.
+        :complexity: O(1)
+        """
+        self.append(item)
+
+    def peek(self) -> T:
+        """ Returns the element at the deque's front.
+        :pre: deque is not empty
+        :raises Exception: if the deque is empty
+        :complexity: O(1)
+        """
+        if self.is_empty():
+            raise Exception("Deque is empty")
+        return self.array[self.front]
+
+    def peek_rear(self) -> T:
+        """ Returns the element at the deque's rear.
+        :pre: deque is not empty
+        :raises Exception: if the deque is empty
+        :complexity: O(1)
+        """
+        if self.is_empty():
+            raise Exception("Deque is empty")
+        return self.array[(self.rear - 1) % len(self.array)]
+
+    def __getitem__(self, index: int) -> T:
+        """ Returns the element index places from the front.
+        :raises IndexError: if index is out of range
+        :complexity: O(1)
+        """
+        if not 0 <= index < len(self):
+            raise IndexError("Out of bounds access in deque.")
+        return self.array[(self.front + index) % len(self.array)]
+
+    def reverse(self, start: int = 0, stop: int | None = None) -> None:
+        """ Reverses, in place, the elements from index start up to (not including) stop.
+        :raises IndexError: if the range is not within the deque
+        :complexity: O(stop - start)
+        """
+        if stop is None:
+            stop = len(self)
+        if not 0 <= start <= stop <= len(self):
+            raise IndexError("Out of bounds range in deque.")
+        capacity = len(self.array)
+        i = (self.front + start) % capacity
+        j = (self.front + stop - 1) % capacity
+        for _ in range((stop - start) // 2):
+            self.array[i], self.array[j] = self.array[j], self.array[i]
+            i = (i + 1) % capacity
+            j = (j - 1) % capacity
+
+    def rotate(self, k: int) -> None:
+        """ Moves the first k elements, in order, to the rear of the deque.
+        :complexity: O(1) when the deque is full, as only front and rear move,
+            O(min(k, n - k)) otherwise where n is the number of elements
+        """
+        if len(self) == 0:
+            return
+        k %= len(self)
+        if self.is_full():
+            self.front = (self.front + k) % len(self.array)
+            self.rear = self.front
+        elif k <= len(self) - k:
+            for _ in range(k):
+                self.append(self.serve())
+        else:
+            for _ in range(len(self) - k):
+                self.append_front(self.pop())
+
+    def is_full(self) -> bool:
+        """ True if the deque is full and no element can be added. """
+        return len(self) == len(self.array)
+
+    def clear(self) -> None:
+        """ Clears all elements from the deque. """
+        Queue.__init__(self)
+        self.front = 0
+        self.rear = 0
+
+
+class TestCircularDeque(unittest.TestCase):
+    """ Tests for the above class."""
+    CAPACITY = 6
+
+    def setUp(self):
+        self.deques = [CircularDeque(self.CAPACITY) for _ in range(self.CAPACITY + 1)]
+        for n, deque in enumerate(self.deques):
+            # Start part way round the array so the elements wrap
+            for _ in range(n // 2 + 1):
+                deque.append(None)
+                deque.serve()
+            for i in range(n):
+                deque.append(i)
+
+    def contents(self, deque):
+        return [deque[i] for i in range(len(deque))]
+
+    def test_both_ends(self):
+        for n, deque in enumerate(self.deques):
+            if n < self.CAPACITY:
+                deque.append_front(-1)
+                self.assertEqual(self.contents(deque), [-1] + list(range(n)))
+                self.assertEqual(deque.serve(), -1)
+            if n > 0:
+                self.assertEqual(deque.peek(), 0)
+                self.assertEqual(deque.peek_rear(), n - 1)
+                self.assertEqual(deque.pop(), n - 1)
+                deque.push(n - 1)
+            self.assertEqual(self.contents(deque), list(range(n)))
+        self.assertRaises(Exception, self.deques[-1].append, 0)
+        self.assertRaises(Exception, self.deques[-1].append_front, 0)
+        self.assertRaises(Exception, self.deques[0].pop)
+        self.assertRaises(Exception, self.deques[0].serve)
+
+    def test_reverse(self):
+        for n, deque in enumerate(self.deques):
+            for start in range(n + 1):
+                for stop in range(start, n + 1):
+                    expected = list(range(n))
+                    expected[start:stop] = expected[start:stop][::-1]
+                    deque.reverse(start, stop)
+                    self.assertEqual(self.contents(deque), expected)
+                    deque.reverse(start, stop)
+        self.assertRaises(IndexError, self.deques[2].reverse, 1, 3)
+
+    def test_rotate(self):
+        for n, deque in enumerate(self.deques):
+            for k in range(n + 1):
+                deque.rotate(k)
+                self.assertEqual(self.contents(deque), list(range(k, n)) + list(range(k)))
+                deque.rotate(n - k)
+                self.assertEqual(self.contents(deque), list(range(n)))
+
+if __name__ == '__main__':
+    testtorun = TestCircularDeque()
+    suite = unittest.TestLoader().loadTestsFromModule(testtorun)
+    unittest.TextTestRunner().run(suite)
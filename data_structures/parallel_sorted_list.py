@@ -0,0 +1,218 @@
+"""
+    Array-based implementation of SortedList ADT, keeping keys and values in two parallel arrays.
+    Items can be given as ListItem, like ArraySortedList, or as a value and a key,
+    which avoids creating a ListItem for each element.
+"""
+
+from data_structures.referential_array import ArrayR
+from data_structures.sorted_list_adt import *
+
+__author__ = 'Maria Garcia de la Banda and Brendon Taylor. Modified by Alexey Ignatiev and Graeme Gange'
+__docformat__ = 'reStructuredText'
+
+class ParallelArraySortedList(SortedList[T]):
+    """ SortedList ADT implemented with a key array and a value array.
+
+    Elements are placed exactly where ArraySortedList would place them, including
+    among equal keys, so the two can be swapped for one another.
+
+    Attributes:
+         length (int): number of elements in the list (inherited)
+         keys (ArrayR[K]): the keys, in sorted order
+         values (ArrayR[T]): the value of each key, at the same index
+    """
+    MIN_CAPACITY = 1
+
+    def __init__(self, max_capacity: int) -> None:
+        """ ParallelArraySortedList object initialiser. """
+        SortedList.__init__(self)
+        size = max(self.MIN_CAPACITY, max_capacity)
+        self.keys: ArrayR = ArrayR(size)
+        self.values: ArrayR[T] = ArrayR(size)
+
+    def reset(self):
+        """ Reset the list. """
+        SortedList.__init__(self)
+
+    def key_at(self, index: int):
+        """ Return the key at a given position.
+        :complexity: O(1)
+        """
+        if not 0 <= index < len(self):
+            raise IndexError('No such index in the list')
+        return self.keys[index]
+
+    def value_at(self, index: int) -> T:
+        """ Return the value at a given position.
+        :complexity: O(1)
+        """
+        if not 0 <= index < len(self):
+            raise IndexError('No such index in the list')
+        return self.values[index]
+
+    def __getitem__(self, index: int) -> ListItem:
+        """ Magic method. Return the element at a given position, as a new ListItem.
+        :complexity: O(1)
+        """
+        return ListItem(self.value_at(index), self.key_at(index))
+
+    def __setitem__(self, index: int, item: ListItem) -> None:
+        """ Magic method. Insert the item at a given position,
+            if possible (!). Shift the following elements to the right.
+        """
+        if self.is_empty() or \
+                (index == 0 and item.key <= self.keys[index]) or \
+                (index == len(self) and self.keys[index - 1] <= item.key) or \
+                (index > 0 and self.keys[index - 1] <= item.key <= self.keys[index]):
+            self._insert(index, item.value, item.key)
+        else:
+            # the list isn't empty and the item's position is wrong wrt. its neighbours
+            raise IndexError('Element should be inserted in sorted order')
+
+    def __contains__(self, item: ListItem):
+        """ Checks if an item with the same key and value is in the list.
+        :complexity: O(log n + d) where d is the number of items with the item's key
+        """
+        try:
+            self.index(item)
+        except ValueError:
+            return False
+        return True
+
+    def _insert(self, index: int, value: T, key) -> None:
+        """ Place a value and its key at index, shifting the following elements right.
+        :complexity: O(n - index), done by slice assignments
+        """
+        if self.is_full():
+            self._resize()
+        n = self.length
+        if index < n:
+            self.keys.shift(index, n, 1)
+            self.values.shift(index, n, 1)
+        self.keys[index] = key
+        self.values[index] = value
+        self.length = n + 1
+
+    def _resize(self) -> None:
+        """ Resize the list. """
+        # doubling the size of our list
+        keys = ArrayR(2 * len(self.keys))
+        values = ArrayR(2 * len(self.values))
+        keys.copy_from(self.keys, 0, 0, self.length)
+        values.copy_from(self.values, 0, 0, self.length)
+        self.keys = keys
+        self.values = values
+
+    def delete_value_at_index(self, index: int) -> T:
+        """ Delete the element at a given position and return its value.
+        :complexity: O(n - index), done by slice assignments
+        """
+        n = self.length
+        if not 0 <= index < n:
+            raise IndexError('No such index in the list')
+        value = self.values[index]
+        if index < n - 1:
+            self.keys.shift(index + 1, n, -1)
+            self.values.shift(index + 1, n, -1)
+        self.length = n - 1
+        return value
+
+    def delete_at_index(self, index: int) -> ListItem:
+        """ Delete item at a given position. """
+        if not 0 <= index < len(self):
+            raise IndexError('No such index in the list')
+        key = self.keys[index]
+        return ListItem(self.delete_value_at_index(index), key)
+
+    def index(self, item: ListItem) -> int:
+        """ Find the first position of an item with the same key and value.
+        :raises ValueError: if there is no such item
+        :complexity: O(log n + d) where d is the number of items with the item's key
+        """
+        for pos in range(self.bisect_left(item.key), self.bisect_right(item.key)):
+            if self.values[pos] == item.value:
+                return pos
+        raise ValueError('item not in list')
+
+    def bisect_left(self, key) -> int:
+        """ Position of the first element with a key greater than or equal to key.
+        :complexity: O(log n)
+        """
+        keys = self.keys.array
+        low = 0
+        high = self.length
+        while low < high:
+            mid = (low + high) // 2
+            if keys[mid] < key:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    def bisect_right(self, key) -> int:
+        """ Position of the first element with a key greater than key.
+        :complexity: O(log n)
+        """
+        keys = self.keys.array
+        low = 0
+        high = self.length
+        while low < high:
+            mid = (low + high) // 2
+            if key < keys[mid]:
+                high = mid
+            else:
+                low = mid + 1
+        return low
+
+    def items_between(self, lo, hi) -> ArrayR[ListItem]:
+        """ The elements with lo <= key <= hi, in order, as new ListItems.
+        :complexity: O(log n + k) where k is the number of elements returned
+        """
+        start = self.bisect_left(lo)
+        stop = max(start, self.bisect_right(hi))
+        items = ArrayR(stop - start)
+        for i in range(start, stop):
+            items[i - start] = ListItem(self.values[i], self.keys[i])
+        return items
+
+    def is_full(self):
+        """ Check if the list is full. """
+        return len(self) >= len(self.keys)
+
+    def add(self, item: ListItem) -> None:
+        """ Add new element to the list. """
+        self.add_pair(item.value, item.key)
+
+    def add_pair(self, value: T, key) -> None:
+        """ Add a value with the given key, without creating a ListItem.
+        :complexity: O(log n) to find the position, O(n) to shift the elements after it
+        """
+        self._insert(self._index_to_add(key), value, key)
+
+    def append_sorted(self, value: T, key) -> None:
+        """ Add a value after every element, which keeps the order of equal keys as given.
+        :raises IndexError: if the key is smaller than the last key in the list
+        :complexity: O(1) amortised
+        """
+        if len(self) > 0 and key < self.keys[len(self) - 1]:
+            raise IndexError('Element should be inserted in sorted order')
+        self._insert(len(self), value, key)
+
+    def _index_to_add(self, key) -> int:
+        """ Find the position where an element with the key should be placed.
+            Same search as ArraySortedList, so equal keys end up in the same order.
+        """
+        keys = self.keys.array
+        low = 0
+        high = self.length - 1
+
+        while low <= high:
+            mid = (low + high) // 2
+            if keys[mid] < key:
+                low = mid + 1
+            elif keys[mid] > key:
+                high = mid - 1
+            else:
+                return mid
+
+        return low
@@ -36,7 +36,7 @@ class ArrayR(Generic[T]):
         if length < 0:
             raise ValueError("Array length should be larger than or equal to 0.")
         self.array = (length * py_object)()  # initialises the space
-        self.array[:] = [None for _ in range(length)]
+        self.array[:] = [None] * length
 
 
     def __len__(self) -> int:
@@ -78,16 +78,45 @@ class ArrayR(Generic[T]):
 
     @classmethod
     def from_list(cls, l: list[T]) -> ArrayR[T]:
-        ret = ArrayR(len(l))
-        for x in range(len(l)):
-            ret[x] = l[x]
+        """:complexity: O(n) where n is the length of the list"""
+        return ArrayR.from_iterable(l)
+
+    @classmethod
+    def from_iterable(cls, items) -> ArrayR[T]:
+        """Creates an array holding the items, in order, with one slice assignment
+        :complexity: O(n) where n is the number of items
+        """
+        items = list(items)
+        ret = ArrayR(0)
+        ret.array = (len(items) * py_object)()
+        ret.array[:] = items
         return ret
 
     def to_list(self) -> list[T]:
-        ret = []
-        for x in range(len(self)):
-            ret.append(self[x])
-        return ret
+        """:complexity: O(n) where n is the length of the array"""
+        return self.array[:]
+
+    def copy_from(self, src: ArrayR[T], src_start: int = 0, dst_start: int = 0, n: int | None = None) -> None:
+        """Copies n items of src, from src_start, into this array from dst_start.
+        src may be this array, and the ranges may overlap.
+        :raises IndexError: if either range is not within its array
+        :complexity: O(n), done by a slice assignment
+        """
+        if n is None:
+            n = len(src.array) - src_start
+        if n < 0 or src_start < 0 or dst_start < 0 or src_start + n > len(src.array) or dst_start + n > len(self.array):
+            raise IndexError("Copy range out of bounds.")
+        self.array[dst_start:dst_start + n] = src.array[src_start:src_start + n]
+
+    def shift(self, start: int, stop: int, k: int) -> None:
+        """Moves the items from start up to (not including) stop by k places, to the right
+        if k is positive and to the left if negative. The places they leave keep their items.
+        :raises IndexError: if the moved range is not within the array
+        :complexity: O(stop - start), done by a slice assignment
+        """
+        if not 0 <= start <= stop <= len(self.array) or start + k < 0 or stop + k > len(self.array):
+            raise IndexError("Shift range out of bounds.")
+        self.array[start + k:stop + k] = self.array[start:stop]
     
     def __contains__(self, item) -> bool:
         """Searches for if an object exists in the array using a linear search
@@ -102,32 +131,167 @@ class ArrayR(Generic[T]):
 
 
 class ArrayRList(ArrayR[T]):
+    """ A growable queue (and deque) of references, stored as a ring in an ArrayR.
 
-    def __init__(self, length : int):
-        super().__init__(length)
+    Items are added at the rear and served from the front, both in O(1). When the
+    array is full its capacity doubles, so the list is never full and adding is
+    O(1) amortised. Indexing is relative to the front.
+
+    Attributes:
+         array: the references, from ArrayR
+         front (int): index in array of the item at the front
+         filled_length (int): number of items in the list
+    """
+    MIN_CAPACITY = 1
+
+    def __init__(self, length: int = MIN_CAPACITY):
+        """
+        :param length: The initial capacity
+        :complexity: O(length)
+        """
+        super().__init__(max(self.MIN_CAPACITY, length))
+        self.front = 0
         self.filled_length = 0
 
-    def _shuffle_left(self) -> None:
-        """ Shuffle items starting at a given position to the left. """
-        for i in range(self.filled_length ):
-            self.array[i] = self.array[i + 1]
-        self.array[self.filled_length] = None
-
-    def is_empty(self):
-        for elem in self:
-            if elem is not None:
-                return False
-        return True
-    
-    def add(self, elem):
-        self.array[self.filled_length] = elem
+    def __len__(self) -> int:
+        """Returns the number of items in the list
+        :complexity: O(1)
+        """
+        return self.filled_length
+
+    def __getitem__(self, index: int) -> T:
+        """Returns the item index places from the front
+        :raises IndexError: if index is out of range
+        :complexity: O(1)
+        """
+        if not 0 <= index < self.filled_length:
+            raise IndexError("Out of bounds access in list.")
+        return self.array[(self.front + index) % len(self.array)]
+
+    def __setitem__(self, index: int, value: T) -> None:
+        """Sets the item index places from the front to value
+        :raises IndexError: if index is out of range
+        :complexity: O(1)
+        """
+        if not 0 <= index < self.filled_length:
+            raise IndexError("Out of bounds access in list.")
+        self.array[(self.front + index) % len(self.array)] = value
+
+    def index(self, item: T) -> int:
+        """Position of the first occurrence of item from the front
+        :raises ValueError: if item is not in the list
+        :complexity: O(n) worst case where n is the number of items
+        """
+        for i in range(self.filled_length):
+            if self[i] == item:
+                return i
+        raise ValueError("Value does not exist")
+
+    def __str__(self) -> str:
+        return "[" + ", ".join(str(self[i]) for i in range(self.filled_length)) + "]"
+
+    def to_list(self) -> list[T]:
+        """The items from front to rear
+        :complexity: O(n) where n is the number of items
+        """
+        end = self.front + self.filled_length
+        if end <= len(self.array):
+            return self.array[self.front:end]
+        return self.array[self.front:] + self.array[:end - len(self.array)]
+
+    def is_empty(self) -> bool:
+        """:complexity: O(1)"""
+        return self.filled_length == 0
+
+    def is_full(self) -> bool:
+        """The list grows as needed, so it is never full."""
+        return False
+
+    def reserve(self, capacity: int) -> None:
+        """Makes room for at least capacity items, moving the front to index 0
+        :complexity: O(n) where n is the number of items, O(1) if there is room already
+        """
+        if capacity <= len(self.array):
+            return
+        grown = ArrayR(max(capacity, 2 * len(self.array)))
+        grown.array[:self.filled_length] = self.to_list()
+        self.array = grown.array
+        self.front = 0
+
+    def add(self, elem: T) -> None:
+        """Adds an item to the rear
+        :complexity: O(1) amortised, O(n) when the array grows
+        """
+        if self.filled_length == len(self.array):
+            self.reserve(self.filled_length + 1)
+        self.array[(self.front + self.filled_length) % len(self.array)] = elem
+        self.filled_length += 1
+
+    append = add
+
+    def add_front(self, elem: T) -> None:
+        """Adds an item to the front
+        :complexity: O(1) amortised, O(n) when the array grows
+        """
+        if self.filled_length == len(self.array):
+            self.reserve(self.filled_length + 1)
+        self.front = (self.front - 1) % len(self.array)
+        self.array[self.front] = elem
         self.filled_length += 1
 
+    def extend(self, items) -> None:
+        """Adds every item, in order, to the rear, growing the array at most once
+        :complexity: O(k) where k is the number of items
+        """
+        items = list(items)
+        self.reserve(self.filled_length + len(items))
+        capacity = len(self.array)
+        rear = (self.front + self.filled_length) % capacity
+        # At most two slices: up to the end of the array, then from its start
+        first = min(len(items), capacity - rear)
+        self.array[rear:rear + first] = items[:first]
+        self.array[:len(items) - first] = items[first:]
+        self.filled_length += len(items)
+
     def serve(self) -> T:
-        item = self.array[0]
+        """Removes and returns the item at the front
+        :raises Exception: if the list is empty
+        :complexity: O(1)
+        """
+        if self.filled_length == 0:
+            raise Exception("List is empty")
+        item = self.array[self.front]
+        self.array[self.front] = None
+        self.front = (self.front + 1) % len(self.array)
+        self.filled_length -= 1
+        return item
+
+    def pop(self) -> T:
+        """Removes and returns the item at the rear
+        :raises Exception: if the list is empty
+        :complexity: O(1)
+        """
+        if self.filled_length == 0:
+            raise Exception("List is empty")
         self.filled_length -= 1
-        # self._shuffle_left()
-        # print(self.array[:])
+        rear = (self.front + self.filled_length) % len(self.array)
+        item = self.array[rear]
+        self.array[rear] = None
         return item
 
-    
\ No newline at end of file
+    def peek(self) -> T:
+        """Returns the item at the front
+        :raises Exception: if the list is empty
+        :complexity: O(1)
+        """
+        if self.filled_length == 0:
+            raise Exception("List is empty")
+        return self.array[self.front]
+
+    def clear(self) -> None:
+        """Removes every item, keeping the capacity
+        :complexity: O(c) where c is the capacity, to drop the references
+        """
+        self.array[:] = [None] * len(self.array)
+        self.front = 0
+        self.filled_length = 0
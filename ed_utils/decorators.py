@@ -126,3 +126,31 @@ class advanced(Decorator):
         """
         if saved_value is not None:
             results["name"] = "[ADV] {}".format(results["name"])
+
+class budget(Decorator):
+    """
+    Fails the test if it takes longer than `time` seconds (wall time)
+    or its peak traced memory exceeds `memory` bytes.
+    Only enforced by the JSON test runner.
+
+    Usage: @budget(time=2.5, memory=50_000_000)
+    """
+
+    def __init__(self, time=None, memory=None) -> None:
+        super().__init__({"time": time, "memory": memory})
+
+    def validate(self, v):
+        if v["time"] is None and v["memory"] is None:
+            return "Budget should limit time and/or memory."
+        for key in ("time", "memory"):
+            if v[key] is not None and (not isinstance(v[key], (float, int)) or v[key] <= 0):
+                return "Budget {} should be a positive float/int.".format(key)
+
+    @classmethod
+    def change_result(cls, saved_value, results:dict, output:str, err):
+        """
+        Handles the `budget` and `over_budget` fields for results.
+        """
+        if saved_value is not None:
+            results["budget"] = saved_value
+            results["over_budget"] = err is not None and str(err[1]).startswith("Over budget:")
@@ -3,11 +3,14 @@ from __future__ import print_function
 
 import sys
 import json
+import time
 import inspect
+import tracemalloc
 
 from unittest import result
 from unittest.signals import registerResult
 import ed_utils.decorators as decorators
+import ed_utils.timeout as timeout
 
 DECORATOR_CLASSES = [
     klass for _name, klass in inspect.getmembers(decorators)
@@ -23,10 +26,69 @@ class JSONTestResult(result.TestResult):
 
     Used by JSONTestRunner.
     """
-    def __init__(self, stream, descriptions, verbosity, results):
+    def __init__(self, stream, descriptions, verbosity, results, track_memory=True):
         super(JSONTestResult, self).__init__(stream, descriptions, verbosity)
         self.descriptions = descriptions
         self.results = results
+        self.track_memory = track_memory
+        self._started_tracing = False
+        self._start = (0.0, 0.0, 0)
+        self.metrics = {}
+
+    def startTestRun(self):
+        super(JSONTestResult, self).startTestRun()
+        if self.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stopTestRun(self):
+        super(JSONTestResult, self).stopTestRun()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def startTest(self, test):
+        super(JSONTestResult, self).startTest(test)
+        timeout.last_run = None
+        traced = 0
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            traced = tracemalloc.get_traced_memory()[0]
+        self._start = (time.perf_counter(), time.process_time(), traced)
+
+    def measure(self):
+        """Wall time, CPU time and peak traced memory (above what was allocated before it) of the current test.
+        Tests run in a child process by @timeout report the child's CPU time and memory.
+        """
+        wall_time = time.perf_counter() - self._start[0]
+        cpu_time = time.process_time() - self._start[1]
+        peak_memory = tracemalloc.get_traced_memory()[1] - self._start[2] if tracemalloc.is_tracing() else None
+        child = timeout.last_run
+        if child is not None:
+            cpu_time += child["cpu_time"]
+            if child["peak_memory"] is not None:
+                peak_memory = child["peak_memory"]
+        self.metrics = {
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "peak_memory": peak_memory,
+        }
+
+    def overBudget(self, test):
+        """Describes how the test exceeded its @budget, or returns None."""
+        method = getattr(test, test._testMethodName)
+        limits = getattr(method, decorators.budget.get_attr_name(), None)
+        if limits is None:
+            return None
+        problems = []
+        if limits["time"] is not None and self.metrics["wall_time"] > limits["time"]:
+            problems.append("took {:.3f}s, budget is {}s".format(self.metrics["wall_time"], limits["time"]))
+        peak_memory = self.metrics["peak_memory"]
+        if limits["memory"] is not None and peak_memory is not None and peak_memory > limits["memory"]:
+            problems.append("used {} bytes, budget is {} bytes".format(peak_memory, limits["memory"]))
+        if problems:
+            return "Over budget: " + "; ".join(problems)
+        return None
 
     def getDescription(self, test):
         doc_first_line = test.shortDescription()
@@ -45,35 +107,73 @@ class JSONTestResult(result.TestResult):
                 out += err
             return out
 
-    def buildResult(self, test, err=None):
+    def buildResult(self, test, err=None, outcome="success"):
         output = self.getOutput() or ""
         result = {
             "name": self.getDescription(test),
             "ok": True,
+            "outcome": outcome,
         }
+        result.update(self.metrics)
         for dec in DECORATOR_CLASSES:
             method = getattr(test, test._testMethodName)
             val = getattr(method, dec.get_attr_name(), None)
             dec.change_result(val, result, output, err)
         return result
 
-    def processResult(self, test, err=None):
-        self.results.append(self.buildResult(test, err))
+    def processResult(self, test, err=None, outcome="success"):
+        self.results.append(self.buildResult(test, err, outcome))
 
     def addSuccess(self, test):
+        self.measure()
+        message = self.overBudget(test)
+        if message is not None:
+            try:
+                raise test.failureException(message)
+            except test.failureException:
+                self.addFailure(test, sys.exc_info(), measured=True)
+            return
         super(JSONTestResult, self).addSuccess(test)
         self.processResult(test)
 
     def addError(self, test, err):
+        self.measure()
         super(JSONTestResult, self).addError(test, err)
         # Prevent output from being printed to stdout on failure
         self._mirrorOutput = False
-        self.processResult(test, err)
+        self.processResult(test, err, "error")
 
-    def addFailure(self, test, err):
+    def addFailure(self, test, err, measured=False):
+        if not measured:
+            self.measure()
         super(JSONTestResult, self).addFailure(test, err)
         self._mirrorOutput = False
-        self.processResult(test, err)
+        self.processResult(test, err, "failure")
+
+
+def summarise(testcases):
+    """Aggregate timing and memory figures of a list of JSON test results,
+    in total and split by outcome (success, failure or error).
+    """
+    timed = [case for case in testcases if "wall_time" in case]
+    memory = [case["peak_memory"] for case in timed if case.get("peak_memory") is not None]
+    slowest = sorted(timed, key=lambda case: case["wall_time"], reverse=True)[:5]
+    by_outcome = {}
+    for case in timed:
+        totals = by_outcome.setdefault(case.get("outcome", "success"), {"tests": 0, "wall_time": 0.0, "cpu_time": 0.0})
+        totals["tests"] += 1
+        totals["wall_time"] += case["wall_time"]
+        totals["cpu_time"] += case["cpu_time"]
+    return {
+        "tests": len(testcases),
+        "passed": sum(1 for case in testcases if case.get("passed")),
+        "wall_time": sum(case["wall_time"] for case in timed),
+        "cpu_time": sum(case["cpu_time"] for case in timed),
+        "max_peak_memory": max(memory) if memory else None,
+        "over_budget": sum(1 for case in testcases if case.get("over_budget")),
+        "slowest": [{"name": case["name"], "wall_time": case["wall_time"]} for case in slowest],
+        "by_outcome": by_outcome,
+    }
 
 
 class JSONTestRunner(object):
@@ -83,7 +183,7 @@ class JSONTestRunner(object):
 
     def __init__(self, stream=sys.stdout, descriptions=True, verbosity=1,
                  failfast=False, buffer=True,
-                 stdout_visibility=None):
+                 stdout_visibility=None, track_memory=True):
         """
         Set buffer to True to include test output in JSON
         """
@@ -92,6 +192,7 @@ class JSONTestRunner(object):
         self.verbosity = verbosity
         self.failfast = failfast
         self.buffer = buffer
+        self.track_memory = track_memory
         self.json_data = {
             "testcases": [],
         }
@@ -100,7 +201,7 @@ class JSONTestRunner(object):
 
     def _makeResult(self):
         return self.resultclass(self.stream, self.descriptions, self.verbosity,
-                                self.json_data["testcases"])
+                                self.json_data["testcases"], self.track_memory)
 
     def run(self, test):
         "Run the given test case or test suite."
@@ -118,6 +219,7 @@ class JSONTestRunner(object):
             if stopTestRun is not None:
                 stopTestRun()
 
+        self.json_data["summary"] = summarise(self.json_data["testcases"])
         json.dump(self.json_data, self.stream, indent=4)
         self.stream.write('\n')
         return result
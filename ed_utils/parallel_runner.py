@@ -0,0 +1,184 @@
+"""Running tests across worker processes"""
+import json
+import sys
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ed_utils.json_test_runner import JSONTestResult, summarise
+
+_worker_tests = {}
+_worker_options = {"track_memory": False}
+
+
+def iter_tests(suite):
+    """Yields the test cases of a (nested) suite in order."""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from iter_tests(test)
+        else:
+            yield test
+
+
+class RecordingTestResult(JSONTestResult):
+    """A JSON test result that also keeps the outcome, traceback and duration
+    of every test, so results can be sent back from a worker process.
+    """
+    def record(self, test, outcome, err=None, json_result=None, reason=None):
+        self.results.append({
+            "id": test.id(),
+            "outcome": outcome,
+            "duration": self.metrics.get("wall_time", 0.0),
+            "traceback": self._exc_info_to_string(err, test) if err is not None else reason,
+            "json": json_result,
+        })
+
+    def processResult(self, test, err=None, outcome="success"):
+        self.record(test, outcome, err, self.buildResult(test, err, outcome))
+
+    def addSkip(self, test, reason):
+        super(RecordingTestResult, self).addSkip(test, reason)
+        self.measure()
+        self.record(test, "skip", reason=reason)
+
+    def addExpectedFailure(self, test, err):
+        super(RecordingTestResult, self).addExpectedFailure(test, err)
+        self.measure()
+        self.record(test, "expected_failure", err)
+
+    def addUnexpectedSuccess(self, test):
+        super(RecordingTestResult, self).addUnexpectedSuccess(test)
+        self.measure()
+        self.record(test, "unexpected_success")
+
+
+def _init_worker(discover, path, track_memory):
+    """Discovers the suite once in each worker so tests can be run by id."""
+    sys.path[:] = path
+    _worker_options["track_memory"] = track_memory
+    for test in iter_tests(discover()):
+        _worker_tests[test.id()] = test
+
+
+def _run_chunk(ids):
+    """Runs the tests with the given ids in a worker and returns their records."""
+    records = []
+    result = RecordingTestResult(None, True, 1, records, _worker_options["track_memory"])
+    result.buffer = True
+    result.startTestRun()
+    try:
+        for test_id in ids:
+            _worker_tests[test_id](result)
+    finally:
+        result.stopTestRun()
+    return records
+
+
+class ParallelTestRunner(object):
+    """A test runner distributing test cases across worker processes.
+
+    Tests of the same TestCase class run in the same worker, in order. Results are
+    merged back into the discovery order and printed either in TextTestRunner's
+    format or in JSONTestRunner's format.
+    """
+    SEPARATOR1 = "=" * 70
+    SEPARATOR2 = "-" * 70
+
+    def __init__(self, discover, workers, stream=sys.stderr, json_output=False, durations=10):
+        """
+        discover should be a picklable callable returning the (unfiltered) suite,
+        so that each worker can rebuild it.
+        """
+        self.discover = discover
+        self.workers = workers
+        self.stream = stream
+        self.json_output = json_output
+        self.durations = durations
+
+    @staticmethod
+    def chunks(tests):
+        """Groups test ids by TestCase class, keeping discovery order."""
+        groups = {}
+        for test in tests:
+            groups.setdefault(type(test), []).append(test.id())
+        return list(groups.values())
+
+    def run(self, suite):
+        "Run the given test suite."
+        tests = list(iter_tests(suite))
+        order = {test.id(): i for i, test in enumerate(tests)}
+        start = time.perf_counter()
+        records = []
+        # Not multiprocessing.Pool: its workers are daemonic, so tests that start
+        # their own worker processes from a @timeout child would fail.
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                 initargs=(self.discover, list(sys.path), self.json_output)) as pool:
+            futures = [pool.submit(_run_chunk, chunk) for chunk in self.chunks(tests)]
+            for future in as_completed(futures):
+                chunk_records = future.result()
+                records.extend(chunk_records)
+                if not self.json_output:
+                    for record in chunk_records:
+                        self.stream.write(self.SHORT_OUTCOMES[record["outcome"]])
+                    self.stream.flush()
+        elapsed = time.perf_counter() - start
+        records.sort(key=lambda record: order[record["id"]])
+
+        if self.json_output:
+            self.write_json(records)
+        else:
+            self.write_text(records, elapsed)
+        return records
+
+    SHORT_OUTCOMES = {
+        "success": ".",
+        "failure": "F",
+        "error": "E",
+        "skip": "s",
+        "expected_failure": "x",
+        "unexpected_success": "u",
+    }
+
+    def write_json(self, records):
+        testcases = [record["json"] for record in records if record["json"] is not None]
+        json.dump({"testcases": testcases, "summary": summarise(testcases)}, self.stream, indent=4)
+        self.stream.write('\n')
+
+    def write_text(self, records, elapsed):
+        write = self.stream.write
+        write('\n')
+        counts = {outcome: 0 for outcome in self.SHORT_OUTCOMES}
+        for record in records:
+            counts[record["outcome"]] += 1
+        for outcome, label in (("error", "ERROR"), ("failure", "FAIL")):
+            for record in records:
+                if record["outcome"] == outcome:
+                    write(self.SEPARATOR1 + '\n')
+                    write("%s: %s\n" % (label, record["id"]))
+                    write(self.SEPARATOR2 + '\n')
+                    write("%s\n" % record["traceback"])
+
+        write(self.SEPARATOR2 + '\n')
+        write("Ran %d test%s in %.3fs using %d workers\n\n" % (
+            len(records), len(records) != 1 and "s" or "", elapsed, self.workers))
+
+        infos = []
+        if counts["failure"]:
+            infos.append("failures=%d" % counts["failure"])
+        if counts["error"]:
+            infos.append("errors=%d" % counts["error"])
+        if counts["skip"]:
+            infos.append("skipped=%d" % counts["skip"])
+        if counts["expected_failure"]:
+            infos.append("expected failures=%d" % counts["expected_failure"])
+        if counts["unexpected_success"]:
+            infos.append("unexpected successes=%d" % counts["unexpected_success"])
+        write("FAILED" if counts["failure"] or counts["error"] or counts["unexpected_success"] else "OK")
+        write(" (%s)\n" % ", ".join(infos) if infos else "\n")
+
+        if self.durations:
+            slowest = sorted(records, key=lambda record: record["duration"], reverse=True)[:self.durations]
+            write("\nSlowest %d tests:\n" % len(slowest))
+            for record in slowest:
+                write("%8.3fs %s\n" % (record["duration"], record["id"]))
+        self.stream.flush()
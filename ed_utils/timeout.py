@@ -1,29 +1,146 @@
+import os
+import pickle
+import select
+import signal
+import sys
+import time
+import traceback
+import tracemalloc
 from functools import wraps
+from io import StringIO
 from threading import Thread
 from queue import Queue
 
+# "process" runs each test in a forked child which is killed on timeout.
+# "thread" runs it in a daemon thread, which keeps running after a timeout.
+MODE = os.environ.get("ED_TIMEOUT_MODE", "process" if hasattr(os, "fork") else "thread")
+
+# Measurements of the last test run in a child process, None after a thread run.
+last_run = None
+
+
+class RemoteTraceback(Exception):
+    """The formatted traceback of an exception raised in the child process."""
+    def __init__(self, tb):
+        self.tb = tb
+
+    def __str__(self):
+        return self.tb
+
+
 def do_stuff(q1, a, k, method):
     try:
         q1.put(method(*a, **k))
     except Exception as e:
         q1.put(e)
 
+
+def run_in_thread(func, sec, args, kwargs):
+    q = Queue()
+    p = Thread(target=do_stuff, args=[q, args, kwargs, func], kwargs={}, daemon=True)
+    p.start()
+    p.join(sec)
+
+    if p.is_alive():
+        # I can't kill the thread, but just keep the tests running.
+        raise TimeoutError(f"Timed out after {sec} seconds")
+    else:
+        x = q.get()
+        if isinstance(x, Exception):
+            raise x
+        return x
+
+
+def child_main(write_fd, func, args, kwargs):
+    """Runs the test in the forked child and pipes the outcome back. Never returns."""
+    out, err = StringIO(), StringIO()
+    sys.stdout, sys.stderr = out, err
+    traced = 0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        traced = tracemalloc.get_traced_memory()[0]
+    cpu_start = time.process_time()
+    try:
+        payload = {"ok": True, "value": func(*args, **kwargs)}
+    except BaseException as e:
+        payload = {"ok": False, "value": e, "tb": traceback.format_exc()}
+    payload["cpu_time"] = time.process_time() - cpu_start
+    payload["peak_memory"] = tracemalloc.get_traced_memory()[1] - traced if tracemalloc.is_tracing() else None
+    payload["stdout"] = out.getvalue()
+    payload["stderr"] = err.getvalue()
+    try:
+        data = pickle.dumps(payload)
+    except Exception:
+        # The return value or exception could not be sent, so send a description of it.
+        kind = "returned" if payload["ok"] else "raised"
+        payload["ok"] = False
+        payload["value"] = RuntimeError(f"Test {kind} an unpicklable object: {payload['value']!r}")
+        data = pickle.dumps(payload)
+    try:
+        with os.fdopen(write_fd, "wb") as f:
+            f.write(data)
+    finally:
+        os._exit(0)
+
+
+def run_in_process(func, sec, args, kwargs):
+    global last_run
+    sys.stdout.flush()
+    sys.stderr.flush()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        child_main(write_fd, func, args, kwargs)
+    os.close(write_fd)
+
+    chunks = []
+    deadline = time.monotonic() + sec
+    timed_out = False
+    with os.fdopen(read_fd, "rb") as f:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([f], [], [], remaining)[0]:
+                timed_out = True
+                break
+            chunk = os.read(f.fileno(), 1 << 16)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    if timed_out:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+        last_run = None
+        raise TimeoutError(f"Timed out after {sec} seconds")
+    _, status, usage = os.wait4(pid, 0)
+    if not chunks:
+        last_run = None
+        raise RuntimeError(f"Test process exited without a result (status {status})")
+
+    payload = pickle.loads(b"".join(chunks))
+    last_run = {
+        "cpu_time": payload["cpu_time"],
+        "peak_memory": payload["peak_memory"],
+        "max_rss": usage.ru_maxrss * 1024,
+    }
+    sys.stdout.write(payload["stdout"])
+    sys.stderr.write(payload["stderr"])
+    if not payload["ok"]:
+        e = payload["value"]
+        e.__cause__ = RemoteTraceback(payload["tb"])
+        raise e
+    return payload["value"]
+
+
 def timeout(sec=3):
     def timeout_dec(func):
         @wraps(func)
         def test(*args, **kwargs):
-            q = Queue()
-            p = Thread(target=do_stuff, args=[q, args, kwargs, func], kwargs={}, daemon=True)
-            p.start()
-            p.join(sec)
-
-            if p.is_alive():
-                # I can't kill the thread, but just keep the tests running.
-                raise TimeoutError(f"Timed out after {sec} seconds")
-            else:
-                x = q.get()
-                if isinstance(x, Exception):
-                    raise x
-                return x
+            global last_run
+            last_run = None
+            if MODE == "process":
+                return run_in_process(func, sec, args, kwargs)
+            return run_in_thread(func, sec, args, kwargs)
         return test
     return timeout_dec
@@ -65,6 +65,16 @@ def _make_all_monster_classes():
         globals()[monster["name"]].evolution_class = evolution_class
         globals()[monster["name"]].get_evolution = classmethod(lambda s: s.evolution_class)
 
+def level_dependent_stats() -> dict[str, list[str]]:
+    """
+    For each monster, the names of the complex stats that change with its level.
+    The others are folded to a number when the monster classes are made.
+
+    :complexity: O(m) where m is the number of monsters
+    """
+    all_monsters = get_all_monsters()
+    return {all_monsters[i].get_name(): all_monsters[i].get_complex_stats().level_dependent() for i in range(len(all_monsters))}
+
 get_all_monsters()
 
 if TYPE_CHECKING:
@@ -0,0 +1,286 @@
+"""
+Opt-in call counters and timers for the hot paths of the battle stack.
+
+While disabled nothing is patched, so there is no overhead at all. enable()
+wraps each instrumented function with a counter and timer; disable() puts the
+original functions back. Teams bind their backend's methods when they are
+created, so team operations are only counted for teams created while enabled.
+
+Usage:
+```
+with Instrumentation() as inst:
+    while tower.battles_remaining():
+        tower.next_battle()
+print(inst.report())
+inst.dump_stats("tower.prof")   # python -m pstats tower.prof
+```
+"""
+from __future__ import annotations
+
+import argparse
+import marshal
+import time
+from functools import wraps
+from typing import Callable
+
+from monster_base import MonsterBase
+from stats import ComplexStats
+from elements import EffectivenessCalculator
+from team import MonsterTeam, FrontBackend, BackBackend, OptimiseBackend
+from random_gen import RandomGen
+
+from data_structures.queue_adt import CircularQueue
+from data_structures.stack_adt import ArrayStack
+from data_structures.deque_adt import CircularDeque
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.parallel_sorted_list import ParallelArraySortedList
+from data_structures.bset import BSet
+
+TARGETS = [
+    (MonsterBase, "attack"),
+    (ComplexStats, "calculate"),
+    (EffectivenessCalculator, "get_effectiveness"),
+    (FrontBackend, "special"),
+    (BackBackend, "special"),
+    (OptimiseBackend, "add"),
+    (OptimiseBackend, "retrieve"),
+    (OptimiseBackend, "special"),
+    (ArrayStack, "push"),
+    (ArrayStack, "pop"),
+    (CircularQueue, "append"),
+    (CircularQueue, "serve"),
+    (CircularDeque, "push"),
+    (CircularDeque, "pop"),
+    (CircularDeque, "append"),
+    (CircularDeque, "serve"),
+    (CircularDeque, "reverse"),
+    (CircularDeque, "rotate"),
+    (ArraySortedList, "add"),
+    (ArraySortedList, "delete_at_index"),
+    (ParallelArraySortedList, "add_pair"),
+    (ParallelArraySortedList, "append_sorted"),
+    (ParallelArraySortedList, "delete_value_at_index"),
+    (BSet, "add"),
+    (BSet, "remove"),
+    (BSet, "__contains__"),
+]
+
+
+class FunctionStats:
+    """
+    Counters for one instrumented function.
+
+    Attributes:
+        calls (int): number of calls
+        primitive_calls (int): calls that were not recursive
+        total_time (float): time spent in the function, excluding instrumented callees
+        cumulative_time (float): time spent in the function including callees
+        callers (dict): the same four counters, split by instrumented caller
+    """
+
+    def __init__(self, label: str, code_key: tuple) -> None:
+        self.label = label
+        self.code_key = code_key
+        self.calls = 0
+        self.primitive_calls = 0
+        self.total_time = 0.0
+        self.cumulative_time = 0.0
+        self.active = 0
+        self.callers = {}
+
+
+class Instrumentation:
+    """
+    Patches the functions in TARGETS with counting and timing wrappers.
+
+    Attributes:
+        stats (dict[str, FunctionStats]): counters for each instrumented function
+        enabled (bool): whether the wrappers are currently installed
+    """
+
+    def __init__(self, targets: list[tuple[type, str]] | None = None, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.targets = targets if targets is not None else TARGETS
+        self.clock = clock
+        self.stats: dict[str, FunctionStats] = {}
+        self.originals = []
+        self.stack = []
+        self.enabled = False
+
+    def __enter__(self) -> Instrumentation:
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def enable(self) -> None:
+        """
+        Installs the wrappers.
+
+        :complexity: O(t) where t is the number of targets
+        """
+        if self.enabled:
+            return
+        for owner, name in self.targets:
+            original = owner.__dict__[name]
+            self.originals.append((owner, name, original))
+            setattr(owner, name, self._wrap(owner, name, original))
+        self.enabled = True
+
+    def disable(self) -> None:
+        """
+        Restores the original functions. Counters are kept.
+
+        :complexity: O(t) where t is the number of targets
+        """
+        for owner, name, original in self.originals:
+            setattr(owner, name, original)
+        self.originals = []
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Clears all counters."""
+        self.stats = {}
+
+    def _wrap(self, owner: type, name: str, original):
+        """
+        Builds the counting wrapper for one function, keeping classmethods as classmethods.
+
+        :complexity: O(1)
+        """
+        wrap_as = None
+        func = original
+        if isinstance(original, (classmethod, staticmethod)):
+            wrap_as = type(original)
+            func = original.__func__
+
+        label = f"{owner.__name__}.{name}"
+        code = func.__code__
+        entry = self.stats.get(label)
+        if entry is None:
+            entry = self.stats[label] = FunctionStats(label, (code.co_filename, code.co_firstlineno, code.co_name))
+        stack = self.stack
+        clock = self.clock
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            caller = stack[-1][0] if stack else None
+            frame = [entry, 0.0]
+            stack.append(frame)
+            entry.active += 1
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                stack.pop()
+                entry.active -= 1
+                own = elapsed - frame[1]
+                recursive = entry.active > 0
+                entry.calls += 1
+                entry.total_time += own
+                if not recursive:
+                    entry.primitive_calls += 1
+                    entry.cumulative_time += elapsed
+                if stack:
+                    stack[-1][1] += elapsed
+                if caller is not None:
+                    counts = entry.callers.get(caller.label, (0, 0, 0.0, 0.0))
+                    entry.callers[caller.label] = (
+                        counts[0] + (0 if recursive else 1), counts[1] + 1,
+                        counts[2] + own, counts[3] + (0.0 if recursive else elapsed),
+                    )
+
+        return wrap_as(wrapper) if wrap_as is not None else wrapper
+
+    def report(self) -> str:
+        """
+        A table of the instrumented functions, most expensive first.
+
+        :complexity: O(t log t) where t is the number of targets
+        """
+        rows = sorted(self.stats.values(), key=lambda entry: entry.cumulative_time, reverse=True)
+        lines = [f"{'function':<44}{'calls':>12}{'self (s)':>12}{'cumul (s)':>12}{'per call (us)':>15}"]
+        for entry in rows:
+            if entry.calls == 0:
+                continue
+            per_call = entry.cumulative_time / entry.primitive_calls * 1e6 if entry.primitive_calls else 0.0
+            lines.append(f"{entry.label:<44}{entry.calls:>12}{entry.total_time:>12.4f}{entry.cumulative_time:>12.4f}{per_call:>15.2f}")
+        return "\n".join(lines)
+
+    def to_pstats_dict(self) -> dict:
+        """
+        The counters in the format cProfile gives to pstats:
+        {(file, line, name): (primitive calls, calls, total time, cumulative time, callers)}
+
+        :complexity: O(t) where t is the number of targets
+        """
+        labels = {label: entry.code_key for label, entry in self.stats.items()}
+        result = {}
+        for entry in self.stats.values():
+            if entry.calls == 0:
+                continue
+            callers = {labels[label]: counts for label, counts in entry.callers.items()}
+            result[entry.code_key] = (entry.primitive_calls, entry.calls, entry.total_time, entry.cumulative_time, callers)
+        return result
+
+    def dump_stats(self, path: str) -> None:
+        """
+        Writes the counters to a file that pstats.Stats (and tools such as snakeviz) can load.
+
+        :complexity: O(t) where t is the number of targets
+        """
+        with open(path, "wb") as f:
+            marshal.dump(self.to_pstats_dict(), f)
+
+
+def run_tower(seed: int, n_teams: int, max_battles: int | None = None) -> int:
+    """
+    Runs a seeded tower with a random player team.
+
+    :returns: The number of battles fought
+    :complexity: O(b * m) where b is the number of battles and m the cost of one battle
+    """
+    from battle import Battle
+    from tower import BattleTower
+
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+    tower.generate_teams(n_teams)
+    battles = 0
+    while tower.battles_remaining() and (max_battles is None or battles < max_battles):
+        tower.next_battle()
+        battles += 1
+    return battles
+
+
+def profile_tower(seed: int = 0, n_teams: int = 100, max_battles: int | None = None) -> Instrumentation:
+    """
+    Runs a seeded tower with the instrumentation enabled.
+
+    :complexity: Same as run_tower
+    """
+    with Instrumentation() as inst:
+        run_tower(seed, n_teams, max_battles)
+    return inst
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Count and time the hot paths of a BattleTower run.")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--teams", type=int, default=100, help="Number of enemy teams.")
+    p.add_argument("--max-battles", type=int, default=None)
+    p.add_argument("--dump", help="Write a pstats-compatible file of the instrumented functions.")
+    p.add_argument("--cprofile", help="Also run the tower under cProfile and write its stats here.")
+    args = p.parse_args()
+
+    inst = profile_tower(args.seed, args.teams, args.max_battles)
+    print(inst.report())
+    if args.dump:
+        inst.dump_stats(args.dump)
+    if args.cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.runcall(run_tower, args.seed, args.teams, args.max_battles)
+        profiler.dump_stats(args.cprofile)
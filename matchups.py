@@ -0,0 +1,366 @@
+"""
+Precomputed 1v1 matchup matrix for every spawnable monster.
+
+Every spawnable monster is battled against every other spawnable monster at
+each level from 1 to `max_level`, using both the simple and complex stats.
+The outcomes (winner, turns taken and the winner's remaining HP) are stored in
+flat typed arrays so any single matchup can be queried in O(1).
+
+Computing the matrix is embarrassingly parallel, so rows are farmed out to a
+process pool. The finished matrix is cached to disk as a small binary file
+whose header records a hash of `monsters.yaml` and `type_effectiveness.csv`,
+so editing either file invalidates the cache automatically.
+
+Usage:
+```
+matrix = MatchupMatrix.load_or_compute(max_level=5)
+result, turns, hp = matrix.outcome(Flamikin, Vineon, level=3)
+```
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING
+
+from battle import Battle
+from team import MonsterTeam
+from helpers import get_all_monsters
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+MONSTERS_FILE = "monsters.yaml"
+EFFECTIVENESS_FILE = "type_effectiveness.csv"
+CACHE_DIR = ".matchup_cache"
+
+
+def source_hash() -> bytes:
+    """
+    Hashes the data files that determine the outcome of a battle.
+
+    :returns: The sha256 digest of monsters.yaml followed by type_effectiveness.csv
+    :complexity: O(f) where f is the combined size of both files
+    """
+    digest = hashlib.sha256()
+    for path in (MONSTERS_FILE, EFFECTIVENESS_FILE):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+def spawnable_monsters() -> ArrayR[type[MonsterBase]]:
+    """
+    Returns every spawnable monster class, in the order of get_all_monsters()
+
+    :complexity: O(a) where a is the number of monsters in the game
+    """
+    monsters = get_all_monsters()
+    n_spawnable = 0
+    for i in range(len(monsters)):
+        if monsters[i].can_be_spawned():
+            n_spawnable += 1
+
+    spawnable = ArrayR(n_spawnable)
+    idx = 0
+    for i in range(len(monsters)):
+        if monsters[i].can_be_spawned():
+            spawnable[idx] = monsters[i]
+            idx += 1
+    return spawnable
+
+
+def solo_team(monster: type[MonsterBase], simple_mode: bool = True, level: int = 1) -> MonsterTeam:
+    """
+    Builds a team holding a single monster at the given level.
+
+    :complexity: O(1)
+    """
+    team = MonsterTeam(
+        team_mode=MonsterTeam.TeamMode.BACK,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR(0),
+    )
+    team.add_to_team(monster(simple_mode, level))
+    team.monsters.append(monster(simple_mode, level))
+    return team
+
+
+def one_v_one(monster1: type[MonsterBase], monster2: type[MonsterBase], level: int = 1, simple_mode: bool = True) -> tuple[Battle.Result, int, int]:
+    """
+    Battles two single monster teams against each other.
+
+    :returns: A tuple of the battle result, the number of turns taken and the HP
+    the winning monster had left (0 for a draw)
+    :complexity: O(m) where m is the total health of the weaker monster
+    """
+    battle = Battle(verbosity=0)
+    result = battle.battle(solo_team(monster1, simple_mode, level), solo_team(monster2, simple_mode, level))
+    if result == Battle.Result.TEAM1:
+        hp = battle.out1.get_hp()
+    elif result == Battle.Result.TEAM2:
+        hp = battle.out2.get_hp()
+    else:
+        hp = 0
+    return result, battle.turn_number, hp
+
+
+def _compute_row(task: tuple[int, int, int]) -> tuple[int, int, array, array, array]:
+    """
+    Computes every matchup of one spawnable monster at every level for one stats mode.
+    Defined at module level so it can be sent to worker processes.
+
+    :param task: A tuple of (mode index, row index, max level)
+    :complexity: O(s * L * m) where s is the number of spawnable monsters, L the max level
+    and m the cost of a single battle
+    """
+    mode, i, max_level = task
+    spawnable = spawnable_monsters()
+    winners = array("b")
+    turns = array("i")
+    hp = array("i")
+    for j in range(len(spawnable)):
+        for level in range(1, max_level + 1):
+            result, n_turns, remaining = one_v_one(spawnable[i], spawnable[j], level, mode == MatchupMatrix.SIMPLE)
+            winners.append(result.value)
+            turns.append(n_turns)
+            hp.append(remaining)
+    return mode, i, winners, turns, hp
+
+
+class MatchupMatrix:
+    """
+    Outcome of every spawnable x spawnable x level battle for simple and complex stats.
+
+    Attributes:
+        names (ArrayR[str]): names of the spawnable monsters, in matrix order
+        max_level (int): the highest level battled
+        digest (bytes): hash of the data files the matrix was computed from
+        winners (array): Battle.Result values
+        turns (array): turns taken by each battle
+        hp (array): HP left on the winning monster
+    """
+
+    MAGIC = b"MUMX"
+    VERSION = 1
+    HEADER = struct.Struct("<4sH32sHH")
+
+    SIMPLE = 0
+    COMPLEX = 1
+    N_MODES = 2
+
+    def __init__(self, names: ArrayR[str], max_level: int, digest: bytes) -> None:
+        """
+        Creates an empty matrix
+
+        :complexity: O(s^2 * L) where s is the number of monsters and L the max level
+        """
+        if max_level < 1:
+            raise ValueError("max_level should be at least 1.")
+        self.names = names
+        self.max_level = max_level
+        self.digest = digest
+        self.index_of = {}
+        for i in range(len(names)):
+            self.index_of[names[i]] = i
+
+        size = self.N_MODES * len(names) * len(names) * max_level
+        self.winners = array("b", bytes(size))
+        self.turns = array("i", bytes(size * 4))
+        self.hp = array("i", bytes(size * 4))
+
+    def __len__(self) -> int:
+        """Number of monsters along each side of the matrix"""
+        return len(self.names)
+
+    def _offset(self, mode: int, i: int, j: int, level: int) -> int:
+        """
+        Index of a matchup in the flat arrays.
+
+        :complexity: O(1)
+        """
+        n = len(self.names)
+        return ((mode * n + i) * n + j) * self.max_level + (level - 1)
+
+    def _index(self, monster: type[MonsterBase] | str) -> int:
+        """
+        Row/column of a monster given its class or name.
+
+        :raises KeyError: if the monster is not a spawnable monster
+        :complexity: O(1)
+        """
+        name = monster if isinstance(monster, str) else monster.get_name()
+        return self.index_of[name]
+
+    def outcome(self, monster1: type[MonsterBase] | str, monster2: type[MonsterBase] | str, level: int = 1, simple_mode: bool = True) -> tuple[Battle.Result, int, int]:
+        """
+        Looks up the result of monster1 battling monster2 when both start at `level`.
+
+        :returns: A tuple of the battle result, the number of turns taken and the HP
+        the winning monster had left
+        :raises KeyError: if either monster is not spawnable
+        :raises ValueError: if the level was not computed
+        :complexity: O(1)
+        """
+        if not 1 <= level <= self.max_level:
+            raise ValueError(f"level {level} is outside of 1..{self.max_level}")
+        mode = self.SIMPLE if simple_mode else self.COMPLEX
+        offset = self._offset(mode, self._index(monster1), self._index(monster2), level)
+        return Battle.Result(self.winners[offset]), self.turns[offset], self.hp[offset]
+
+    def winner(self, monster1: type[MonsterBase] | str, monster2: type[MonsterBase] | str, level: int = 1, simple_mode: bool = True) -> Battle.Result:
+        """
+        Looks up just the result of monster1 battling monster2.
+
+        :complexity: O(1)
+        """
+        return self.outcome(monster1, monster2, level, simple_mode)[0]
+
+    @classmethod
+    def compute(cls, max_level: int = 10, workers: int | None = None) -> MatchupMatrix:
+        """
+        Battles every pair of spawnable monsters at every level.
+
+        :param max_level: The highest level to battle at
+        :param workers: The number of worker processes. 1 computes in this process,
+        None uses one per core.
+        :complexity: O(s^2 * L * m) where s is the number of spawnable monsters,
+        L the max level and m the cost of a single battle
+        """
+        spawnable = spawnable_monsters()
+        names = ArrayR(len(spawnable))
+        for i in range(len(spawnable)):
+            names[i] = spawnable[i].get_name()
+        matrix = cls(names, max_level, source_hash())
+
+        tasks = [(mode, i, max_level) for mode in range(cls.N_MODES) for i in range(len(spawnable))]
+        if workers == 1:
+            rows = map(_compute_row, tasks)
+            matrix._fill(rows)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                matrix._fill(pool.map(_compute_row, tasks))
+        return matrix
+
+    def _fill(self, rows) -> None:
+        """
+        Copies computed rows into the flat arrays.
+
+        :complexity: O(s^2 * L) in total over all rows
+        """
+        row_size = len(self.names) * self.max_level
+        for mode, i, winners, turns, hp in rows:
+            start = self._offset(mode, i, 0, 1)
+            self.winners[start:start + row_size] = winners
+            self.turns[start:start + row_size] = turns
+            self.hp[start:start + row_size] = hp
+
+    def save(self, path: str) -> None:
+        """
+        Writes the matrix to a binary file. Arrays are stored little-endian.
+
+        :complexity: O(s^2 * L)
+        """
+        with open(path, "wb") as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.digest, len(self.names), self.max_level))
+            for i in range(len(self.names)):
+                encoded = self.names[i].encode()
+                f.write(struct.pack("<B", len(encoded)))
+                f.write(encoded)
+            for column in (self.winners, self.turns, self.hp):
+                if sys.byteorder == "big":
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                f.write(column.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> MatchupMatrix:
+        """
+        Reads a matrix written by save()
+
+        :raises ValueError: if the file is not a matrix file of this version, or is truncated
+        :complexity: O(s^2 * L)
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < cls.HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, digest, n, max_level = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"{path} is not a version {cls.VERSION} matchup file")
+        pos = cls.HEADER.size
+        names = ArrayR(n)
+        for i in range(n):
+            if pos >= len(data):
+                raise ValueError(f"{path} is truncated")
+            length = data[pos]
+            names[i] = data[pos + 1:pos + 1 + length].decode()
+            pos += 1 + length
+
+        matrix = cls(names, max_level, digest)
+        for column in (matrix.winners, matrix.turns, matrix.hp):
+            n_bytes = len(column) * column.itemsize
+            if pos + n_bytes > len(data):
+                raise ValueError(f"{path} is truncated")
+            column[:] = array(column.typecode, data[pos:pos + n_bytes])
+            if sys.byteorder == "big":
+                column.byteswap()
+            pos += n_bytes
+        if pos != len(data):
+            raise ValueError(f"{path} has {len(data) - pos} unexpected trailing bytes")
+        return matrix
+
+    @classmethod
+    def cache_path(cls, max_level: int, cache_dir: str = CACHE_DIR, digest: bytes | None = None) -> str:
+        """
+        The file a matrix for the current data files would be cached at.
+
+        :complexity: O(f) where f is the size of the data files, O(1) if the digest is given
+        """
+        digest = digest or source_hash()
+        return os.path.join(cache_dir, f"matchups_{digest.hex()[:16]}_L{max_level}.bin")
+
+    @classmethod
+    def load_or_compute(cls, max_level: int = 10, cache_dir: str = CACHE_DIR, workers: int | None = None) -> MatchupMatrix:
+        """
+        Loads the cached matrix for the current data files, computing and caching it if needed.
+
+        :complexity: O(s^2 * L) on a cache hit, see compute() otherwise
+        """
+        digest = source_hash()
+        path = cls.cache_path(max_level, cache_dir, digest)
+        if os.path.exists(path):
+            try:
+                matrix = cls.load(path)
+                if matrix.digest == digest and matrix.max_level == max_level:
+                    return matrix
+            except (ValueError, struct.error):
+                pass
+
+        matrix = cls.compute(max_level, workers)
+        os.makedirs(cache_dir, exist_ok=True)
+        matrix.save(path)
+        return matrix
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Compute the 1v1 matchup matrix for all spawnable monsters.")
+    p.add_argument("--max-level", type=int, default=10, help="Highest level to battle at.")
+    p.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    p.add_argument("--cache-dir", default=CACHE_DIR, help="Where to cache the computed matrix.")
+    args = p.parse_args()
+
+    matrix = MatchupMatrix.load_or_compute(args.max_level, args.cache_dir, args.workers)
+    for i in range(len(matrix)):
+        wins = 0
+        for j in range(len(matrix)):
+            if matrix.winner(matrix.names[i], matrix.names[j], 1) == Battle.Result.TEAM1:
+                wins += 1
+        print(f"{matrix.names[i]}: {wins}/{len(matrix)} wins at LV.1")
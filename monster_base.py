@@ -45,19 +45,27 @@ class MonsterBase(abc.ABC):
 
     def get_attack(self):
         """Get the attack of this monster instance"""
-        return self.stats.get_attack()
+        if self.simple_mode:
+            return self.stats.get_attack()
+        return self.stats.get_attack(self.curr_level)
 
     def get_defense(self):
         """Get the defense of this monster instance"""
-        return self.stats.get_defense()
+        if self.simple_mode:
+            return self.stats.get_defense()
+        return self.stats.get_defense(self.curr_level)
 
     def get_speed(self):
         """Get the speed of this monster instance"""
-        return self.stats.get_speed()
+        if self.simple_mode:
+            return self.stats.get_speed()
+        return self.stats.get_speed(self.curr_level)
 
     def get_max_hp(self):
         """Get the maximum HP of this monster instance"""
-        return self.stats.get_max_hp()
+        if self.simple_mode:
+            return self.stats.get_max_hp()
+        return self.stats.get_max_hp(self.curr_level)
 
     def alive(self) -> bool:
         """Whether the current monster instance is alive (HP > 0 )"""
@@ -1,9 +1,31 @@
 import argparse
+import functools
 import re
+import sys
 import unittest
 from io import StringIO
 
 from ed_utils.json_test_runner import JSONTestRunner
+from ed_utils.parallel_runner import ParallelTestRunner
+
+
+def filter_suite(suite, task, advanced):
+    """Removes the tests not matching the task number, and advanced tests unless requested."""
+    for s in suite:
+        for t in s:
+            if "FailedTest" in str(type(t)):
+                continue
+            marked_remove = set()
+            for t2 in t:
+                func = getattr(t2, t2._testMethodName)
+                if getattr(func, "__advanced__", None) is True and not advanced:
+                    marked_remove.add(t2)
+                elif task and not re.match(rf"^{task}\.", getattr(func, "__number__", "")):
+                    marked_remove.add(t2)
+            for t2 in marked_remove:
+                t._tests.remove(t2)
+    return suite
+
 
 if __name__ == "__main__":
 
@@ -31,23 +53,30 @@ if __name__ == "__main__":
         help="Use if running on Ed.",
         action="store_true",
     )
+    p.add_argument(
+        "-j",
+        "--jobs",
+        help="Run the tests across this many worker processes.",
+        type=int,
+        default=1,
+    )
+    p.add_argument(
+        "--durations",
+        help="With -j, list this many of the slowest tests (0 for none).",
+        type=int,
+        default=10,
+    )
     args = p.parse_args()
 
-    suite = unittest.defaultTestLoader.discover('test_actual' if args.for_ed else '.')
-    for s in suite:
-        for t in s:
-            if "FailedTest" in str(type(t)):
-                continue
-            marked_remove = set()
-            for t2 in t:
-                func = getattr(t2, t2._testMethodName)
-                if getattr(func, "__advanced__", None) is True and not args.advanced:
-                    marked_remove.add(t2)
-                elif args.task and not re.match(rf"^{args.task}\.", getattr(func, "__number__", "")):
-                    marked_remove.add(t2)
-            for t2 in marked_remove:
-                t._tests.remove(t2)
-    if args.for_ed:
+    discover = functools.partial(unittest.defaultTestLoader.discover, 'test_actual' if args.for_ed else '.')
+    suite = filter_suite(discover(), args.task, args.advanced)
+    if args.jobs > 1:
+        if args.for_ed:
+            runner = ParallelTestRunner(discover, args.jobs, stream=sys.stdout, json_output=True)
+        else:
+            runner = ParallelTestRunner(discover, args.jobs, durations=args.durations)
+        runner.run(suite)
+    elif args.for_ed:
         f = StringIO("")
         runner = JSONTestRunner(stream=f)
         runner.run(suite)
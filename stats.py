@@ -3,8 +3,7 @@ import math
 
 from data_structures.referential_array import ArrayR
 from data_structures.stack_adt import ArrayStack
-from data_structures.array_sorted_list import ArraySortedList
-from data_structures.sorted_list_adt import ListItem
+from data_structures.parallel_sorted_list import ParallelArraySortedList
 
 class Stats(abc.ABC):
 
@@ -49,8 +48,16 @@ class ComplexStats(Stats):
 
     """Unless otherwise stated, the complexity of each of the methods in the class are O(n) 
     where n is the number of elements in the given formula.
+
+    Formulas are folded once, when the stats are created: sub-expressions without `level`
+    are replaced by their value, and a formula without `level` at all is stored as a number,
+    so reading that stat is an attribute lookup.
     """
 
+    STAT_NAMES = ("attack", "defense", "speed", "max_hp")
+    # Number of operands each operator pops
+    ARITY = {"sqrt": 1, "power": 2, "+": 2, "-": 2, "*": 2, "/": 2, "middle": 3}
+
     def __init__(
         self,
         attack_formula: ArrayR[str],
@@ -63,6 +70,10 @@ class ComplexStats(Stats):
         self.speed_formula = speed_formula
         self.max_hp_formula = max_hp_formula
 
+        self.attack_folded, self.attack_value = self.fold(attack_formula)
+        self.defense_folded, self.defense_value = self.fold(defense_formula)
+        self.speed_folded, self.speed_value = self.fold(speed_formula)
+        self.max_hp_folded, self.max_hp_value = self.fold(max_hp_formula)
 
     def get_attack(self, level: int):
         """
@@ -70,7 +81,9 @@ class ComplexStats(Stats):
 
         :param level: The level of the monster
         """
-        return self.calculate(self.attack_formula, level)
+        if self.attack_value is not None:
+            return self.attack_value
+        return self.calculate(self.attack_folded, level)
 
     def get_defense(self, level: int):
         """
@@ -78,7 +91,9 @@ class ComplexStats(Stats):
 
         :param level: The level of the monster
         """
-        return self.calculate(self.defense_formula, level)
+        if self.defense_value is not None:
+            return self.defense_value
+        return self.calculate(self.defense_folded, level)
 
     def get_speed(self, level: int):
         """
@@ -86,7 +101,9 @@ class ComplexStats(Stats):
 
         :param level: The level of the monster
         """
-        return self.calculate(self.speed_formula, level)
+        if self.speed_value is not None:
+            return self.speed_value
+        return self.calculate(self.speed_folded, level)
 
     def get_max_hp(self, level: int):
         """
@@ -94,7 +111,9 @@ class ComplexStats(Stats):
 
         :param level: The level of the monster
         """
-        return self.calculate(self.max_hp_formula, level)
+        if self.max_hp_value is not None:
+            return self.max_hp_value
+        return self.calculate(self.max_hp_folded, level)
     
     def calculate(self, formula : ArrayR[str], level: int) -> int:
         """
@@ -109,7 +128,14 @@ class ComplexStats(Stats):
         :return: An integer representing the final result of calculating the formula
         :complexity: O(n) both best/worst case where n is the number of elements in the formula
         """
-        
+        return int(self.evaluate(formula, level))
+
+    def evaluate(self, formula: ArrayR[str], level: int) -> float:
+        """
+        Calculates the formula like calculate, without rounding the result down to an integer.
+
+        :complexity: O(n) both best/worst case where n is the number of elements in the formula
+        """
         stack = ArrayStack[str](len(formula))
         for i in range (len(formula)):
             top = formula[i]
@@ -126,11 +152,11 @@ class ComplexStats(Stats):
                     b= stack.pop()
                     if top == "middle":
                         c = stack.pop()
-                        sorted_list = ArraySortedList[int](3)
-                        sorted_list.add(ListItem(a, a))
-                        sorted_list.add(ListItem(b, b))
-                        sorted_list.add(ListItem(c, c))
-                        stack.push(sorted_list[1].value) #the median will be the value in the middle of the sorted list so we can just grab that value and push it onto the stack
+                        sorted_list = ParallelArraySortedList[int](3)
+                        sorted_list.add_pair(a, a)
+                        sorted_list.add_pair(b, b)
+                        sorted_list.add_pair(c, c)
+                        stack.push(sorted_list.value_at(1)) #the median will be the value in the middle of the sorted list so we can just grab that value and push it onto the stack
                     else:
                         if top == "power":
                             res = math.pow(b,a)
@@ -148,10 +174,62 @@ class ComplexStats(Stats):
                 raise Exception(f"{top} is either not a valid operator or number")
         
         if len(stack) == 1: #The stack must only have one item left in the stack
-            return int(stack.pop()) 
+            return stack.pop()
         else:
             raise ValueError("Invalid expression, not enough operators")
         
+    def fold(self, formula: ArrayR[str]) -> tuple[ArrayR[str], int | None]:
+        """
+        Folds the constant sub-expressions of a formula.
+
+        :implementation:
+            The formula is run on a stack like in calculate, but each item is the list of tokens
+            of a sub-expression together with its value, or None if it depends on the level.
+            An operator over values only is computed straight away, any other is written out.
+            A formula that would fail in calculate is kept as it is, so it fails there, when read.
+
+        :param formula: An array containing the reverse polish notation for the equation
+        :return: The folded formula, and its value if it does not depend on the level, else None
+        :complexity: O(n^2) worst case where n is the number of elements in the formula, as
+            sub-expressions are copied when combined. Formulas are only folded once.
+        """
+        stack = ArrayStack[tuple](max(len(formula), 1))
+        try:
+            for i in range(len(formula)):
+                top = formula[i]
+                if top == "level":
+                    stack.push(([top], None))
+                elif self.is_float(top):
+                    stack.push(([top], float(top)))
+                elif top in ComplexStats.ARITY:
+                    operands = [stack.pop() for _ in range(ComplexStats.ARITY[top])]
+                    if all(value is not None for _, value in operands):
+                        value = self.evaluate(ArrayR.from_list(
+                            [tokens[0] for tokens, _ in reversed(operands)] + [top]
+                        ), 0)
+                        stack.push(([repr(value)], value))
+                    else:
+                        tokens = []
+                        for operand_tokens, _ in reversed(operands):
+                            tokens += operand_tokens
+                        stack.push((tokens + [top], None))
+                else:
+                    return formula, None
+            if len(stack) != 1:
+                return formula, None
+            tokens, value = stack.pop()
+            return ArrayR.from_list(tokens), None if value is None else int(value)
+        except Exception:
+            return formula, None
+
+    def level_dependent(self) -> list[str]:
+        """
+        Names of the stats whose formula still depends on the level once folded.
+
+        :complexity: O(1)
+        """
+        return [name for name in ComplexStats.STAT_NAMES if getattr(self, name + "_value") is None]
+
     def is_float(self, x):
         try:
             float(x)
@@ -1,17 +1,19 @@
 from __future__ import annotations
+import abc
 from enum import auto
+from operator import methodcaller
 from typing import Optional, TYPE_CHECKING
 
 from base_enum import BaseEnum
 from monster_base import MonsterBase
 from random_gen import RandomGen
 from helpers import get_all_monsters
+from battle_cache import deterministic_policy
 
 from data_structures.referential_array import ArrayR
 from data_structures.queue_adt import CircularQueue
-from data_structures.stack_adt import ArrayStack
-from data_structures.array_sorted_list import ArraySortedList
-from data_structures.sorted_list_adt import ListItem
+from data_structures.deque_adt import CircularDeque
+from data_structures.parallel_sorted_list import ParallelArraySortedList
 
 
 if TYPE_CHECKING:
@@ -51,25 +53,14 @@ class MonsterTeam:
         :complexity: O(1)
         """
 
-        if sort_mode == self.SortMode.HP:
-            return monster.get_hp()
-        elif sort_mode == self.SortMode.ATTACK:
-            return monster.get_attack()
-        elif sort_mode == self.SortMode.DEFENSE:
-            return monster.get_defense()
-        elif sort_mode == self.SortMode.SPEED:
-            return monster.get_speed()
-        elif sort_mode == self.SortMode.LEVEL:
-            return monster.get_level()
-        
-        
+        return SORT_KEYS[sort_mode](monster)
 
     def __init__(self, team_mode: TeamMode, selection_mode, **kwargs) -> None:
         """
         The function initializes a team of monsters based on the team mode and selection mode provided.
         
         :implementation:
-            We use a different data structure for each team mode.
+            We use a different data structure for each team mode, managed by the team's backend.
             For the front team mode we use a stack as the monster last added is the one that is retrieved first
             For the back team mode we use a queue here as the monster first added is the one that is retrieved first
             For the optimise team mode we use a sorted list data structure since it is able to sort monsters when they are being added
@@ -102,15 +93,20 @@ class MonsterTeam:
         self.lives = 1
 
         if team_mode == self.TeamMode.FRONT:
-            self.team = ArrayStack[MonsterBase](self.TEAM_LIMIT) 
+            self.backend = FrontBackend(self)
         elif team_mode == self.TeamMode.BACK:
-            self.team = CircularQueue[MonsterBase](self.TEAM_LIMIT)
+            self.backend = BackBackend(self)
         elif team_mode == self.TeamMode.OPTIMISE:
             self.sort_mode = kwargs.get('sort_key')
             self.descending = True 
-            self.team = ArraySortedList(self.TEAM_LIMIT) 
+            self.backend = OptimiseBackend(self, self.sort_mode)
         else:
             raise ValueError(f"team_mode {team_mode} not supported.")
+        self.team = self.backend.storage
+        # Calls go straight to the backend rather than through the methods below, which document them.
+        self.add_to_team = self.backend.add
+        self.retrieve_from_team = self.backend.retrieve
+        self.special = self.backend.special
 
         self.monsters = CircularQueue[MonsterBase](self.TEAM_LIMIT) #Keeping a track of the team for revival.
         
@@ -150,14 +146,9 @@ class MonsterTeam:
             
             where n is the number of monsters in the team 
         """
-        if self.team_mode == self.TeamMode.FRONT:
-            self.team.push(monster)
-        elif self.team_mode == self.TeamMode.BACK:
-            self.team.append(monster)
-        elif self.team_mode == self.TeamMode.OPTIMISE:
-            self.optimise_add(self.team, monster)
-
-    def optimise_add(self, team : ArraySortedList, monster : MonsterBase) -> None:
+        self.backend.add(monster)
+
+    def optimise_add(self, team : ParallelArraySortedList, monster : MonsterBase) -> None:
         """
         The function optimise_add adds a monster to a team with a specific sorting mode.
         
@@ -165,11 +156,9 @@ class MonsterTeam:
         :param monster: The "monster" parameter is an object representing a monster. 
         """
         if self.descending:
-            item = ListItem(monster, -1 * self.mapping(monster, self.sort_mode))
-            team.add(item)
+            team.add_pair(monster, -1 * self.backend.key(monster))
         else:
-            item = ListItem(monster, self.mapping(monster, self.sort_mode))
-            team.add(item)
+            team.add_pair(monster, self.backend.key(monster))
 
     def retrieve_from_team(self) -> MonsterBase:
         """
@@ -195,12 +184,7 @@ class MonsterTeam:
 
         where n is the number of monsters in the team
         """
-        if self.team_mode == self.TeamMode.FRONT:
-            return self.team.pop()
-        elif self.team_mode == self.TeamMode.BACK:
-            return self.team.serve()            
-        elif self.team_mode == self.TeamMode.OPTIMISE:
-            return self.team.delete_at_index(0).value
+        return self.backend.retrieve()
 
     def special(self) -> None:
         """
@@ -208,11 +192,9 @@ class MonsterTeam:
 
         :implementation:
             Based on which team mode is selected, special will be executed differently.
-            FRONT: The first 3 monsters in the team will be appended into a queue and then pushed back onto the stack.
-            This will effectively reverse the order of the first 3 monsters in the team
-            BACK: The first half of the team will be appended into a queue and the second half will be pushed onto the stack.
-            Then the second half of the team will be appended back into the queue and then the first half of the team will be 
-            appended back into the queue.
+            FRONT: The first 3 monsters in the team are reversed in place in the team's deque.
+            BACK: The second half of the team is reversed in place, then the first half is rotated to the back.
+            Neither needs a temporary container.
             OPTIMISE: The descending boolean flag will be set to its opposite value and then each monster will be reinserted back into
             the team.
 
@@ -226,6 +208,9 @@ class MonsterTeam:
         BACK:
             Best case: O(n)
             Worst case: O(n)
+
+            Reversing the second half is n/2 swaps. The rotation is O(1) when the team is full,
+            as only the deque's front moves, and at most n/2 moves otherwise.
         OPTIMISE:
             Best case: O(nlog(n))
             Worst case: O(n^2)
@@ -236,33 +221,7 @@ class MonsterTeam:
         where n is the number of monsters in the team. 
         """
 
-
-        if self.team_mode == self.TeamMode.FRONT:
-            temp_team_holder = CircularQueue[MonsterBase](min(3, len(self.team)))
-            for _ in range(min(3, len(self.team))):
-                temp_team_holder.append(self.team.pop())
-            for _ in range(len(temp_team_holder)):
-                self.team.push(temp_team_holder.serve())
-
-        elif self.team_mode == self.TeamMode.BACK:
-            first_half_size = len(self.team)//2
-            first_half_team = CircularQueue[MonsterBase](first_half_size)
-            second_half_team = ArrayStack[MonsterBase](len(self.team) - first_half_size) 
-            for _ in range(first_half_size):
-                first_half_team.append(self.team.serve())
-            for _ in range(len(self.team)):
-                second_half_team.push(self.team.serve())
-            for _ in range(len(second_half_team)):
-                self.team.append(second_half_team.pop())
-            for _ in range(len(first_half_team)):
-                self.team.append(first_half_team.serve())
-
-        elif self.team_mode == self.TeamMode.OPTIMISE:
-            temp = ArraySortedList[MonsterBase](len(self.team))
-            self.descending = not self.descending
-            for _ in range(len(self.team)): 
-                self.optimise_add(temp, self.retrieve_from_team())
-            self.team = temp
+        self.backend.special()
 
 
     def regenerate_team(self) -> None:
@@ -289,12 +248,7 @@ class MonsterTeam:
         where n is the number of monsters.
         """
 
-        if self.team_mode == self.TeamMode.FRONT or self.team_mode == self.TeamMode.BACK:
-            self.team.clear()
-
-        elif self.team_mode == self.TeamMode.OPTIMISE:
-            self.team.reset()
-            self.descending = True
+        self.backend.reset()
 
         for _ in range(len(self.monsters)):
                 monster = self.monsters.serve()
@@ -305,7 +259,16 @@ class MonsterTeam:
     def __len__(self):
         return len(self.team)
 
-    def select_randomly(self):
+    def monsters_in_order(self) -> ArrayR[MonsterBase]:
+        """
+        Returns the monsters currently in the team in the order they would be retrieved,
+        without removing them from the team.
+
+        :complexity: O(n) where n is the number of monsters in the team
+        """
+        return self.backend.in_order()
+
+    def select_randomly(self, **kwargs):
         """"
         Creates a random team of monsters
 
@@ -337,7 +300,7 @@ class MonsterTeam:
             else:
                 raise ValueError("Spawning logic failed.")
 
-    def select_manually(self):
+    def select_manually(self, **kwargs):
         """
         Prompt the user for input on selecting the team.
         Any invalid input should have the code prompt the user again.
@@ -478,6 +441,7 @@ class MonsterTeam:
             else:
                 raise ValueError("Too many monsters or a monster cannot be spawned")
             
+    @deterministic_policy
     def choose_action(self, currently_out: MonsterBase, enemy: MonsterBase) -> Battle.Action:
         # This is just a placeholder function that doesn't matter much for testing.
         from battle import Battle
@@ -487,3 +451,166 @@ class MonsterTeam:
             return Battle.Action.ATTACK
         return Battle.Action.SWAP
 
+
+# Gets the stat each SortMode sorts on.
+# methodcaller so monsters overriding a getter are sorted on their own stat.
+SORT_KEYS = {
+    MonsterTeam.SortMode.HP: methodcaller("get_hp"),
+    MonsterTeam.SortMode.ATTACK: methodcaller("get_attack"),
+    MonsterTeam.SortMode.DEFENSE: methodcaller("get_defense"),
+    MonsterTeam.SortMode.SPEED: methodcaller("get_speed"),
+    MonsterTeam.SortMode.LEVEL: methodcaller("get_level"),
+}
+
+
+class TeamBackend(abc.ABC):
+    """
+    How a team in one TeamMode stores its monsters. A backend is made for one team and
+    holds that team's ADT, which the team also keeps as MonsterTeam.team. The team binds
+    add_to_team, retrieve_from_team and special to the backend's methods once, when it
+    is created, so each operation is a single call with no check of the team mode.
+
+    Attributes:
+        owner (MonsterTeam): the team the backend stores monsters for
+        storage: the team's ADT, created by make_team()
+    """
+
+    def __init__(self, owner: MonsterTeam) -> None:
+        self.owner = owner
+        self.storage = self.make_team()
+
+    @abc.abstractmethod
+    def make_team(self):
+        """Creates the ADT holding the team's monsters."""
+        pass
+
+    @abc.abstractmethod
+    def add(self, monster: MonsterBase) -> None:
+        pass
+
+    @abc.abstractmethod
+    def retrieve(self) -> MonsterBase:
+        pass
+
+    @abc.abstractmethod
+    def special(self) -> None:
+        pass
+
+    def reset(self) -> None:
+        """Empties the team before it is regenerated."""
+        self.storage.clear()
+
+    @abc.abstractmethod
+    def in_order(self) -> ArrayR[MonsterBase]:
+        """The monsters in the team in the order they would be retrieved."""
+        pass
+
+
+class FrontBackend(TeamBackend):
+    """
+    FRONT teams: used as a stack, as the monster last added is the one retrieved first.
+    The top of the stack is the rear of a CircularDeque, so special reverses in place.
+    """
+
+    def __init__(self, owner: MonsterTeam) -> None:
+        TeamBackend.__init__(self, owner)
+        # Nothing to add to the deque's own operations, so the team calls them directly.
+        self.add = self.storage.append
+        self.retrieve = self.storage.pop
+
+    def make_team(self) -> CircularDeque[MonsterBase]:
+        return CircularDeque[MonsterBase](MonsterTeam.TEAM_LIMIT)
+
+    def add(self, monster: MonsterBase) -> None:
+        self.storage.push(monster)
+
+    def retrieve(self) -> MonsterBase:
+        return self.storage.pop()
+
+    def special(self) -> None:
+        self.storage.reverse(max(0, len(self.storage) - 3), len(self.storage))
+
+    def in_order(self) -> ArrayR[MonsterBase]:
+        ordered = ArrayR[MonsterBase](len(self.storage))
+        for i in range(len(self.storage)):
+            ordered[i] = self.storage[len(self.storage) - 1 - i]
+        return ordered
+
+
+class BackBackend(TeamBackend):
+    """
+    BACK teams: used as a queue, as the monster first added is the one retrieved first.
+    special reverses the second half of the CircularDeque in place, then rotates the
+    first half to the rear.
+    """
+
+    def __init__(self, owner: MonsterTeam) -> None:
+        TeamBackend.__init__(self, owner)
+        # Nothing to add to the deque's own operations, so the team calls them directly.
+        self.add = self.storage.append
+        self.retrieve = self.storage.serve
+
+    def make_team(self) -> CircularDeque[MonsterBase]:
+        return CircularDeque[MonsterBase](MonsterTeam.TEAM_LIMIT)
+
+    def add(self, monster: MonsterBase) -> None:
+        self.storage.append(monster)
+
+    def retrieve(self) -> MonsterBase:
+        return self.storage.serve()
+
+    def special(self) -> None:
+        first_half_size = len(self.storage)//2
+        self.storage.reverse(first_half_size, len(self.storage))
+        self.storage.rotate(first_half_size)
+
+    def in_order(self) -> ArrayR[MonsterBase]:
+        ordered = ArrayR[MonsterBase](len(self.storage))
+        for i in range(len(self.storage)):
+            ordered[i] = self.storage[i]
+        return ordered
+
+
+class OptimiseBackend(TeamBackend):
+    """
+    OPTIMISE teams: a sorted list, keyed on the sort mode's stat, negated while the team is descending.
+    The list keeps keys and monsters in parallel arrays, so no ListItem is created per add.
+    special re-sorts the same list, so the team's ADT is never replaced.
+
+    Attributes:
+        key (Callable[[MonsterBase], int] | None): gets the stat of the team's sort mode from a monster
+    """
+
+    def __init__(self, owner: MonsterTeam, sort_mode: MonsterTeam.SortMode | None) -> None:
+        self.key = SORT_KEYS[sort_mode] if sort_mode is not None else None
+        TeamBackend.__init__(self, owner)
+
+    def make_team(self) -> ParallelArraySortedList[MonsterBase]:
+        return ParallelArraySortedList(MonsterTeam.TEAM_LIMIT)
+
+    def add(self, monster: MonsterBase) -> None:
+        if self.owner.descending:
+            self.storage.add_pair(monster, -1 * self.key(monster))
+        else:
+            self.storage.add_pair(monster, self.key(monster))
+
+    def retrieve(self) -> MonsterBase:
+        return self.storage.delete_value_at_index(0)
+
+    def special(self) -> None:
+        # Re-adding in retrieval order keeps the order of equal keys as before.
+        monsters = self.in_order()
+        self.owner.descending = not self.owner.descending
+        self.storage.reset()
+        for i in range(len(monsters)):
+            self.add(monsters[i])
+
+    def reset(self) -> None:
+        self.storage.reset()
+        self.owner.descending = True
+
+    def in_order(self) -> ArrayR[MonsterBase]:
+        ordered = ArrayR[MonsterBase](len(self.storage))
+        for i in range(len(self.storage)):
+            ordered[i] = self.storage.value_at(i)
+        return ordered
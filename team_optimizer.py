@@ -0,0 +1,326 @@
+"""
+Genetic-algorithm search for strong monster teams.
+
+A TeamGenome is a team composition: its TeamMode, its OPTIMISE sort key and an
+ordered list of monsters. Fitness is the share of points (1 per win, 1/2 per
+draw) a composition scores against a fixed, seeded reference population,
+playing each reference team once as team 1 and once as team 2. Battles are
+deterministic, so each composition's fitness is cached and only new
+compositions are evaluated, in a process pool.
+
+Only spawnable monsters may be placed in a team, so the search is over the
+spawnable subset of monsters.yaml.
+
+Usage:
+```
+optimizer = TeamOptimizer(population_size=40, seed=1)
+best, fitness = optimizer.run(generations=30)
+print(best, fitness)
+```
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from helpers import get_all_monsters
+
+from data_structures.referential_array import ArrayR
+
+
+def spawnable_names() -> ArrayR[str]:
+    """
+    Names of the monsters that can be placed in a team, in monsters.yaml order.
+
+    :complexity: O(m) where m is the number of monsters
+    """
+    all_monsters = get_all_monsters()
+    names = []
+    for i in range(len(all_monsters)):
+        if all_monsters[i].can_be_spawned():
+            names.append(all_monsters[i].get_name())
+    return ArrayR.from_list(names)
+
+
+class TeamGenome:
+    """
+    A team composition.
+
+    Attributes:
+        team_mode (str): name of the TeamMode
+        sort_key (str | None): name of the SortMode, only for OPTIMISE teams
+        monsters (tuple[str, ...]): monster names, in the order they are provided to the team
+    """
+
+    def __init__(self, team_mode: str, sort_key: str | None, monsters: tuple[str, ...]) -> None:
+        self.team_mode = team_mode
+        self.sort_key = sort_key if team_mode == MonsterTeam.TeamMode.OPTIMISE.name else None
+        self.monsters = tuple(monsters)
+
+    def key(self) -> tuple:
+        return (self.team_mode, self.sort_key, self.monsters)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, TeamGenome) and self.key() == other.key()
+
+    def __hash__(self) -> int:
+        return hash(self.key())
+
+    def build(self, classes: dict) -> MonsterTeam:
+        """
+        Creates a fresh team with this composition.
+
+        :param classes: monster classes by name
+        :complexity: O(n log n) where n is the number of monsters
+        """
+        provided = ArrayR.from_list([classes[name] for name in self.monsters])
+        sort_key = MonsterTeam.SortMode[self.sort_key] if self.sort_key else None
+        return MonsterTeam(MonsterTeam.TeamMode[self.team_mode], MonsterTeam.SelectionMode.PROVIDED,
+                           provided_monsters=provided, sort_key=sort_key)
+
+    @classmethod
+    def random(cls, names: ArrayR[str], size: int) -> TeamGenome:
+        """
+        A random composition from RandomGen.
+
+        :complexity: O(size)
+        """
+        modes = MonsterTeam.TeamMode.__members__
+        sorts = MonsterTeam.SortMode.__members__
+        team_mode = list(modes)[RandomGen.randint(0, len(modes) - 1)]
+        sort_key = list(sorts)[RandomGen.randint(0, len(sorts) - 1)]
+        return cls(team_mode, sort_key, tuple(RandomGen.random_choice(names) for _ in range(size)))
+
+    def __str__(self) -> str:
+        mode = f"{self.team_mode}({self.sort_key})" if self.sort_key else self.team_mode
+        return f"{mode}: {', '.join(self.monsters)}"
+
+
+def monster_classes() -> dict:
+    """
+    Monster classes by name.
+
+    :complexity: O(m) where m is the number of monsters
+    """
+    all_monsters = get_all_monsters()
+    return {all_monsters[i].get_name(): all_monsters[i] for i in range(len(all_monsters))}
+
+
+def fitness(genome: TeamGenome, reference: list[TeamGenome]) -> float:
+    """
+    Share of points scored against each reference team, playing both sides.
+
+    :complexity: O(r * b) where r is the size of the reference population and b the cost of a battle
+    """
+    classes = monster_classes()
+    battle = Battle(verbosity=0)
+    points = 0.0
+    for opponent in reference:
+        result = battle.battle(genome.build(classes), opponent.build(classes))
+        points += 1.0 if result == Battle.Result.TEAM1 else 0.5 if result == Battle.Result.DRAW else 0.0
+        result = battle.battle(opponent.build(classes), genome.build(classes))
+        points += 1.0 if result == Battle.Result.TEAM2 else 0.5 if result == Battle.Result.DRAW else 0.0
+    return points / (2 * len(reference))
+
+
+def _fitness_task(task: tuple[TeamGenome, list[TeamGenome]]) -> float:
+    """Module level so it can be sent to worker processes."""
+    return fitness(*task)
+
+
+class TeamOptimizer:
+    """
+    Evolves team compositions against a seeded reference population.
+
+    Each generation keeps the `elite` best compositions, and fills the rest of the
+    population with children of tournament-selected parents: one-point crossover of
+    the monster lists (mode and sort key taken from either parent), then mutation of
+    each monster, the order, the mode and the sort key with probability mutation_rate.
+
+    Attributes:
+        population (list[TeamGenome]): the current generation
+        reference (list[TeamGenome]): the teams fitness is measured against
+        cache (dict[TeamGenome, float]): fitness of every composition evaluated so far
+        generation (int): generations evolved so far
+        evaluations (int): fitness evaluations actually run, i.e. cache misses
+    """
+
+    def __init__(self, population_size: int = 32, reference_size: int = 16, team_size: int = MonsterTeam.TEAM_LIMIT,
+                 elite: int = 2, tournament: int = 3, mutation_rate: float = 0.15, seed: int = 0,
+                 workers: int | None = None) -> None:
+        """
+        :param workers: The number of worker processes. 1 evaluates in this process, None uses one per core.
+        :complexity: O(p + r) where p is the population size and r the reference size
+        """
+        if not 1 <= team_size <= MonsterTeam.TEAM_LIMIT:
+            raise ValueError(f"team_size should be between 1 and {MonsterTeam.TEAM_LIMIT}.")
+        if not 0 <= elite < population_size:
+            raise ValueError("elite should be smaller than the population size.")
+        self.population_size = population_size
+        self.team_size = team_size
+        self.elite = elite
+        self.tournament = tournament
+        self.mutation_rate = mutation_rate
+        self.workers = workers
+        self.names = spawnable_names()
+        self.cache: dict[TeamGenome, float] = {}
+        self.generation = 0
+        self.evaluations = 0
+        self.pool = None
+
+        outer_seed = RandomGen.seed
+        RandomGen.set_seed(seed)
+        try:
+            self.reference = [
+                TeamGenome.random(self.names, team_size) for _ in range(reference_size)
+            ]
+            self.population = [TeamGenome.random(self.names, team_size) for _ in range(population_size)]
+        finally:
+            self.rng_state = RandomGen.seed
+            RandomGen.seed = outer_seed
+
+    def __enter__(self) -> TeamOptimizer:
+        if self.workers != 1:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def evaluate(self, genomes: list[TeamGenome]) -> list[float]:
+        """
+        Fitness of each genome, evaluating the ones not in the cache.
+
+        :complexity: O(u * r * b / w) where u is the number of uncached genomes, r the reference
+        size, b the cost of a battle and w the number of workers
+        """
+        new = []
+        for genome in genomes:
+            if genome not in self.cache and genome not in new:
+                new.append(genome)
+        tasks = [(genome, self.reference) for genome in new]
+        if self.pool is not None:
+            workers = self.workers or os.cpu_count() or 1
+            scores = self.pool.map(_fitness_task, tasks, chunksize=max(1, len(tasks) // (4 * workers)))
+        else:
+            scores = map(_fitness_task, tasks)
+        for genome, score in zip(new, scores):
+            self.cache[genome] = score
+        self.evaluations += len(new)
+        return [self.cache[genome] for genome in genomes]
+
+    def select(self, scores: list[float]) -> TeamGenome:
+        """
+        Tournament selection.
+
+        :complexity: O(k) where k is the tournament size
+        """
+        best = RandomGen.randint(0, len(self.population) - 1)
+        for _ in range(self.tournament - 1):
+            other = RandomGen.randint(0, len(self.population) - 1)
+            if scores[other] > scores[best]:
+                best = other
+        return self.population[best]
+
+    def breed(self, mother: TeamGenome, father: TeamGenome) -> TeamGenome:
+        """
+        Crossover then mutation.
+
+        :complexity: O(n) where n is the team size
+        """
+        cut = RandomGen.randint(0, self.team_size)
+        monsters = list(mother.monsters[:cut] + father.monsters[cut:])
+        parent = mother if RandomGen.random_chance(0.5) else father
+        team_mode, sort_key = parent.team_mode, parent.sort_key or mother.sort_key or father.sort_key
+
+        for i in range(len(monsters)):
+            if RandomGen.random_chance(self.mutation_rate):
+                monsters[i] = RandomGen.random_choice(self.names)
+        if len(monsters) > 1 and RandomGen.random_chance(self.mutation_rate):
+            i = RandomGen.randint(0, len(monsters) - 1)
+            j = RandomGen.randint(0, len(monsters) - 1)
+            monsters[i], monsters[j] = monsters[j], monsters[i]
+        if RandomGen.random_chance(self.mutation_rate):
+            modes = list(MonsterTeam.TeamMode.__members__)
+            team_mode = modes[RandomGen.randint(0, len(modes) - 1)]
+        if sort_key is None or RandomGen.random_chance(self.mutation_rate):
+            sorts = list(MonsterTeam.SortMode.__members__)
+            sort_key = sorts[RandomGen.randint(0, len(sorts) - 1)]
+        return TeamGenome(team_mode, sort_key, tuple(monsters))
+
+    def step(self) -> tuple[TeamGenome, float]:
+        """
+        Evolves one generation. RandomGen is only borrowed, so other users of it
+        do not change the search.
+
+        :returns: The best composition of the evaluated generation and its fitness
+        :complexity: O(p log p + u * r * b / w), see evaluate()
+        """
+        scores = self.evaluate(self.population)
+        ranked = sorted(range(len(self.population)), key=lambda i: scores[i], reverse=True)
+        best = (self.population[ranked[0]], scores[ranked[0]])
+
+        outer_seed = RandomGen.seed
+        RandomGen.seed = self.rng_state
+        try:
+            children = [self.population[i] for i in ranked[:self.elite]]
+            while len(children) < self.population_size:
+                children.append(self.breed(self.select(scores), self.select(scores)))
+        finally:
+            self.rng_state = RandomGen.seed
+            RandomGen.seed = outer_seed
+        self.population = children
+        self.generation += 1
+        return best
+
+    def run(self, generations: int, progress=None) -> tuple[TeamGenome, float]:
+        """
+        Evolves several generations.
+
+        :param progress: Called with (generation, best genome, best fitness) after each generation
+        :returns: The best composition found and its fitness
+        :complexity: O(g) times the cost of step(), where g is the number of generations
+        """
+        with self:
+            for _ in range(generations):
+                genome, score = self.step()
+                if progress is not None:
+                    progress(self.generation, genome, score)
+            return self.best()
+
+    def best(self) -> tuple[TeamGenome, float]:
+        """
+        The best composition evaluated so far.
+
+        :complexity: O(c) where c is the number of cached compositions
+        """
+        genome = max(self.cache, key=self.cache.get)
+        return genome, self.cache[genome]
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Search for strong teams with a genetic algorithm.")
+    p.add_argument("--generations", type=int, default=20)
+    p.add_argument("--population", type=int, default=32)
+    p.add_argument("--reference", type=int, default=16, help="Size of the reference population.")
+    p.add_argument("--team-size", type=int, default=MonsterTeam.TEAM_LIMIT)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    args = p.parse_args()
+
+    optimizer = TeamOptimizer(args.population, args.reference, args.team_size, seed=args.seed, workers=args.workers)
+    start = time.perf_counter()
+
+    def report(generation: int, genome: TeamGenome, score: float) -> None:
+        elapsed = time.perf_counter() - start
+        print(f"gen {generation:4d}  best {score:.3f}  {genome}  ({generation / elapsed:.2f} gen/s, {optimizer.evaluations} evaluations)")
+
+    genome, score = optimizer.run(args.generations, report)
+    print(f"Best: {genome} with fitness {score:.3f}")
@@ -0,0 +1,224 @@
+"""
+Exhaustive search for the best team against a fixed opponent.
+
+Every team of 1 to max_size candidate monsters is battled against the
+opponent. Two things keep this tractable:
+
+* Dominance pruning: using the 1v1 matchup matrix, a monster that does no
+  better than another candidate against every monster in the opponent's team
+  (win > draw > loss, then more HP left or more turns survived) is dropped.
+  This is a heuristic, as 1v1 results ignore levels and HP carried between
+  fights.
+* A transposition table: at the start of every turn the canonical encoding of
+  the battle (see battle_state) is looked up. Teams that reach a state already
+  simulated to the end take its result without simulating the rest.
+
+OPTIMISE teams order themselves, so for them only multisets of monsters are
+enumerated; FRONT and BACK teams are enumerated in every order.
+
+Usage:
+```
+opponent = TeamGenome("BACK", None, ("Flamikin", "Vineon", "Strikeon"))
+search = TeamSearch(opponent, team_mode="BACK", max_size=3)
+for score, team in search.run(top=5):
+    print(score, team)
+print(search.report())
+```
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+
+from battle import Battle
+from battle_state import encode_battle
+from team import MonsterTeam
+from matchups import MatchupMatrix, spawnable_monsters
+from team_optimizer import TeamGenome, monster_classes
+
+
+RESULT_RANK = {Battle.Result.TEAM2: 0, Battle.Result.DRAW: 1, Battle.Result.TEAM1: 2}
+
+
+def matchup_score(matrix: MatchupMatrix, monster: str, opponent: str) -> tuple[int, int]:
+    """
+    How well monster does against opponent in a 1v1 at level 1, as a comparable tuple.
+
+    :complexity: O(1)
+    """
+    result, turns, hp = matrix.outcome(monster, opponent)
+    if result == Battle.Result.TEAM1:
+        return (2, hp)
+    if result == Battle.Result.DRAW:
+        return (1, 0)
+    return (0, turns)
+
+
+def undominated(candidates: list[str], opponents: list[str], matrix: MatchupMatrix) -> list[str]:
+    """
+    Drops every candidate dominated by another, i.e. one that scores no better against
+    every opponent monster. Of candidates with identical scores the first is kept.
+
+    :complexity: O(c^2 * o) where c is the number of candidates and o the number of opponent monsters
+    """
+    scores = [[matchup_score(matrix, name, opponent) for opponent in opponents] for name in candidates]
+    kept = []
+    for i in range(len(candidates)):
+        dominated = False
+        for j in range(len(candidates)):
+            if i == j:
+                continue
+            at_least = all(scores[j][k] >= scores[i][k] for k in range(len(opponents)))
+            better = any(scores[j][k] > scores[i][k] for k in range(len(opponents)))
+            if at_least and (better or j < i):
+                dominated = True
+                break
+        if not dominated:
+            kept.append(candidates[i])
+    return kept
+
+
+class TeamSearch:
+    """
+    Enumerates teams against a fixed opponent, using dominance pruning and a transposition table.
+
+    Attributes:
+        candidates (list[str]): monsters teams are built from, after pruning
+        table (dict[bytes, tuple[int, int]]): result value and turns left for every encoded state simulated to the end
+        nodes (int): teams evaluated
+        turns (int): turns actually simulated
+        hits (int): battles finished from the transposition table
+    """
+
+    def __init__(self, opponent: TeamGenome, team_mode: str = "BACK", sort_key: str | None = None,
+                 max_size: int = 3, candidates: list[str] | None = None, prune: bool = True,
+                 matrix: MatchupMatrix | None = None, max_table: int = 1_000_000) -> None:
+        """
+        :param candidates: Monster names to build teams from, all spawnable monsters by default
+        :param matrix: The matchup matrix used for pruning, loaded or computed if not given
+        :param max_table: The most states kept in the transposition table
+        :complexity: O(c^2 * o), see undominated()
+        """
+        if not 1 <= max_size <= MonsterTeam.TEAM_LIMIT:
+            raise ValueError(f"max_size should be between 1 and {MonsterTeam.TEAM_LIMIT}.")
+        if team_mode == MonsterTeam.TeamMode.OPTIMISE.name and sort_key is None:
+            raise ValueError("OPTIMISE teams need a sort_key.")
+        self.opponent = opponent
+        self.team_mode = team_mode
+        self.sort_key = sort_key
+        self.max_size = max_size
+        self.max_table = max_table
+        self.classes = monster_classes()
+        if candidates is None:
+            spawnable = spawnable_monsters()
+            candidates = [spawnable[i].get_name() for i in range(len(spawnable))]
+        self.all_candidates = list(candidates)
+        if prune:
+            matrix = matrix or MatchupMatrix.load_or_compute(max_level=1)
+            candidates = undominated(self.all_candidates, sorted(set(opponent.monsters)), matrix)
+        self.candidates = list(candidates)
+        self.table: dict[bytes, tuple[int, int]] = {}
+        self.nodes = 0
+        self.turns = 0
+        self.hits = 0
+        self.elapsed = 0.0
+
+    def teams(self):
+        """
+        Every team to evaluate, smallest first.
+
+        :complexity: O(c^k) teams where c is the number of candidates and k the max size
+        """
+        for size in range(1, self.max_size + 1):
+            if self.team_mode == MonsterTeam.TeamMode.OPTIMISE.name:
+                yield from itertools.combinations_with_replacement(self.candidates, size)
+            else:
+                yield from itertools.product(self.candidates, repeat=size)
+
+    def evaluate(self, monsters: tuple[str, ...]) -> tuple[Battle.Result, int]:
+        """
+        Battles one team against the opponent, stopping at the first known state.
+
+        :returns: The result and the number of turns the battle took
+        :complexity: O(t * (n + m)) where t is the number of turns simulated
+        """
+        team = TeamGenome(self.team_mode, self.sort_key, monsters).build(self.classes)
+        battle = Battle(verbosity=0)
+        battle.begin(team, self.opponent.build(self.classes))
+        path = []
+        result = None
+        while battle.result is None:
+            key = encode_battle(battle)
+            known = self.table.get(key)
+            if known is not None:
+                self.hits += 1
+                result, turns = Battle.Result(known[0]), battle.turn_number + known[1]
+                break
+            path.append((key, battle.turn_number))
+            battle.process_turn()
+            battle.turn_number += 1
+            self.turns += 1
+        if result is None:
+            result, turns = battle.result, battle.turn_number
+        for key, turn in path:
+            if len(self.table) >= self.max_table:
+                break
+            self.table[key] = (result.value, turns - turn)
+        self.nodes += 1
+        return result, turns
+
+    @staticmethod
+    def score(result: Battle.Result, turns: int) -> tuple[int, int]:
+        """
+        Higher is better: wins before draws before losses, then quicker wins or longer losses.
+
+        :complexity: O(1)
+        """
+        rank = RESULT_RANK[result]
+        return (rank, -turns if rank == 2 else turns)
+
+    def run(self, top: int = 10) -> list[tuple[tuple[int, int], TeamGenome]]:
+        """
+        Evaluates every team.
+
+        :returns: The best `top` teams with their scores, best first
+        :complexity: O(T * b) where T is the number of teams and b the cost of a battle
+        """
+        start = time.perf_counter()
+        best = []
+        for monsters in self.teams():
+            score = self.score(*self.evaluate(monsters))
+            best.append((score, monsters))
+            if len(best) > 4 * top:
+                best.sort(key=lambda item: item[0], reverse=True)
+                del best[top:]
+        best.sort(key=lambda item: item[0], reverse=True)
+        self.elapsed += time.perf_counter() - start
+        return [(score, TeamGenome(self.team_mode, self.sort_key, monsters)) for score, monsters in best[:top]]
+
+    def report(self) -> str:
+        rate = self.nodes / self.elapsed if self.elapsed else 0.0
+        return (f"{len(self.candidates)}/{len(self.all_candidates)} candidates after pruning, "
+                f"{self.nodes} teams in {self.elapsed:.2f}s ({rate:.1f} nodes/s), "
+                f"{self.turns} turns simulated, {self.hits} transposition hits, {len(self.table)} states stored")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Find the best teams against a fixed opponent.")
+    p.add_argument("opponent", nargs="+", help="Opponent monster names, in the order they are provided.")
+    p.add_argument("--opponent-mode", default="BACK", choices=[mode.name for mode in MonsterTeam.TeamMode])
+    p.add_argument("--opponent-sort", default=None, choices=[mode.name for mode in MonsterTeam.SortMode])
+    p.add_argument("--mode", default="BACK", choices=[mode.name for mode in MonsterTeam.TeamMode])
+    p.add_argument("--sort-key", default=None, choices=[mode.name for mode in MonsterTeam.SortMode])
+    p.add_argument("--max-size", type=int, default=2)
+    p.add_argument("--no-prune", action="store_true")
+    p.add_argument("--top", type=int, default=10)
+    args = p.parse_args()
+
+    opponent = TeamGenome(args.opponent_mode, args.opponent_sort, tuple(args.opponent))
+    search = TeamSearch(opponent, args.mode, args.sort_key, args.max_size, prune=not args.no_prune)
+    for (rank, turns), genome in search.run(args.top):
+        outcome = ("loss", "draw", "win")[rank]
+        print(f"{outcome:4} in {abs(turns):3d} turns  {genome}")
+    print(search.report())
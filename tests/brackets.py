@@ -0,0 +1,20 @@
+"""Brackets shared by the tower and tournament tests."""
+from random_gen import RandomGen
+
+from data_structures.referential_array import ArrayR
+
+
+def random_bracket(n_entrants: int) -> ArrayR[str]:
+    """A random, usually unbalanced, RPN bracket."""
+    tokens = []
+    waiting = 0
+    entrant = 0
+    while entrant < n_entrants or waiting > 1:
+        if waiting > 1 and (entrant == n_entrants or RandomGen.random_chance(0.5)):
+            tokens.append("+")
+            waiting -= 1
+        else:
+            tokens.append(f"T{entrant}")
+            entrant += 1
+            waiting += 1
+    return ArrayR.from_list(tokens)
@@ -0,0 +1,62 @@
+import bisect
+import random
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.parallel_sorted_list import ParallelArraySortedList
+from data_structures.sorted_list_adt import ListItem
+
+
+class TestSortedListLookups(TestCase):
+
+    def build(self, cls, pairs):
+        sorted_list = cls(1)
+        for value, key in pairs:
+            sorted_list.add(ListItem(value, key))
+        return sorted_list
+
+    @number("6.49")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_lookups_match_linear_scan(self):
+        for cls in (ArraySortedList, ParallelArraySortedList):
+            for seed in range(30):
+                rng = random.Random(seed)
+                # Few distinct keys, so most keys hold several different values.
+                pairs = [(f"v{i}", rng.randint(0, 6)) for i in range(rng.randint(0, 40))]
+                sorted_list = self.build(cls, pairs)
+                items = [(sorted_list[i].value, sorted_list[i].key) for i in range(len(sorted_list))]
+                keys = [key for _, key in items]
+
+                for key in range(-1, 8):
+                    self.assertEqual(sorted_list.bisect_left(key), bisect.bisect_left(keys, key))
+                    self.assertEqual(sorted_list.bisect_right(key), bisect.bisect_right(keys, key))
+                for value, key in pairs:
+                    position = sorted_list.index(ListItem(value, key))
+                    self.assertEqual(items[position], (value, key))
+                    self.assertIn(ListItem(value, key), sorted_list)
+                    self.assertNotIn(ListItem(value, key + 1), sorted_list)
+                self.assertNotIn(ListItem("missing", 3), sorted_list)
+                self.assertRaises(ValueError, sorted_list.index, ListItem("missing", 3))
+
+                for lo in range(-1, 8):
+                    for hi in range(lo - 1, 8):
+                        between = sorted_list.items_between(lo, hi)
+                        self.assertEqual(
+                            [(between[i].value, between[i].key) for i in range(len(between))],
+                            [item for item in items if lo <= item[1] <= hi],
+                        )
+
+    @number("6.50")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_remove_with_duplicate_keys(self):
+        for cls in (ArraySortedList, ParallelArraySortedList):
+            sorted_list = self.build(cls, [("a", 5), ("b", 5), ("c", 5), ("d", 1)])
+            sorted_list.remove(ListItem("b", 5))
+            self.assertEqual(sorted(sorted_list[i].value for i in range(len(sorted_list))), ["a", "c", "d"])
+            self.assertNotIn(ListItem("b", 5), sorted_list)
+            self.assertRaises(ValueError, sorted_list.remove, ListItem("b", 5))
@@ -0,0 +1,34 @@
+from enum import auto
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from base_enum import BaseEnum
+from battle import Battle
+from team import MonsterTeam
+
+
+class TestBaseEnum(TestCase):
+
+    @number("6.42")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_equality_and_hash(self):
+        # A copy of the class, as if imported from another location
+        class Action(BaseEnum):
+            ATTACK = auto()
+            SWAP = auto()
+            SPECIAL = auto()
+
+        self.assertEqual(Battle.Action.ATTACK, Battle.Action.ATTACK)
+        self.assertNotEqual(Battle.Action.ATTACK, Battle.Action.SWAP)
+        self.assertEqual(Battle.Action.SWAP, Action.SWAP)
+        self.assertNotEqual(Battle.Action.SWAP, Action.ATTACK)
+        self.assertNotEqual(MonsterTeam.TeamMode.FRONT, Battle.Action.ATTACK)
+        self.assertNotEqual(Battle.Action.ATTACK, 1)
+
+        self.assertEqual(hash(Battle.Action.SWAP), hash(Action.SWAP))
+        table = {action: action.name for action in Battle.Action}
+        self.assertEqual(table[Action.SPECIAL], "SPECIAL")
+        self.assertEqual(len({mode for mode in MonsterTeam.TeamMode} | {MonsterTeam.TeamMode.BACK}), 3)
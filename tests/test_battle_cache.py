@@ -0,0 +1,135 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from battle_cache import BattleCache
+from team import MonsterTeam
+from tower import BattleTower
+from helpers import Flamikin, Aquariuma, Vineon, Strikeon
+
+from data_structures.referential_array import ArrayR
+
+
+def make_team(team_mode=MonsterTeam.TeamMode.BACK):
+    return MonsterTeam(
+        team_mode=team_mode,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Strikeon]),
+        sort_key=MonsterTeam.SortMode.HP,
+    )
+
+
+def run_tower(seed, cache=None):
+    RandomGen.set_seed(seed)
+    bt = BattleTower(Battle(verbosity=0, cache=cache))
+    bt.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+    bt.generate_teams(5)
+    got = []
+    while bt.battles_remaining():
+        result, team1, team2, lives1, lives2 = bt.next_battle()
+        got.append((result, lives1, lives2))
+    return got
+
+
+class TestBattleCache(TestCase):
+
+    @number("6.4")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_repeat_battle_hits(self):
+        cache = BattleCache(maxsize=8)
+        b = Battle(verbosity=0, cache=cache)
+        first = b.battle(make_team(), make_team(MonsterTeam.TeamMode.FRONT))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        turns = b.turn_number
+
+        second = b.battle(make_team(), make_team(MonsterTeam.TeamMode.FRONT))
+        self.assertEqual(first, second)
+        self.assertEqual(b.turn_number, turns)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        # A different team mode is a different battle.
+        b.battle(make_team(), make_team(MonsterTeam.TeamMode.OPTIMISE))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(len(cache), 2)
+
+    @number("6.5")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_non_deterministic_bypass(self):
+        cache = BattleCache()
+        b = Battle(verbosity=0, cache=cache)
+        team1 = make_team()
+        team1.choose_action = lambda out, enemy: Battle.Action.ATTACK
+        b.battle(team1, make_team())
+        self.assertEqual((cache.hits, cache.misses, cache.bypasses), (0, 0, 1))
+        self.assertEqual(len(cache), 0)
+
+    @number("6.6")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_lru_eviction(self):
+        cache = BattleCache(maxsize=1)
+        b = Battle(verbosity=0, cache=cache)
+        b.battle(make_team(), make_team(MonsterTeam.TeamMode.FRONT))
+        b.battle(make_team(), make_team(MonsterTeam.TeamMode.BACK))
+        self.assertEqual(len(cache), 1)
+        b.battle(make_team(), make_team(MonsterTeam.TeamMode.FRONT))
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+
+    @number("6.7")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_tower_unchanged(self):
+        for seed in (1, 7, 123456789):
+            cache = BattleCache()
+            self.assertListEqual(run_tower(seed, cache), run_tower(seed))
+
+    @number("6.55")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_hit_leaves_same_state_as_miss(self):
+        def monster_state(monster):
+            if monster is None:
+                return None
+            return (type(monster), monster.simple_mode, monster.init_level, monster.curr_level, monster.get_hp())
+
+        def state(battle, tracked):
+            teams = []
+            for team in (battle.team1, battle.team2):
+                monsters = team.monsters_in_order()
+                keys = [team.team.key_at(i) for i in range(len(team))] if team.team_mode == MonsterTeam.TeamMode.OPTIMISE else None
+                teams.append(([monster_state(monsters[i]) for i in range(len(monsters))], keys, getattr(team, "descending", None)))
+            # Which of the starting monsters are out, or still in a team
+            tracked_out = [monster is battle.out1 or monster is battle.out2 for monster in tracked]
+            return teams, monster_state(battle.out1), monster_state(battle.out2), [monster_state(m) for m in tracked], tracked_out
+
+        def new_teams(seed, mode1, mode2):
+            RandomGen.set_seed(seed)
+            team1 = MonsterTeam(mode1, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.SPEED)
+            team2 = MonsterTeam(mode2, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.HP)
+            tracked = team1.monsters_in_order().to_list() + team2.monsters_in_order().to_list()
+            return team1, team2, tracked
+
+        modes = [MonsterTeam.TeamMode.FRONT, MonsterTeam.TeamMode.BACK, MonsterTeam.TeamMode.OPTIMISE]
+        evolutions = 0
+        for seed in range(15):
+            for mode1 in modes:
+                for mode2 in modes:
+                    cache = BattleCache()
+                    missed = Battle(verbosity=0, cache=cache)
+                    team1, team2, tracked = new_teams(seed, mode1, mode2)
+                    missed.battle(team1, team2)
+                    expected = state(missed, tracked)
+
+                    hit = Battle(verbosity=0, cache=cache)
+                    team1, team2, tracked = new_teams(seed, mode1, mode2)
+                    hit.battle(team1, team2)
+                    self.assertEqual(cache.hits, 1)
+                    self.assertEqual(state(hit, tracked), expected)
+                    evolutions += sum(type(m) not in [type(t) for t in tracked] for m in (hit.out1, hit.out2) if m is not None)
+        # Some of the battles must have evolved a monster for the test to cover evolutions.
+        self.assertGreater(evolutions, 0)
@@ -0,0 +1,118 @@
+from io import StringIO
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from battle_cache import BattleCache
+from battle_events import EventKind, record_battle, replay_battle, read_log
+from team import MonsterTeam
+from helpers import Flamikin, Aquariuma, Vineon, Strikeon, Gustwing
+
+from data_structures.referential_array import ArrayR
+
+
+def make_teams():
+    team1 = MonsterTeam(
+        team_mode=MonsterTeam.TeamMode.BACK,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Strikeon]),
+    )
+    team2 = MonsterTeam(
+        team_mode=MonsterTeam.TeamMode.FRONT,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR.from_list([Strikeon, Gustwing, Aquariuma, Vineon]),
+    )
+    return team1, team2
+
+
+class TestBattleEvents(TestCase):
+
+    @number("6.12")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_events_delivered(self):
+        b = Battle(verbosity=0)
+        events = []
+        b.subscribe(events.append)
+        result = b.battle(*make_teams())
+
+        kinds = [event.kind for event in events]
+        for kind in (EventKind.ACTION, EventKind.ATTACK, EventKind.FAINT, EventKind.LEVEL_UP, EventKind.EVOLVE, EventKind.SWAP):
+            self.assertIn(kind, kinds)
+        self.assertEqual(events[-1].kind, EventKind.RESULT)
+        self.assertEqual(events[-1].data["result"], result.name)
+        self.assertEqual(events[-1].data["turns"], b.turn_number)
+
+        for event in events:
+            if event.kind == EventKind.ATTACK:
+                self.assertGreaterEqual(event.data["damage"], 0)
+                self.assertIn(event.data["multiplier"], (0, 0.5, 1, 2))
+
+        # The event stream does not change the outcome.
+        self.assertEqual(Battle(verbosity=0).battle(*make_teams()), result)
+
+    @number("6.13")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_stream_generator(self):
+        b = Battle(verbosity=0)
+        listened = []
+        b.subscribe(listened.append)
+        streamed = list(b.stream(*make_teams()))
+        self.assertEqual(streamed, listened)
+        self.assertEqual(streamed[-1].data["result"], b.result.name)
+        self.assertEqual(len(b.listeners), 1)
+
+    @number("6.14")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_record_and_replay(self):
+        for seed in range(20):
+            RandomGen.set_seed(seed)
+            team1 = MonsterTeam(MonsterTeam.TeamMode.OPTIMISE, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.HP)
+            team2 = MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.RANDOM)
+            log = StringIO()
+            result = record_battle(Battle(verbosity=0), team1, team2, log, seed)
+
+            log.seek(0)
+            header, events = read_log(log)
+            self.assertEqual(header["seed"], seed)
+            self.assertEqual(events[-1].data["result"], result.name)
+
+            log.seek(0)
+            self.assertEqual(replay_battle(log), result)
+
+    @number("6.15")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_replay_detects_tampering(self):
+        log = StringIO()
+        record_battle(Battle(verbosity=0), *make_teams(), log, seed=5)
+        tampered = StringIO(log.getvalue().replace('"damage":', '"damage":1', 1))
+        self.assertRaises(ValueError, lambda: replay_battle(tampered))
+
+    @number("6.52")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_record_through_cached_battle(self):
+        cache = BattleCache()
+        b = Battle(verbosity=0, cache=cache)
+        b.battle(*make_teams())
+        self.assertEqual(len(cache), 1)
+
+        # Listeners must see the whole battle even though its outcome is cached.
+        logs = []
+        for _ in range(2):
+            log = StringIO()
+            record_battle(b, *make_teams(), log, seed=3)
+            logs.append(log.getvalue())
+            self.assertEqual(replay_battle(StringIO(log.getvalue())), b.result)
+        self.assertEqual(logs[0], logs[1])
+        self.assertEqual(list(b.stream(*make_teams())), list(Battle(verbosity=0).stream(*make_teams())))
+        self.assertEqual(cache.hits, 0)
+
+        b.battle(*make_teams())
+        self.assertEqual(cache.hits, 1)
@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from battle_state import encode_battle, decode_battle, encode_team, decode_team
+from team import MonsterTeam
+from helpers import Flamikin
+
+from data_structures.referential_array import ArrayR
+from tests.test_vector_battle import random_team
+
+
+class TestBattleState(TestCase):
+
+    @number("6.34")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_round_trip_every_turn(self):
+        for seed in range(150):
+            RandomGen.set_seed(seed)
+            simple_mode = seed % 2 == 0
+            battle = Battle(verbosity=0)
+            battle.begin(random_team(simple_mode), random_team(simple_mode))
+            states = []
+            while battle.result is None:
+                state = encode_battle(battle)
+                self.assertEqual(encode_battle(decode_battle(state)), state)
+                states.append(state)
+                battle.process_turn()
+                battle.turn_number += 1
+            result, turns = battle.result, battle.turn_number
+            self.assertEqual(encode_battle(decode_battle(encode_battle(battle))), encode_battle(battle))
+
+            # Any intermediate state continues to the same ending.
+            start = seed % len(states)
+            copy = decode_battle(states[start])
+            while copy.result is None:
+                copy.process_turn()
+                copy.turn_number += 1
+            self.assertEqual((copy.result, start + copy.turn_number), (result, turns), f"seed {seed}")
+
+    @number("6.35")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_canonical_team(self):
+        team1 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED,
+                            provided_monsters=ArrayR.from_list([Flamikin]))
+        team2 = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED,
+                            provided_monsters=ArrayR.from_list([Flamikin, Flamikin]))
+        # Same monsters waiting, but the queue's cursor has moved.
+        team2.retrieve_from_team()
+        self.assertNotEqual(team1.team.front, team2.team.front)
+        self.assertEqual(encode_team(team1), encode_team(team2))
+        decoded, end = decode_team(encode_team(team1))
+        self.assertEqual(end, len(encode_team(team1)))
+        self.assertEqual(len(decoded), 1)
+
+        class Custom(Flamikin):
+            pass
+        team1.add_to_team(Custom())
+        with self.assertRaises(ValueError):
+            encode_team(team1)
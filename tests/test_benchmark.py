@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from benchmark import CASES, compare, run_benchmarks
+
+
+class TestBenchmark(TestCase):
+
+    @number("6.18")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(10)
+    def test_run_is_seeded(self):
+        report = run_benchmarks("adt.bset", warmup=0, repeat=2, stream=None)
+        self.assertEqual(list(report["results"]), ["adt.bset_add_contains[100000]"])
+        result = report["results"]["adt.bset_add_contains[100000]"]
+        self.assertEqual(result["ops"], 200000)
+        self.assertLessEqual(result["min"], result["median"])
+        self.assertTrue(any(case.large for case in CASES))
+
+    @number("6.19")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_compare(self):
+        old = {"results": {"a": {"median": 1.0}, "b": {"median": 2.0}, "c": {"median": 1.0}}}
+        new = {"results": {"a": {"median": 1.5}, "b": {"median": 1.0}}}
+        rows = {name: change for name, _, _, change in compare(old, new)}
+        self.assertEqual(set(rows), {"a", "b"})
+        self.assertAlmostEqual(rows["a"], 0.5)
+        self.assertAlmostEqual(rows["b"], -0.5)
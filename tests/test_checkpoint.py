@@ -0,0 +1,110 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from team import MonsterTeam
+from tower import BattleTower
+from checkpoint import encode_tower, decode_tower, load_tower, run_with_checkpoints, HEADER, TEAM, MONSTER
+
+
+def new_tower(seed, n, lazy, player_mode):
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(MonsterTeam(player_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.SPEED))
+    tower.generate_teams(n, lazy=lazy)
+    return tower
+
+
+def play(tower, max_battles=None):
+    outcomes = []
+    while tower.battles_remaining() and (max_battles is None or len(outcomes) < max_battles):
+        result, _, _, lives1, lives2 = tower.next_battle()
+        outcomes.append((result, lives1, lives2, tower.seen_elements.elems))
+    return outcomes
+
+
+class TestCheckpoint(TestCase):
+
+    @number("6.26")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_resume_matches_uninterrupted(self):
+        for seed in range(8):
+            for mode in MonsterTeam.TeamMode:
+                for lazy in (False, True):
+                    tower = new_tower(seed, 20, lazy, mode)
+                    expected = play(tower)
+                    expected_state = encode_tower(tower, len(expected))
+
+                    tower = new_tower(seed, 20, lazy, mode)
+                    got = play(tower, max_battles=seed)
+                    data = encode_tower(tower, len(got))
+                    RandomGen.set_seed(999)
+                    tower, battles = decode_tower(data)
+                    self.assertEqual(battles, len(got))
+                    self.assertEqual(encode_tower(tower, battles), data)
+                    got += play(tower)
+                    self.assertEqual(got, expected)
+                    self.assertEqual(encode_tower(tower, len(got)), expected_state)
+
+    @number("6.27")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_checkpoint_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tower.ckpt")
+            tower = new_tower(3, 30, True, MonsterTeam.TeamMode.BACK)
+            self.assertEqual(run_with_checkpoints(tower, path, every=2, max_battles=5), 5)
+            tower, battles = load_tower(path)
+            self.assertEqual(battles, 5)
+            run_with_checkpoints(tower, path, every=2, battles=battles)
+            self.assertFalse(tower.battles_remaining())
+
+            with open(path, "r+b") as f:
+                f.write(b"XXXX")
+            with self.assertRaises(ValueError):
+                load_tower(path)
+
+    @number("6.56")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_truncated_and_corrupt_checkpoints(self):
+        for lazy in (False, True):
+            data = encode_tower(new_tower(5, 3, lazy, MonsterTeam.TeamMode.OPTIMISE))
+            for size in range(len(data)):
+                with self.assertRaises(ValueError, msg=size):
+                    decode_tower(data[:size])
+            self.assertRaises(ValueError, decode_tower, data + b"\0")
+
+            # The player team's mode, then the index of its first monster, set out of range
+            corrupt = bytearray(data)
+            corrupt[HEADER.size] = 99
+            self.assertRaises(ValueError, decode_tower, bytes(corrupt))
+            n_instances = data[HEADER.size + 7]
+            pos = HEADER.size + TEAM.size
+            for _ in range(n_instances):
+                pos += 1 + data[pos] + MONSTER.size
+            corrupt = bytearray(data)
+            corrupt[pos] = n_instances
+            self.assertRaises(ValueError, decode_tower, bytes(corrupt))
+
+            # Any other single corrupt byte either still decodes or raises ValueError
+            for i in range(len(data)):
+                corrupt = bytearray(data)
+                corrupt[i] ^= 0xFF
+                try:
+                    decode_tower(bytes(corrupt))
+                except ValueError:
+                    pass
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tower.ckpt")
+            with open(path, "wb") as f:
+                f.write(data[:len(data) // 2])
+            with self.assertRaises(ValueError):
+                load_tower(path)
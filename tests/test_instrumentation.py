@@ -0,0 +1,91 @@
+import os
+import pstats
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from instrumentation import Instrumentation, profile_tower
+from monster_base import MonsterBase
+from elements import EffectivenessCalculator
+from team import MonsterTeam
+from helpers import Flamikin, Aquariuma, Vineon, Strikeon
+
+from data_structures.referential_array import ArrayR
+
+
+def make_team(team_mode):
+    return MonsterTeam(
+        team_mode=team_mode,
+        selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+        provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Strikeon]),
+    )
+
+
+class TestInstrumentation(TestCase):
+
+    @number("6.16")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_counts_and_restores(self):
+        attack = MonsterBase.__dict__["attack"]
+        effectiveness = EffectivenessCalculator.__dict__["get_effectiveness"]
+        with Instrumentation() as inst:
+            self.assertIsNot(MonsterBase.__dict__["attack"], attack)
+            Battle(verbosity=0).battle(make_team(MonsterTeam.TeamMode.BACK), make_team(MonsterTeam.TeamMode.FRONT))
+        self.assertIs(MonsterBase.__dict__["attack"], attack)
+        self.assertIs(EffectivenessCalculator.__dict__["get_effectiveness"], effectiveness)
+
+        attacks = inst.stats["MonsterBase.attack"]
+        self.assertGreater(attacks.calls, 0)
+        self.assertEqual(inst.stats["EffectivenessCalculator.get_effectiveness"].calls, attacks.calls)
+        self.assertIn("MonsterBase.attack", inst.stats["EffectivenessCalculator.get_effectiveness"].callers)
+        self.assertGreaterEqual(attacks.cumulative_time, attacks.total_time)
+        self.assertGreater(inst.stats["CircularDeque.pop"].calls, 0)
+        self.assertGreater(inst.stats["CircularDeque.serve"].calls, 0)
+        self.assertIn("MonsterBase.attack", inst.report())
+
+    @number("6.17")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_tower_pstats_dump(self):
+        inst = profile_tower(seed=3, n_teams=20)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "tower.prof")
+            inst.dump_stats(path)
+            stats = pstats.Stats(path)
+        names = [key[2] for key in stats.stats]
+        self.assertIn("attack", names)
+        self.assertIn("serve", names)
+
+    @number("6.53")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_team_deque_operations_counted(self):
+        with Instrumentation() as inst:
+            front = make_team(MonsterTeam.TeamMode.FRONT)
+            back = make_team(MonsterTeam.TeamMode.BACK)
+            front.special()
+            back.special()
+            Battle(verbosity=0).battle(front, back)
+        for name in ("append", "serve", "reverse", "rotate"):
+            self.assertGreater(inst.stats[f"CircularDeque.{name}"].calls, 0, name)
+        self.assertIn("CircularDeque.serve", inst.report())
+
+    @number("6.54")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_optimise_sorted_list_counted(self):
+        with Instrumentation() as inst:
+            optimise = MonsterTeam(
+                team_mode=MonsterTeam.TeamMode.OPTIMISE,
+                selection_mode=MonsterTeam.SelectionMode.PROVIDED,
+                provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Strikeon]),
+                sort_key=MonsterTeam.SortMode.HP,
+            )
+            Battle(verbosity=0).battle(optimise, make_team(MonsterTeam.TeamMode.BACK))
+        self.assertGreater(inst.stats["ParallelArraySortedList.add_pair"].calls, 0)
+        self.assertGreater(inst.stats["ParallelArraySortedList.delete_value_at_index"].calls, 0)
+        self.assertIn("ParallelArraySortedList.add_pair", inst.report())
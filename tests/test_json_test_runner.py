@@ -0,0 +1,52 @@
+import json
+import time
+import unittest
+from io import StringIO
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility, budget, InvalidValueException
+from ed_utils.json_test_runner import JSONTestRunner
+
+
+class TestJSONTestRunner(TestCase):
+
+    @number("6.22")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_metrics_and_budget(self):
+        class Inner(TestCase):
+            @budget(time=0.01)
+            def test_slow(self):
+                time.sleep(0.05)
+
+            @budget(time=5, memory=10_000_000)
+            def test_fast(self):
+                [0] * 1000
+
+        f = StringIO()
+        JSONTestRunner(stream=f).run(unittest.defaultTestLoader.loadTestsFromTestCase(Inner))
+        data = json.loads(f.getvalue())
+        fast, slow = data["testcases"]
+        for case in (fast, slow):
+            self.assertGreaterEqual(case["wall_time"], 0)
+            self.assertGreaterEqual(case["cpu_time"], 0)
+            self.assertIsNotNone(case["peak_memory"])
+        self.assertTrue(fast["passed"])
+        self.assertFalse(fast["over_budget"])
+        self.assertFalse(slow["passed"])
+        self.assertTrue(slow["over_budget"])
+        self.assertIn("Over budget", slow["feedback"])
+        self.assertEqual(data["summary"]["tests"], 2)
+        self.assertEqual(data["summary"]["over_budget"], 1)
+        # The over-budget test is reported as a failure, so its timings are split out.
+        self.assertEqual((fast["outcome"], slow["outcome"]), ("success", "failure"))
+        by_outcome = data["summary"]["by_outcome"]
+        self.assertEqual((by_outcome["success"]["tests"], by_outcome["failure"]["tests"]), (1, 1))
+        self.assertEqual(by_outcome["failure"]["wall_time"], slow["wall_time"])
+
+    @number("6.23")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_budget_validation(self):
+        with self.assertRaises(InvalidValueException):
+            budget()
+        with self.assertRaises(InvalidValueException):
+            budget(time=-1)
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from team import MonsterTeam
+from tower import BattleTower, LazyTeamQueue
+
+
+def run(seed, n, lazy, player_mode=MonsterTeam.TeamMode.BACK):
+    RandomGen.set_seed(seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(MonsterTeam(player_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=MonsterTeam.SortMode.HP))
+    tower.generate_teams(n, lazy=lazy)
+    outcomes = []
+    while tower.battles_remaining():
+        result, _, enemy, lives1, lives2 = tower.next_battle()
+        monsters = enemy.monsters_in_order()
+        names = [monsters[i].get_name() for i in range(len(monsters))]
+        outcomes.append((result, names, lives1, lives2))
+    return outcomes, len(tower.enemy_teams)
+
+
+class TestLazyTower(TestCase):
+
+    @number("6.24")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_lazy_matches_eager(self):
+        for seed in range(20):
+            for mode in MonsterTeam.TeamMode:
+                self.assertEqual(run(seed, 30, False, mode), run(seed, 30, True, mode))
+
+    @number("6.25")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_teams_created_on_demand(self):
+        RandomGen.set_seed(5)
+        tower = BattleTower(Battle(verbosity=0))
+        tower.set_my_team(MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM))
+        seed = RandomGen.seed
+        tower.generate_teams(10 ** 9, lazy=True)
+        self.assertIsInstance(tower.enemy_teams, LazyTeamQueue)
+        self.assertEqual(len(tower.enemy_teams), 10 ** 9)
+        self.assertEqual(RandomGen.seed, seed)
+
+        peeked = tower.enemy_teams.peek()
+        self.assertEqual(len(tower.enemy_teams), 10 ** 9)
+        tower.next_battle()
+        self.assertEqual(RandomGen.seed, seed)
+        self.assertEqual(tower.enemy_teams.pending, 10 ** 9 - 1)
+        self.assertEqual(len(tower.enemy_teams.live), 1 if peeked.lives else 0)
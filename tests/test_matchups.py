@@ -0,0 +1,72 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from matchups import MatchupMatrix, one_v_one, spawnable_monsters
+from helpers import Flamikin, Vineon, Aquariuma, Infernoth
+
+
+class TestMatchups(TestCase):
+
+    @number("6.1")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_one_v_one(self):
+        result, turns, hp = one_v_one(Flamikin, Vineon)
+        self.assertEqual(result, Battle.Result.TEAM1)
+        self.assertGreater(turns, 0)
+        self.assertGreater(hp, 0)
+        # Mirror matches between equally fast monsters always draw.
+        self.assertEqual(one_v_one(Aquariuma, Aquariuma), (Battle.Result.DRAW, 4, 0))
+
+    @number("6.2")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_matrix_matches_battles(self):
+        matrix = MatchupMatrix.compute(max_level=2, workers=1)
+        self.assertEqual(len(matrix), len(spawnable_monsters()))
+        for level in (1, 2):
+            for simple_mode in (True, False):
+                self.assertEqual(
+                    matrix.outcome(Flamikin, Vineon, level, simple_mode),
+                    one_v_one(Flamikin, Vineon, level, simple_mode),
+                )
+        self.assertEqual(matrix.winner("Vineon", "Flamikin"), Battle.Result.TEAM2)
+        self.assertRaises(KeyError, lambda: matrix.outcome(Infernoth, Vineon))
+        self.assertRaises(ValueError, lambda: matrix.outcome(Flamikin, Vineon, 3))
+
+    @number("6.3")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_cache_round_trip(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            matrix = MatchupMatrix.load_or_compute(max_level=1, cache_dir=cache_dir, workers=1)
+            path = MatchupMatrix.cache_path(1, cache_dir)
+            self.assertTrue(os.path.exists(path))
+
+            loaded = MatchupMatrix.load(path)
+            self.assertEqual(loaded.names.to_list(), matrix.names.to_list())
+            self.assertEqual(loaded.winners, matrix.winners)
+            self.assertEqual(loaded.turns, matrix.turns)
+            self.assertEqual(loaded.hp, matrix.hp)
+            self.assertEqual(loaded.digest, matrix.digest)
+
+            # A truncated file is rejected, and recomputed like a stale one.
+            with open(path, "rb") as f:
+                data = f.read()
+            for size in (len(data) - 1, len(data) - len(matrix.hp) * 4, 40):
+                with open(path, "wb") as f:
+                    f.write(data[:size])
+                self.assertRaises(ValueError, lambda: MatchupMatrix.load(path))
+            recomputed = MatchupMatrix.load_or_compute(max_level=1, cache_dir=cache_dir, workers=1)
+            self.assertEqual(recomputed.hp, matrix.hp)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), data)
+
+            with open(path, "r+b") as f:
+                f.write(b"XXXX")
+            self.assertRaises(ValueError, lambda: MatchupMatrix.load(path))
@@ -0,0 +1,40 @@
+import io
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.parallel_runner import ParallelTestRunner
+from ed_utils.timeout import timeout
+
+
+def square(x):
+    return x * x
+
+
+class PoolStartingCase(TestCase):
+    """ Not collected by discovery: only check_* methods, run through pool_suite(). """
+
+    @timeout(30)
+    def check_pool(self):
+        with ProcessPoolExecutor(2) as pool:
+            self.assertEqual(list(pool.map(square, range(4))), [0, 1, 4, 9])
+
+    @timeout()
+    def check_plain(self):
+        self.assertEqual(square(3), 9)
+
+
+def pool_suite():
+    return unittest.TestSuite([PoolStartingCase("check_pool"), PoolStartingCase("check_plain")])
+
+
+class TestParallelRunner(TestCase):
+
+    @number("6.51")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_tests_can_start_their_own_pool(self):
+        stream = io.StringIO()
+        records = ParallelTestRunner(pool_suite, 2, stream=stream, durations=0).run(pool_suite())
+        self.assertEqual([record["outcome"] for record in records], ["success", "success"], stream.getvalue())
+        self.assertIn("OK", stream.getvalue())
@@ -0,0 +1,74 @@
+import random
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from data_structures.array_sorted_list import ArraySortedList
+from data_structures.parallel_sorted_list import ParallelArraySortedList
+from data_structures.sorted_list_adt import ListItem
+
+
+class TestParallelArraySortedList(TestCase):
+
+    @number("6.47")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_same_order_as_array_sorted_list(self):
+        # Equal keys must end up in the same order, or OPTIMISE teams would battle differently.
+        for seed in range(50):
+            rng = random.Random(seed)
+            reference = ArraySortedList(rng.randint(1, 6))
+            parallel = ParallelArraySortedList(rng.randint(1, 6))
+            for step in range(rng.randint(0, 60)):
+                if len(reference) > 0 and rng.random() < 0.35:
+                    index = rng.randrange(len(reference))
+                    if rng.random() < 0.5:
+                        item = parallel.delete_at_index(index)
+                        expected = reference.delete_at_index(index)
+                        self.assertEqual((item.value, item.key), (expected.value, expected.key))
+                    else:
+                        self.assertEqual(parallel.delete_value_at_index(index), reference.delete_at_index(index).value)
+                else:
+                    key = rng.randint(-5, 5)
+                    reference.add(ListItem(step, key))
+                    if rng.random() < 0.5:
+                        parallel.add_pair(step, key)
+                    else:
+                        parallel.add(ListItem(step, key))
+                self.assertEqual(len(parallel), len(reference))
+                self.assertEqual(
+                    [(parallel.value_at(i), parallel.key_at(i)) for i in range(len(parallel))],
+                    [(reference[i].value, reference[i].key) for i in range(len(reference))],
+                )
+
+    @number("6.48")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_sorted_list_api(self):
+        sorted_list = ParallelArraySortedList(2)
+        for value, key in [("c", 3), ("a", 1), ("b", 2)]:
+            sorted_list.add_pair(value, key)
+        self.assertEqual(str(sorted_list), "[(a, 1), (b, 2), (c, 3)]")
+        self.assertEqual(sorted_list.index(ListItem("b", 2)), 1)
+        self.assertRaises(ValueError, sorted_list.index, ListItem("x", 2))
+        self.assertIn(ListItem("c", 3), sorted_list)
+        self.assertNotIn(ListItem("c", 4), sorted_list)
+        sorted_list.remove(ListItem("a", 1))
+        self.assertEqual(sorted_list[0].value, "b")
+
+        sorted_list[2] = ListItem("d", 4)
+        self.assertRaises(IndexError, sorted_list.__setitem__, 0, ListItem("e", 9))
+        self.assertRaises(IndexError, sorted_list.key_at, 3)
+        self.assertRaises(IndexError, sorted_list.delete_at_index, 3)
+
+        # append_sorted keeps equal keys in the order given
+        sorted_list.reset()
+        self.assertTrue(sorted_list.is_empty())
+        for value in ["x", "y", "z"]:
+            sorted_list.append_sorted(value, 5)
+        self.assertEqual([sorted_list.value_at(i) for i in range(3)], ["x", "y", "z"])
+        self.assertRaises(IndexError, sorted_list.append_sorted, "w", 4)
+        self.assertFalse(sorted_list.is_full())
+        sorted_list.append_sorted("w", 6)
+        self.assertTrue(sorted_list.is_full())
@@ -0,0 +1,128 @@
+import collections
+import random
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from data_structures.referential_array import ArrayR, ArrayRList
+
+
+class TestArrayRList(TestCase):
+
+    def check_same(self, lst: ArrayRList, model: collections.deque) -> None:
+        self.assertEqual(len(lst), len(model))
+        self.assertEqual(lst.is_empty(), len(model) == 0)
+        self.assertEqual([lst[i] for i in range(len(lst))], list(model))
+        if model:
+            self.assertEqual(lst.peek(), model[0])
+
+    @number("6.44")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_matches_deque(self):
+        # Random sequences of operations must leave the list in the same state as a deque.
+        for seed in range(200):
+            rng = random.Random(seed)
+            lst = ArrayRList(rng.randint(0, 4))
+            model = collections.deque()
+            for step in range(rng.randint(0, 80)):
+                op = rng.randrange(6)
+                if op <= 1:
+                    lst.add(step)
+                    model.append(step)
+                elif op == 2:
+                    items = [step * 100 + i for i in range(rng.randint(0, 6))]
+                    # Both sized and unsized iterables
+                    lst.extend(items if rng.random() < 0.5 else iter(items))
+                    model.extend(items)
+                elif op == 3:
+                    lst.add_front(-step)
+                    model.appendleft(-step)
+                elif op == 4:
+                    if model:
+                        self.assertEqual(lst.serve(), model.popleft())
+                    else:
+                        self.assertRaises(Exception, lst.serve)
+                else:
+                    if model:
+                        self.assertEqual(lst.pop(), model.pop())
+                    else:
+                        self.assertRaises(Exception, lst.pop)
+                self.check_same(lst, model)
+            self.assertFalse(lst.is_full())
+            if model:
+                self.assertEqual(lst.index(model[-1]), model.index(model[-1]))
+            lst.clear()
+            model.clear()
+            self.check_same(lst, model)
+
+    @number("6.45")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_queue_behaviour(self):
+        lst = ArrayRList(2)
+        self.assertTrue(lst.is_empty())
+        self.assertRaises(Exception, lst.peek)
+        self.assertRaises(IndexError, lst.__getitem__, 0)
+        for i in range(3):
+            lst.add(i)
+        self.assertEqual(lst.serve(), 0)
+        self.assertEqual(lst.serve(), 1)
+        lst.extend(range(3, 10))
+        self.assertEqual(lst.to_list(), list(range(2, 10)))
+        self.assertIn(7, lst)
+        self.assertNotIn(0, lst)
+        self.assertEqual(lst.index(5), 3)
+        self.assertRaises(ValueError, lst.index, 0)
+        lst[0] = "two"
+        self.assertEqual(str(lst), "[two, 3, 4, 5, 6, 7, 8, 9]")
+        # Served slots drop their references
+        self.assertEqual(sum(1 for i in range(len(lst.array)) if lst.array[i] is not None), len(lst))
+
+
+class TestArrayRBlockMoves(TestCase):
+
+    @number("6.46")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_block_moves(self):
+        array = ArrayR.from_iterable(range(8))
+        self.assertEqual(array.to_list(), list(range(8)))
+        self.assertEqual(ArrayR.from_iterable(x * x for x in range(3)).to_list(), [0, 1, 4])
+        self.assertEqual(len(ArrayR.from_list([])), 0)
+
+        array.shift(2, 5, 2)
+        self.assertEqual(array.to_list(), [0, 1, 2, 3, 2, 3, 4, 7])
+        array.shift(4, 7, -3)
+        self.assertEqual(array.to_list(), [0, 2, 3, 4, 2, 3, 4, 7])
+        array.shift(3, 3, 5)
+        self.assertRaises(IndexError, array.shift, 5, 8, 1)
+        self.assertRaises(IndexError, array.shift, 0, 2, -1)
+
+        other = ArrayR(4)
+        other.copy_from(array, 5, 1, 3)
+        self.assertEqual(other.to_list(), [None, 3, 4, 7])
+        other.copy_from(other, 1, 0, 3)
+        self.assertEqual(other.to_list(), [3, 4, 7, 7])
+        other.copy_from(ArrayR.from_list(["a", "b"]))
+        self.assertEqual(other.to_list(), ["a", "b", 7, 7])
+        self.assertRaises(IndexError, other.copy_from, array, 0, 0, 5)
+        self.assertRaises(IndexError, other.copy_from, array, 6, 0, 3)
+
+        # The sorted list shifts and grows with these moves
+        from data_structures.array_sorted_list import ArraySortedList
+        from data_structures.sorted_list_adt import ListItem
+        rng = random.Random(5)
+        sorted_list = ArraySortedList(1)
+        model = []
+        for step in range(300):
+            if model and rng.random() < 0.4:
+                index = rng.randrange(len(model))
+                self.assertEqual(sorted_list.delete_at_index(index).key, model.pop(index))
+            else:
+                key = rng.randint(0, 50)
+                sorted_list.add(ListItem(step, key))
+                model.append(key)
+                model.sort()
+            self.assertEqual([sorted_list[i].key for i in range(len(sorted_list))], model)
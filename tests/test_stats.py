@@ -59,3 +59,55 @@ class TestStats(TestCase):
         self.assertEqual(cs.get_defense(1), 8)
         self.assertEqual(cs.get_speed(5), 250)
         self.assertEqual(cs.get_max_hp(41), 6)
+
+    @number("6.36")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_complex_stats_folding(self):
+        cs = ComplexStats(
+            ArrayR.from_list(["5", "2", "power", "1", "+"]),
+            ArrayR.from_list(["9", "2", "8", "middle", "2", "/"]),
+            ArrayR.from_list(["level", "3", "power", "1", "2", "3", "middle", "*"]),
+            ArrayR.from_list(["level", "2", "sqrt", "*", "2", "sqrt", "2", "sqrt", "*", "+"]),
+        )
+        self.assertEqual(cs.attack_value, 26)
+        self.assertEqual(cs.defense_value, 4)
+        self.assertIsNone(cs.speed_value)
+        self.assertEqual(len(cs.speed_folded), 5)
+        self.assertEqual(cs.level_dependent(), ["speed", "max_hp"])
+        # Folding must not change any result, including the rounding of sub-expressions.
+        for level in range(1, 40):
+            for name in ComplexStats.STAT_NAMES:
+                formula = getattr(cs, name + "_formula")
+                self.assertEqual(getattr(cs, "get_" + name)(level), cs.calculate(formula, level))
+
+        # Invalid formulas are left alone, and still fail when read.
+        bad = ComplexStats(
+            ArrayR.from_list(["1", "2"]),
+            ArrayR.from_list(["1", "foo", "+"]),
+            ArrayR.from_list(["1", "0", "/"]),
+            ArrayR.from_list(["level", "+"]),
+        )
+        self.assertEqual(bad.level_dependent(), list(ComplexStats.STAT_NAMES))
+        self.assertRaises(ValueError, bad.get_attack, 1)
+        self.assertRaises(Exception, bad.get_defense, 1)
+        self.assertRaises(Exception, bad.get_speed, 1)
+        self.assertRaises(Exception, bad.get_max_hp, 1)
+
+    @number("6.37")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_level_dependent_stats(self):
+        from helpers import get_all_monsters, level_dependent_stats
+
+        report = level_dependent_stats()
+        all_monsters = get_all_monsters()
+        self.assertEqual(len(report), len(all_monsters))
+        for i in range(len(all_monsters)):
+            stats = all_monsters[i].get_complex_stats()
+            self.assertEqual(report[all_monsters[i].get_name()], stats.level_dependent())
+            for name in stats.level_dependent():
+                self.assertIsNone(getattr(stats, name + "_value"))
+            monster = all_monsters[i](simple_mode=False, level=3)
+            for name in ComplexStats.STAT_NAMES:
+                self.assertEqual(getattr(monster, "get_" + name)(), stats.calculate(getattr(stats, name + "_formula"), 3))
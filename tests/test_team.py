@@ -7,7 +7,7 @@ from ed_utils.decorators import number, visibility
 from ed_utils.timeout import timeout
 from random_gen import RandomGen
 
-from team import MonsterTeam
+from team import MonsterTeam, TeamBackend, FrontBackend, BackBackend, OptimiseBackend
 from helpers import Flamikin, Aquariuma, Vineon, Normake, Thundrake, Rockodile, Mystifly, Strikeon, Faeboa, Soundcobra
 
 from data_structures.referential_array import ArrayR
@@ -269,3 +269,72 @@ class TestTeam(TestCase):
 
         self.assertEqual(len(team.team), 1)
         self.assertIsInstance(team.retrieve_from_team(), Flamikin)
+
+    @number("6.41")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_team_backends(self):
+        for team_mode, backend in [
+            (MonsterTeam.TeamMode.FRONT, FrontBackend),
+            (MonsterTeam.TeamMode.BACK, BackBackend),
+            (MonsterTeam.TeamMode.OPTIMISE, OptimiseBackend),
+        ]:
+            team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon]), sort_key=MonsterTeam.SortMode.HP)
+            self.assertIsInstance(team.backend, backend)
+            ordered = team.monsters_in_order()
+            self.assertEqual(len(ordered), 3)
+            # Operations are bound to the backend, and special never replaces the team's ADT.
+            self.assertEqual(team.retrieve_from_team, team.backend.retrieve)
+            team.special()
+            team.special()
+            self.assertIs(team.team, team.backend.storage)
+            for i in range(len(ordered)):
+                self.assertIs(team.retrieve_from_team(), ordered[i])
+
+        # A backend missing an operation cannot be created.
+        class NoSpecialBackend(TeamBackend):
+            make_team = FrontBackend.make_team
+            add = FrontBackend.add
+            retrieve = FrontBackend.retrieve
+            in_order = FrontBackend.in_order
+
+        self.assertRaises(TypeError, NoSpecialBackend, None)
+
+        # The sort key is bound once, and still calls a monster's own stat getter.
+        class StrongVineon(Vineon):
+            def get_attack(self):
+                return 1000
+
+        team = MonsterTeam(
+            MonsterTeam.TeamMode.OPTIMISE,
+            MonsterTeam.SelectionMode.PROVIDED,
+            provided_monsters=ArrayR.from_list([Flamikin, Aquariuma]),
+            sort_key=MonsterTeam.SortMode.ATTACK,
+        )
+        team.add_to_team(StrongVineon())
+        self.assertIsInstance(team.retrieve_from_team(), StrongVineon)
+        self.assertEqual(team.mapping(StrongVineon(), MonsterTeam.SortMode.ATTACK), 1000)
+        self.assertEqual(team.mapping(Flamikin(), MonsterTeam.SortMode.HP), Flamikin().get_hp())
+
+    @number("6.43")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_special_in_place(self):
+        classes = [Flamikin, Aquariuma, Vineon, Thundrake, Rockodile, Mystifly]
+        for size in range(1, MonsterTeam.TEAM_LIMIT + 1):
+            for team_mode in (MonsterTeam.TeamMode.FRONT, MonsterTeam.TeamMode.BACK):
+                team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list(classes[:size]))
+                # Churn so the deque wraps around its array
+                for _ in range(size + 2):
+                    team.add_to_team(team.retrieve_from_team())
+                expected = [team.monsters_in_order()[i] for i in range(size)]
+                array = team.team.array
+                for _ in range(5):
+                    if team_mode == MonsterTeam.TeamMode.FRONT:
+                        expected[:3] = expected[:3][::-1]
+                    else:
+                        half = size // 2
+                        expected = expected[half:][::-1] + expected[:half]
+                    team.special()
+                    self.assertEqual([team.monsters_in_order()[i] for i in range(size)], expected)
+                    self.assertIs(team.team.array, array)
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from team_optimizer import TeamGenome, TeamOptimizer, fitness
+from helpers import Flamikin, Vineon
+
+
+class TestTeamOptimizer(TestCase):
+
+    @number("6.30")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_seeded_and_cached(self):
+        RandomGen.set_seed(42)
+        runs = []
+        for workers in (1, 2):
+            optimizer = TeamOptimizer(population_size=10, reference_size=4, seed=3, workers=workers)
+            best = optimizer.run(3)
+            runs.append((best, sorted(optimizer.cache.items(), key=lambda item: item[0].key())))
+            self.assertEqual(optimizer.evaluations, len(optimizer.cache))
+            self.assertEqual(optimizer.generation, 3)
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(RandomGen.seed, 42)
+
+        genome, score = runs[0][0]
+        self.assertEqual(score, fitness(genome, optimizer.reference))
+        self.assertEqual(score, max(optimizer.cache.values()))
+
+    @number("6.31")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_genome_identity(self):
+        a = TeamGenome("BACK", "HP", ("Flamikin", "Vineon"))
+        b = TeamGenome("BACK", "SPEED", ("Flamikin", "Vineon"))
+        c = TeamGenome("OPTIMISE", "SPEED", ("Flamikin", "Vineon"))
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(b, c)
+        self.assertEqual(len(c.build({"Flamikin": Flamikin, "Vineon": Vineon})), 2)
+        with self.assertRaises(ValueError):
+            TeamOptimizer(population_size=4, elite=4)
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from team_optimizer import TeamGenome, monster_classes
+from team_search import TeamSearch, undominated
+from matchups import MatchupMatrix
+
+
+class TestTeamSearch(TestCase):
+
+    @number("6.32")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_transpositions_match_full_battles(self):
+        classes = monster_classes()
+        candidates = ["Flamikin", "Aquariuma", "Vineon", "Rockodile", "Gustwing", "Thundrake"]
+        for mode, sort_key in (("BACK", None), ("FRONT", None), ("OPTIMISE", "SPEED")):
+            opponent = TeamGenome("FRONT", None, ("Strikeon", "Vineon", "Mystifly"))
+            search = TeamSearch(opponent, mode, sort_key, max_size=3, candidates=candidates, prune=False)
+            for monsters in search.teams():
+                result, turns = search.evaluate(monsters)
+                battle = Battle(verbosity=0)
+                expected = battle.battle(TeamGenome(mode, sort_key, monsters).build(classes), opponent.build(classes))
+                self.assertEqual((result, turns), (expected, battle.turn_number), monsters)
+            self.assertGreater(search.hits, 0)
+
+    @number("6.33")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_pruning_and_ranking(self):
+        matrix = MatchupMatrix.compute(max_level=1, workers=1)
+        opponent = TeamGenome("BACK", None, ("Flamikin", "Vineon"))
+        kept = undominated(["Flamikin", "Flamikin", "Aquariuma", "Gustwing"], ["Flamikin", "Vineon"], matrix)
+        self.assertLessEqual(kept.count("Flamikin"), 1)
+        self.assertGreater(len(kept), 0)
+
+        search = TeamSearch(opponent, max_size=2, matrix=matrix)
+        best = search.run(top=3)
+        self.assertEqual(len(best), min(3, search.nodes))
+        self.assertEqual([score for score, _ in best], sorted([score for score, _ in best], reverse=True))
+        self.assertEqual(search.nodes, len(search.candidates) + len(search.candidates) ** 2)
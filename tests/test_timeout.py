@@ -0,0 +1,47 @@
+import os
+import time
+from unittest import TestCase, skipUnless
+
+import ed_utils.timeout as timeout_module
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+
+class TestTimeout(TestCase):
+
+    @number("6.20")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @skipUnless(timeout_module.MODE == "process", "fork is not available")
+    def test_runaway_test_is_killed(self):
+        read_fd, write_fd = os.pipe()
+
+        @timeout(0.5)
+        def spin():
+            os.write(write_fd, str(os.getpid()).encode())
+            while True:
+                pass
+
+        start = time.monotonic()
+        with self.assertRaises(TimeoutError):
+            spin()
+        self.assertLess(time.monotonic() - start, 3)
+        pid = int(os.read(read_fd, 32))
+        os.close(read_fd)
+        os.close(write_fd)
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    @number("6.21")
+    @visibility(visibility.VISIBILITY_SHOW)
+    def test_results_and_errors_are_passed_back(self):
+        @timeout()
+        def add(a, b=0):
+            return a + b
+
+        @timeout()
+        def fail():
+            raise KeyError("missing")
+
+        self.assertEqual(add(1, b=2), 3)
+        with self.assertRaises(KeyError):
+            fail()
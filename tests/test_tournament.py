@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from battle import Battle
+from random_gen import RandomGen
+from team_optimizer import monster_classes
+from tournament import parse_bracket, seeded_bracket, random_entrants, play_tournament
+from tower import tournament_balanced
+from tests.brackets import random_bracket
+
+from data_structures.referential_array import ArrayR
+
+
+class TestTournament(TestCase):
+
+    @number("6.38")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_parse_bracket(self):
+        balanced = ArrayR.from_list([
+            "a", "b", "+", "c", "d", "+", "+",
+            "e", "f", "+", "g", "h", "+", "+", "+"
+        ])
+        entrants, rounds = parse_bracket(balanced)
+        self.assertEqual([entrants[i] for i in range(len(entrants))], list("abcdefgh"))
+        self.assertEqual(rounds, 3)
+        self.assertEqual(parse_bracket(ArrayR.from_list(["a"]))[1], 0)
+        for invalid in (["T1", "T2", "+", "+"], ["T1", "T2"], [], ["T1", "T2", "+", "T3", "+"]):
+            self.assertRaises(ValueError, parse_bracket, ArrayR.from_list(invalid))
+
+        # Same verdict as tournament_balanced on random brackets
+        RandomGen.set_seed(7)
+        for n in range(1, 40):
+            for _ in range(5):
+                bracket = random_bracket(n)
+                try:
+                    parse_bracket(bracket)
+                    parsed = True
+                except ValueError:
+                    parsed = False
+                self.assertEqual(parsed, tournament_balanced(bracket))
+
+        bracket = seeded_bracket([f"T{i}" for i in range(2 ** 16)])
+        self.assertEqual(len(bracket), 2 ** 17 - 1)
+        self.assertEqual(parse_bracket(bracket)[1], 16)
+        self.assertRaises(ValueError, seeded_bracket, ["a", "b", "c"])
+
+    @number("6.39")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_play_tournament(self):
+        entrants = random_entrants(32, seed=3)
+        bracket = seeded_bracket(list(entrants))
+        rounds = list(play_tournament(bracket, entrants, workers=1))
+        self.assertEqual([r.round for r in rounds], [1, 2, 3, 4, 5])
+        self.assertEqual([len(r.winners) for r in rounds], [16, 8, 4, 2, 1])
+
+        # Each winner is the team that wins (or draws as team 1) a fresh battle
+        classes = monster_classes()
+        battle = Battle(verbosity=0)
+        for r in rounds:
+            for i in range(len(r.winners)):
+                player1, player2 = r.players[2 * i], r.players[2 * i + 1]
+                result = battle.battle(entrants[player1].build(classes), entrants[player2].build(classes))
+                self.assertEqual(r.results[i], result)
+                self.assertEqual(r.winners[i], player2 if result == Battle.Result.TEAM2 else player1)
+            if r.round > 1:
+                previous = rounds[r.round - 2].winners
+                self.assertEqual([r.players[i] for i in range(len(r.players))], [previous[i] for i in range(len(previous))])
+
+        parallel = list(play_tournament(bracket, entrants, workers=2))
+        self.assertEqual(
+            [[r.winners[i] for i in range(len(r.winners))] for r in parallel],
+            [[r.winners[i] for i in range(len(r.winners))] for r in rounds],
+        )
+        self.assertRaises(ValueError, lambda: list(play_tournament(ArrayR.from_list(["T0", "X", "+"]), entrants)))
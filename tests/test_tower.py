@@ -1,3 +1,4 @@
+import io
 from unittest import TestCase
 
 from ed_utils.decorators import number, visibility, advanced
@@ -7,8 +8,9 @@ from random_gen import RandomGen
 from battle import Battle
 from elements import Element
 from team import MonsterTeam
-from tower import BattleTower, tournament_balanced
+from tower import BattleTower, tournament_balanced, bracket_balanced, bracket_tokens
 from helpers import Flamikin, Faeboa
+from tests.brackets import random_bracket
 
 from data_structures.referential_array import ArrayR
 
@@ -253,3 +255,53 @@ class TestTower(TestCase):
         self.assertFalse(tournament_balanced(invalid2))
         self.assertFalse(tournament_balanced(unbalanced))
         self.assertTrue(tournament_balanced(balanced))
+
+    @number("6.40")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(20)
+    def test_bracket_balanced(self):
+        def string_balanced(tokens):
+            # The original string-building check
+            stack = []
+            for top in tokens:
+                if top == "+":
+                    if len(stack) < 2:
+                        return False
+                    player1, player2 = stack.pop(), stack.pop()
+                    if len(player1.split("v")) != len(player2.split("v")):
+                        return False
+                    stack.append(f"({player1} v {player2})")
+                else:
+                    stack.append(top)
+            return len(stack) == 1
+
+        RandomGen.set_seed(11)
+        for n in range(1, 70):
+            for _ in range(10):
+                bracket = random_bracket(n)
+                tokens = [bracket[i] for i in range(len(bracket))]
+                self.assertEqual(bracket_balanced(iter(tokens)), string_balanced(tokens), tokens)
+
+        # Streams from a file, and stops at the first token that cannot be completed
+        f = io.StringIO("a b +\nc d + +\n e f + g h + + +\n")
+        self.assertTrue(bracket_balanced(bracket_tokens(f)))
+        consumed = []
+
+        def tokens():
+            for token in ["a", "b", "+", "c", "+", "d", "e"]:
+                consumed.append(token)
+                yield token
+            raise AssertionError("read past the imbalance")
+        self.assertFalse(bracket_balanced(tokens()))
+        self.assertEqual(consumed, ["a", "b", "+", "c", "+"])
+
+        n = 2 ** 17
+        def big_bracket():
+            for i in range(n):
+                yield "T"
+                j = i + 1
+                while j % 2 == 0:
+                    yield "+"
+                    j //= 2
+        self.assertTrue(bracket_balanced(big_bracket()))
+        self.assertFalse(bracket_balanced(iter(["T"] * 100)))
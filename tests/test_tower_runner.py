@@ -0,0 +1,41 @@
+import threading
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+
+from tower_runner import TowerSpec, run_tower, run_towers
+
+
+class TestTowerRunner(TestCase):
+
+    @number("6.28")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(60)
+    def test_pool_matches_in_process(self):
+        specs = [TowerSpec(seed, n_teams=10) for seed in range(24)]
+        summaries = []
+        progress = []
+        serial = run_towers(specs, workers=1, chunksize=5, on_summary=summaries.append,
+                            progress=lambda done, total: progress.append((done, total)))
+        pooled = run_towers(specs, workers=2, chunksize=5)
+        self.assertEqual(progress[-1], (24, 24))
+        self.assertEqual(len(progress), 5)
+        self.assertEqual([summary.seed for summary in summaries], list(range(24)))
+        for name in ("towers", "battles", "enemies_defeated", "cleared", "lives_left", "min_battles", "max_battles"):
+            self.assertEqual(getattr(serial, name), getattr(pooled, name), name)
+        self.assertEqual(list(serial.out_of_meta), list(pooled.out_of_meta))
+        self.assertEqual(serial.battles, sum(summary.battles for summary in summaries))
+
+    @number("6.29")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_cancel_and_provided_team(self):
+        spec = TowerSpec(7, n_teams=20, team_mode="OPTIMISE", monsters=("Flamikin", "Vineon"), sort_key="SPEED")
+        self.assertEqual(run_tower(spec).battles, run_tower(spec).battles)
+
+        cancel = threading.Event()
+        specs = [TowerSpec(seed, n_teams=5) for seed in range(100)]
+        stats = run_towers(specs, workers=1, chunksize=10, cancel=cancel,
+                           progress=lambda done, total: done >= 30 and cancel.set())
+        self.assertEqual(stats.towers, 30)
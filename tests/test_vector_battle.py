@@ -0,0 +1,82 @@
+from unittest import TestCase
+
+from ed_utils.decorators import number, visibility
+from ed_utils.timeout import timeout
+from random_gen import RandomGen
+
+from battle import Battle
+from team import MonsterTeam
+from vector_battle import BatchBattle
+from helpers import get_all_monsters, Flamikin, Aquariuma, Vineon, Strikeon
+
+from data_structures.referential_array import ArrayR
+
+
+def random_team(simple_mode=True):
+    team_mode = RandomGen.random_choice(ArrayR.from_list(list(MonsterTeam.TeamMode)))
+    sort_key = RandomGen.random_choice(ArrayR.from_list(list(MonsterTeam.SortMode)))
+    if simple_mode:
+        return MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+
+    team = MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR(0), sort_key=sort_key)
+    monsters = get_all_monsters()
+    for _ in range(RandomGen.randint(1, MonsterTeam.TEAM_LIMIT)):
+        monster = monsters[RandomGen.randint(0, len(monsters) - 1)]
+        team.add_to_team(monster(False, RandomGen.randint(1, 5)))
+    return team
+
+
+class TestVectorBattle(TestCase):
+
+    def cross_check(self, seeds, simple_mode):
+        batch = BatchBattle()
+        expected = []
+        for seed in seeds:
+            RandomGen.set_seed(seed)
+            team1 = random_team(simple_mode)
+            team2 = random_team(simple_mode)
+            batch.add(team1, team2)
+            b = Battle(verbosity=0)
+            expected.append((b.battle(team1, team2), b.turn_number))
+
+        results = batch.run()
+        for i in range(len(expected)):
+            self.assertEqual((results[i], batch.turns[i]), expected[i], f"Battle with seed {seeds[i]} differs")
+
+    @number("6.8")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_matches_battle_simple(self):
+        self.cross_check(range(500), True)
+
+    @number("6.9")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout(30)
+    def test_matches_battle_complex(self):
+        self.cross_check(range(1000, 1300), False)
+
+    @number("6.10")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_step_masks_finished(self):
+        batch = BatchBattle()
+        short = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Flamikin]))
+        long = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Strikeon]))
+        batch.add(short, MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Vineon])))
+        batch.add(long, MonsterTeam(MonsterTeam.TeamMode.FRONT, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Flamikin, Aquariuma, Vineon, Strikeon])))
+        self.assertEqual(len(batch.active), 2)
+        while len(batch.active) == 2:
+            batch.step()
+        finished = 0 if batch.result(0) is not None else 1
+        turns = batch.turns[finished]
+        batch.run()
+        self.assertEqual(batch.turns[finished], turns)
+        self.assertEqual(batch.active, [])
+
+    @number("6.11")
+    @visibility(visibility.VISIBILITY_SHOW)
+    @timeout()
+    def test_rejects_custom_policy(self):
+        team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=ArrayR.from_list([Flamikin]))
+        team.choose_action = lambda out, enemy: Battle.Action.ATTACK
+        self.assertRaises(ValueError, lambda: BatchBattle().add(team, team))
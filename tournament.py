@@ -0,0 +1,188 @@
+"""
+Single-elimination tournaments over brackets in the format of tower.tournament_balanced.
+
+A bracket is in reverse polish notation: entrant names, with `+` pairing the two
+brackets before it. In a balanced bracket the two sides of every `+` have the
+same number of entrants, so the bracket is a perfect binary tree whose leaves
+are the entrants in the order they are written. parse_bracket() checks this
+with tower.tournament_balanced, then reads the entrants.
+
+Playing the bracket then needs no tree: round r pairs the winners of round r - 1
+two by two, in order. All matches of a round are independent, so they are
+played in parallel worker processes, and each round is yielded as soon as it is
+done. Battles do not use RandomGen, so results do not depend on the workers.
+
+Usage:
+```
+entrants = random_entrants(1024, seed=0)
+bracket = seeded_bracket(list(entrants))
+for round_result in play_tournament(bracket, entrants):
+    print(round_result)
+```
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+from battle import Battle
+from random_gen import RandomGen
+from team import MonsterTeam
+from team_optimizer import TeamGenome, monster_classes, spawnable_names
+from tower import tournament_balanced
+
+from data_structures.referential_array import ArrayR
+
+
+def parse_bracket(bracket: ArrayR[str]) -> tuple[ArrayR[str], int]:
+    """
+    Checks that a bracket is balanced and reads its entrants.
+
+    :implementation:
+        tower.tournament_balanced checks the bracket, then the entrants are the tokens other than `+`.
+        A balanced bracket of r rounds has 2^r entrants.
+
+    :returns: The entrants, in bracket order, and the number of rounds
+    :raises ValueError: if the bracket is not balanced
+    :complexity: O(n) where n is the number of tokens in the bracket
+    """
+    if not tournament_balanced(bracket):
+        raise ValueError("bracket is not balanced")
+    entrants = [bracket[i] for i in range(len(bracket)) if bracket[i] != "+"]
+    return ArrayR.from_list(entrants), len(entrants).bit_length() - 1
+
+
+def seeded_bracket(entrants: list[str]) -> ArrayR[str]:
+    """
+    A balanced bracket pairing neighbouring entrants round by round.
+
+    :raises ValueError: if the number of entrants is not a power of two
+    :complexity: O(n) where n is the number of entrants
+    """
+    n = len(entrants)
+    if n == 0 or n & (n - 1):
+        raise ValueError("the number of entrants should be a power of two.")
+    tokens = []
+    for i in range(n):
+        tokens.append(entrants[i])
+        # After the i-th entrant, close one bracket for each round it completes.
+        j = i + 1
+        while j % 2 == 0:
+            tokens.append("+")
+            j //= 2
+    return ArrayR.from_list(tokens)
+
+
+def random_entrants(n: int, seed: int = 0, team_size: int = MonsterTeam.TEAM_LIMIT) -> dict[str, TeamGenome]:
+    """
+    n random team compositions, named T0 to T(n-1), without changing the RandomGen state.
+
+    :complexity: O(n * team_size)
+    """
+    names = spawnable_names()
+    outer_seed = RandomGen.seed
+    RandomGen.set_seed(seed)
+    try:
+        return {f"T{i}": TeamGenome.random(names, team_size) for i in range(n)}
+    finally:
+        RandomGen.seed = outer_seed
+
+
+_classes = None
+
+
+def play_match(match: tuple[TeamGenome, TeamGenome]) -> Battle.Result:
+    """
+    Battles two fresh teams. Module level so it can be sent to worker processes.
+
+    :complexity: O(b) where b is the cost of a battle
+    """
+    global _classes
+    if _classes is None:
+        _classes = monster_classes()
+    team1, team2 = match
+    return Battle(verbosity=0).battle(team1.build(_classes), team2.build(_classes))
+
+
+class RoundResult:
+    """
+    The matches of one round.
+
+    Attributes:
+        round (int): the round number, from 1
+        players (ArrayR[str]): the entrants playing, two per match in order
+        results (ArrayR[Battle.Result]): the result of each match
+        winners (ArrayR[str]): the entrant advancing from each match
+        elapsed (float): seconds taken to play the round
+    """
+
+    def __init__(self, round: int, players: ArrayR[str], results: ArrayR[Battle.Result], winners: ArrayR[str], elapsed: float) -> None:
+        self.round = round
+        self.players = players
+        self.results = results
+        self.winners = winners
+        self.elapsed = elapsed
+
+    def __str__(self) -> str:
+        draws = sum(1 for i in range(len(self.results)) if self.results[i] == Battle.Result.DRAW)
+        return f"Round {self.round}: {len(self.winners)} matches, {draws} draws in {self.elapsed:.2f}s"
+
+
+def play_tournament(bracket: ArrayR[str], entrants: dict[str, TeamGenome], workers: int | None = None,
+                    chunksize: int | None = None) -> Iterator[RoundResult]:
+    """
+    Plays a balanced bracket round by round, yielding each round once it is done.
+    Every match is between fresh, fully healed teams. On a draw, the entrant
+    written first in the bracket advances. The champion is the only winner of the last round.
+
+    :param entrants: The team composition of every entrant, by name
+    :param workers: The number of worker processes. 1 plays in this process, None uses one per core.
+    :param chunksize: Matches sent to a worker at a time, by default a quarter of a round per worker
+    :raises ValueError: if the bracket is not balanced or an entrant has no team
+    :complexity: O(n * b / w) where n is the number of entrants, b the cost of a battle and w the number of workers
+    """
+    players, rounds = parse_bracket(bracket)
+    for i in range(len(players)):
+        if players[i] not in entrants:
+            raise ValueError(f"entrant {players[i]} has no team")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        for number in range(1, rounds + 1):
+            start = time.perf_counter()
+            matches = [(entrants[players[i]], entrants[players[i + 1]]) for i in range(0, len(players), 2)]
+            if pool is not None:
+                per_worker = max(1, len(matches) // (4 * (workers or os.cpu_count() or 1)))
+                results = list(pool.map(play_match, matches, chunksize=chunksize or per_worker))
+            else:
+                results = [play_match(match) for match in matches]
+
+            winners = ArrayR(len(matches))
+            for i in range(len(matches)):
+                winners[i] = players[2 * i + 1] if results[i] == Battle.Result.TEAM2 else players[2 * i]
+            yield RoundResult(number, players, ArrayR.from_list(results), winners, time.perf_counter() - start)
+            players = winners
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Play a single-elimination tournament between random teams.")
+    p.add_argument("--rounds", type=int, default=10, help="The bracket has 2^rounds entrants.")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--team-size", type=int, default=MonsterTeam.TEAM_LIMIT)
+    p.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    args = p.parse_args()
+
+    entrants = random_entrants(2 ** args.rounds, args.seed, args.team_size)
+    bracket = seeded_bracket(list(entrants))
+    champion = None
+    for round_result in play_tournament(bracket, entrants, args.workers):
+        print(round_result, flush=True)
+        champion = round_result.winners[0]
+    if champion is not None:
+        print(f"Champion: {champion} ({entrants[champion]})")
@@ -6,13 +6,109 @@ from battle import Battle
 
 from elements import Element, EffectivenessCalculator
 
+from typing import Callable, Iterable, Iterator, TextIO
+
 from data_structures.referential_array import ArrayR, ArrayRList
-from data_structures.queue_adt import CircularQueue
+from data_structures.queue_adt import Queue, CircularQueue
 
 from data_structures.bset import BSet
 from data_structures.stack_adt import ArrayStack
 from helpers import Flamikin, Faeboa
 
+class LazyTeamQueue(Queue[MonsterTeam]):
+    """
+    Queue of enemy teams which are only created when they reach the front.
+
+    The first n teams are created on demand by make_team, using their own RandomGen
+    stream starting from the seed given, so they are identical to the teams an eager
+    queue would have created from that seed. Served teams that are appended back are
+    kept in a live ArrayRList, which grows as needed, so memory is proportional to the
+    number of teams still alive rather than n.
+
+    Attributes:
+        pending (int): number of teams not yet created
+        seed (int): RandomGen state used to create the next pending team
+        live (ArrayRList[MonsterTeam]): created teams, in queue order after the pending ones
+        next_team (MonsterTeam | None): a pending team created early by peek()
+    """
+
+    def __init__(self, n: int, seed: int, make_team: Callable[[], MonsterTeam]) -> None:
+        """
+        :complexity: O(1)
+        """
+        Queue.__init__(self)
+        self.pending = n
+        self.seed = seed
+        self.make_team = make_team
+        self.live = ArrayRList[MonsterTeam]()
+        self.next_team = None
+
+    def __len__(self) -> int:
+        return self.pending + len(self.live) + (self.next_team is not None)
+
+    def create_next(self) -> MonsterTeam:
+        """
+        Creates the next pending team from the queue's own RandomGen stream,
+        leaving the global RandomGen state untouched.
+
+        :complexity: O(c) where c is the cost of make_team
+        """
+        outer_seed = RandomGen.seed
+        RandomGen.seed = self.seed
+        try:
+            team = self.make_team()
+        finally:
+            self.seed = RandomGen.seed
+            RandomGen.seed = outer_seed
+        self.pending -= 1
+        return team
+
+    def append(self, item: MonsterTeam) -> None:
+        """
+        Adds a team to the rear of the queue.
+
+        :complexity: O(1) amortised, O(l) when the live list of l teams grows
+        """
+        self.live.append(item)
+
+    def serve(self) -> MonsterTeam:
+        """
+        Removes and returns the team at the front, creating it if it is still pending.
+
+        :raises Exception: if the queue is empty
+        :complexity: O(c) where c is the cost of creating a team
+        """
+        if self.next_team is not None:
+            team, self.next_team = self.next_team, None
+            return team
+        if self.pending > 0:
+            return self.create_next()
+        return self.live.serve()
+
+    def peek(self) -> MonsterTeam:
+        """
+        Returns the team at the front, creating it if it is still pending.
+
+        :raises Exception: if the queue is empty
+        :complexity: O(c) where c is the cost of creating a team
+        """
+        if self.next_team is None and self.pending > 0:
+            self.next_team = self.create_next()
+        if self.next_team is not None:
+            return self.next_team
+        return self.live.peek()
+
+    def is_full(self) -> bool:
+        """The queue grows as needed, so it is never full."""
+        return False
+
+    def clear(self) -> None:
+        """Removes all teams, including pending ones."""
+        self.pending = 0
+        self.live.clear()
+        self.next_team = None
+
+
 class BattleTower:
 
     MIN_LIVES = 2
@@ -64,7 +160,7 @@ class BattleTower:
 
 
 
-    def generate_teams(self, n: int) -> None:
+    def generate_teams(self, n: int, lazy: bool = False) -> None:
         """
         The function generates a specified number of enemy teams for battle. 
 
@@ -72,15 +168,31 @@ class BattleTower:
             We create n teams and then add them into a queue. We have used a queue since the FIFO nature of the queue
             is exactly what we need when deciding which team will be fighting against the player.
 
+            In lazy mode the queue only records the current RandomGen seed, and each team is created when it
+            is first served. The teams are the same as the eager ones, but the global RandomGen state is not
+            advanced past them.
+
         :param n: The number of enemy teams to be generated
-        :complexity: O(n) where n is the number of enemy teams to be generated
+        :param lazy: Whether to create the teams on demand
+        :complexity: O(n) where n is the number of enemy teams to be generated, O(1) in lazy mode
 
         """
+        if lazy:
+            self.enemy_teams = LazyTeamQueue(n, RandomGen.seed, self.new_enemy_team)
+            return
         self.enemy_teams = CircularQueue[MonsterTeam](n)
         for _ in range(n):
-            new_enemy_team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
-            new_enemy_team.lives = RandomGen.randint(self.MIN_LIVES, self.MAX_LIVES)
-            self.enemy_teams.append(new_enemy_team)
+            self.enemy_teams.append(self.new_enemy_team())
+
+    def new_enemy_team(self) -> MonsterTeam:
+        """
+        Creates a random enemy team with a random number of lives.
+
+        :complexity: O(n) where n is the number of monsters in the team
+        """
+        new_enemy_team = MonsterTeam(MonsterTeam.TeamMode.BACK, MonsterTeam.SelectionMode.RANDOM)
+        new_enemy_team.lives = RandomGen.randint(self.MIN_LIVES, self.MAX_LIVES)
+        return new_enemy_team
             
     def battles_remaining(self) -> bool:
         """
@@ -117,8 +229,7 @@ class BattleTower:
         team_to_fight = self.enemy_teams.serve()
 
         self.process_elements(team_to_fight)
-        curr_battle = Battle(3)
-        result = curr_battle.battle(self.player_team, team_to_fight)
+        result = self.battle.battle(self.player_team, team_to_fight)
         if result == Battle.Result.TEAM1:
             team_to_fight.lives -= 1
         elif result == Battle.Result.TEAM2:
@@ -284,13 +395,71 @@ class BattleTower:
 
              
 
+# Sizes on the stack are distinct powers of two except for the top pair, so this is enough
+# for any bracket with fewer than 2^63 entrants.
+BRACKET_STACK_LIMIT = 65
+
+
+def bracket_balanced(tokens: Iterable[str]) -> bool:
+    """
+    Determines if a tournament bracket is balanced, reading its tokens one at a time.
+
+    :implementation:
+        Like tournament_balanced, a stack is used, but it holds the number of teams in each
+        bracket rather than its match string, so a + is a comparison and an addition.
+        A bracket can only be paired with the one built just above it, and brackets never
+        shrink, so the sizes must decrease up the stack, apart from the top two just before
+        the + that pairs them. Any other stack can never be completed, so we return as soon
+        as we see one, and the stack never holds more than BRACKET_STACK_LIMIT sizes.
+
+    :param tokens: The tokens of a possible tournament bracket, e.g. bracket_tokens() of a file
+    :returns: A boolean indicating if the tournament bracket is balanced
+    :complexity: O(n) worst case where n is the number of tokens, O(1) best case when the
+        first tokens cannot be completed. O(log n) memory.
+    """
+    stack = ArrayStack[int](BRACKET_STACK_LIMIT)
+    for top in tokens:
+        if top == "+":
+            if len(stack) < 2:
+                return False
+            size = stack.pop()
+            if stack.peek() != size:
+                return False
+            size += stack.pop()
+            if len(stack) > 0 and stack.peek() < size:
+                return False
+            stack.push(size)
+        else:
+            if len(stack) >= 2:
+                size = stack.pop()
+                paired = stack.peek() == size
+                stack.push(size)
+                if paired:
+                    return False
+            if stack.is_full():
+                return False
+            stack.push(1)
+    return len(stack) == 1
+
+
+def bracket_tokens(f: TextIO) -> Iterator[str]:
+    """
+    The whitespace-separated tokens of a bracket file, read line by line.
+
+    :complexity: O(c) where c is the number of characters in the file
+    """
+    for line in f:
+        yield from line.split()
+
+
 def tournament_balanced(tournament_array: ArrayR[str]):
     """
     Determines if a tournament bracket is balanced
 
     :implementation:
         Uses a similar idea to the complex calculator in that a stack is used but in this situation,
-        the only operator we have is + which indicates brackets coming together. 
+        the only operator we have is + which indicates brackets coming together.
+        See bracket_balanced.
     
     :param tournament_array: An array containing a possible tournament bracket
     :returns: A boolean indicating if a tournament bracket is balanced
@@ -298,26 +467,7 @@ def tournament_balanced(tournament_array: ArrayR[str]):
     :complexity: O(n) in the worst case where n is the number of elements in the tournament array
     """
     # 1054 ONLY
-    stack = ArrayStack[str](len(tournament_array))
-    i = 0
-    for i in range(len(tournament_array)):
-        top = tournament_array[i]
-        if top == "+":
-            try:
-                player1 = stack.pop()
-                player2 = stack.pop()
-                if len(player1.split("v")) != len(player2.split("v")):
-                    return False
-                stack.push(f"({player1} v {player2})")
-            except:
-                return False
-        else:
-            stack.push(top)
-    
-    if len(stack) == 1:
-        return True 
-    else: #If there is more than one thing in the stack, that means a proper tournament was not able to be formed
-        return False
+    return bracket_balanced(tournament_array[i] for i in range(len(tournament_array)))
 
 
 if __name__ == "__main__":
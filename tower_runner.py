@@ -0,0 +1,313 @@
+"""
+Runs many independent BattleTowers across a process pool.
+
+Each tower is described by a TowerSpec (seed, number of enemy teams and the
+player team) and produces a small TowerSummary. Summaries are streamed back
+as towers finish and folded into a TowerStats aggregate, so memory does not
+grow with the number of towers. Towers are sent to workers in chunks to keep
+the inter-process overhead low, and only a bounded number of chunks are in
+flight at once, which also makes cancellation prompt.
+
+Usage:
+```
+specs = [TowerSpec(seed, n_teams=100) for seed in range(10000)]
+stats = run_towers(specs, progress=lambda done, total: print(done, "/", total))
+print(stats)
+```
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterable
+
+from battle import Battle
+from elements import Element, EffectivenessCalculator
+from random_gen import RandomGen
+from team import MonsterTeam
+from tower import BattleTower
+from helpers import get_all_monsters
+
+from data_structures.referential_array import ArrayR
+
+
+class TowerSpec:
+    """
+    One tower to run.
+
+    Attributes:
+        seed (int): RandomGen seed for the tower
+        n_teams (int): number of enemy teams
+        team_mode (str): name of the player's TeamMode
+        monsters (tuple[str, ...] | None): names of the player's monsters, None for a random team
+        sort_key (str | None): name of the SortMode for OPTIMISE teams
+        max_battles (int | None): stop the tower after this many battles
+    """
+
+    def __init__(self, seed: int, n_teams: int = 100, team_mode: str = "BACK", monsters: tuple[str, ...] | None = None,
+                 sort_key: str | None = None, max_battles: int | None = None) -> None:
+        self.seed = seed
+        self.n_teams = n_teams
+        self.team_mode = team_mode
+        self.monsters = monsters
+        self.sort_key = sort_key
+        self.max_battles = max_battles
+
+    def player_team(self) -> MonsterTeam:
+        """
+        Builds the player team. Must be called after seeding RandomGen.
+
+        :raises KeyError: if a monster name is not defined in monsters.yaml
+        :complexity: O(n) where n is the size of the team
+        """
+        team_mode = MonsterTeam.TeamMode[self.team_mode]
+        sort_key = MonsterTeam.SortMode[self.sort_key] if self.sort_key else MonsterTeam.SortMode.HP
+        if self.monsters is None:
+            return MonsterTeam(team_mode, MonsterTeam.SelectionMode.RANDOM, sort_key=sort_key)
+        all_monsters = get_all_monsters()
+        classes = {all_monsters[i].get_name(): all_monsters[i] for i in range(len(all_monsters))}
+        provided = ArrayR.from_list([classes[name] for name in self.monsters])
+        return MonsterTeam(team_mode, MonsterTeam.SelectionMode.PROVIDED, provided_monsters=provided, sort_key=sort_key)
+
+
+class TowerSummary:
+    """
+    The outcome of one tower.
+
+    Attributes:
+        seed (int): the tower's seed
+        battles (int): battles fought
+        enemies_defeated (int): enemy teams that ran out of lives
+        lives_left (int): the player's remaining lives
+        enemies_left (int): enemy teams still in the tower
+        out_of_meta (int): bit set of the elements that were out of the meta when the tower stopped
+    """
+
+    def __init__(self, seed: int, battles: int, enemies_defeated: int, lives_left: int, enemies_left: int, out_of_meta: int) -> None:
+        self.seed = seed
+        self.battles = battles
+        self.enemies_defeated = enemies_defeated
+        self.lives_left = lives_left
+        self.enemies_left = enemies_left
+        self.out_of_meta = out_of_meta
+
+    @property
+    def cleared(self) -> bool:
+        """Whether the player defeated every enemy team."""
+        return self.enemies_left == 0 and self.lives_left > 0
+
+
+def team_elements(team: MonsterTeam) -> int:
+    """
+    Bit set of the elements of the monsters in a team, in the same layout as BSet.
+
+    :complexity: O(n) where n is the number of monsters in the team
+    """
+    elements = 0
+    monsters = team.monsters_in_order()
+    for i in range(len(monsters)):
+        elements |= 1 << (Element.from_string(monsters[i].get_element()).value - 1)
+    return elements
+
+
+def out_of_meta_elements(tower: BattleTower) -> int:
+    """
+    The seen elements not held by the player or the next enemy team, like
+    BattleTower.out_of_meta but without retrieving monsters from the teams.
+
+    :complexity: O(n + m) where n and m are the sizes of the two teams
+    """
+    in_meta = team_elements(tower.player_team)
+    if len(tower.enemy_teams) > 0:
+        in_meta |= team_elements(tower.enemy_teams.peek())
+    return tower.seen_elements.elems & ~in_meta
+
+
+def run_tower(spec: TowerSpec) -> TowerSummary:
+    """
+    Runs one tower until the player or the enemies run out of lives.
+
+    :complexity: O(b * m) where b is the number of battles and m the cost of one battle
+    """
+    RandomGen.set_seed(spec.seed)
+    tower = BattleTower(Battle(verbosity=0))
+    tower.set_my_team(spec.player_team())
+    tower.generate_teams(spec.n_teams, lazy=True)
+    battles = 0
+    defeated = 0
+    while tower.battles_remaining() and (spec.max_battles is None or battles < spec.max_battles):
+        _, _, _, _, enemy_lives = tower.next_battle()
+        battles += 1
+        if enemy_lives <= 0:
+            defeated += 1
+    return TowerSummary(spec.seed, battles, defeated, tower.player_team.lives, len(tower.enemy_teams), out_of_meta_elements(tower))
+
+
+def _run_chunk(specs: list[TowerSpec]) -> list[TowerSummary]:
+    """Runs a chunk of towers in a worker process."""
+    return [run_tower(spec) for spec in specs]
+
+
+class TowerStats:
+    """
+    Running aggregate of tower summaries.
+
+    Attributes:
+        towers (int): towers summarised
+        battles (int): battles fought in total
+        enemies_defeated (int): enemy teams defeated in total
+        cleared (int): towers where the player defeated every enemy team
+        lives_left (dict[int, int]): number of towers by lives the player had left
+        out_of_meta (ArrayR[int]): number of towers in which each element was out of the meta, by element value - 1
+        min_battles (int | None): fewest battles in a tower
+        max_battles (int | None): most battles in a tower
+    """
+
+    def __init__(self) -> None:
+        EffectivenessCalculator.make_singleton()
+        self.towers = 0
+        self.battles = 0
+        self.enemies_defeated = 0
+        self.cleared = 0
+        self.lives_left = {}
+        self.out_of_meta = ArrayR.from_list([0] * len(EffectivenessCalculator.instance.element_names))
+        self.min_battles = None
+        self.max_battles = None
+
+    def add(self, summary: TowerSummary) -> None:
+        """
+        Folds one summary into the aggregate.
+
+        :complexity: O(e) where e is the number of elements
+        """
+        self.towers += 1
+        self.battles += summary.battles
+        self.enemies_defeated += summary.enemies_defeated
+        self.cleared += summary.cleared
+        self.lives_left[summary.lives_left] = self.lives_left.get(summary.lives_left, 0) + 1
+        for i in range(len(self.out_of_meta)):
+            if (summary.out_of_meta >> i) & 1:
+                self.out_of_meta[i] += 1
+        if self.min_battles is None or summary.battles < self.min_battles:
+            self.min_battles = summary.battles
+        if self.max_battles is None or summary.battles > self.max_battles:
+            self.max_battles = summary.battles
+
+    def __str__(self) -> str:
+        if self.towers == 0:
+            return "No towers run"
+        lines = [
+            f"Towers: {self.towers}, cleared: {self.cleared} ({self.cleared / self.towers:.1%})",
+            f"Battles: {self.battles} (mean {self.battles / self.towers:.1f}, min {self.min_battles}, max {self.max_battles})",
+            f"Enemies defeated: {self.enemies_defeated} (mean {self.enemies_defeated / self.towers:.1f})",
+            "Lives left: " + ", ".join(f"{lives}: {count}" for lives, count in sorted(self.lives_left.items())),
+        ]
+        out_of_meta = [f"{Element(i + 1).name}: {self.out_of_meta[i]}" for i in range(len(self.out_of_meta)) if self.out_of_meta[i]]
+        lines.append("Out of meta: " + (", ".join(out_of_meta) or "none"))
+        return "\n".join(lines)
+
+
+def run_towers(specs: Iterable[TowerSpec], workers: int | None = None, chunksize: int = 8,
+               stats: TowerStats | None = None, on_summary: Callable[[TowerSummary], None] | None = None,
+               progress: Callable[[int, int | None], None] | None = None,
+               cancel: threading.Event | None = None) -> TowerStats:
+    """
+    Runs every tower, folding the summaries into stats as they arrive.
+
+    :param workers: The number of worker processes. 1 runs in this process, None uses one per core.
+    :param chunksize: Towers sent to a worker at a time
+    :param on_summary: Called with each summary as it arrives (in completion order)
+    :param progress: Called with the number of towers done and the total (None if unknown)
+    :param cancel: When set, no more towers are started and the run returns what it has
+    :returns: The aggregate of the towers that finished
+    :complexity: O(T * c / w) where T is the number of towers, c the cost of one tower and w the number of workers
+    """
+    if chunksize < 1:
+        raise ValueError("chunksize should be at least 1.")
+    stats = stats or TowerStats()
+    total = len(specs) if hasattr(specs, "__len__") else None
+    done = 0
+
+    def collect(summaries: list[TowerSummary]) -> None:
+        nonlocal done
+        for summary in summaries:
+            stats.add(summary)
+            if on_summary is not None:
+                on_summary(summary)
+        done += len(summaries)
+        if progress is not None:
+            progress(done, total)
+
+    def chunks():
+        chunk = []
+        for spec in specs:
+            chunk.append(spec)
+            if len(chunk) == chunksize:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    if workers == 1:
+        for chunk in chunks():
+            if cancel is not None and cancel.is_set():
+                break
+            collect(_run_chunk(chunk))
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    pending_chunks = chunks()
+    in_flight = set()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                while len(in_flight) < 2 * workers and not (cancel is not None and cancel.is_set()):
+                    chunk = next(pending_chunks, None)
+                    if chunk is None:
+                        break
+                    in_flight.add(pool.submit(_run_chunk, chunk))
+                if not in_flight:
+                    break
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    collect(future.result())
+        except BaseException:
+            for future in in_flight:
+                future.cancel()
+            raise
+    return stats
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Run many seeded BattleTowers in parallel and aggregate the results.")
+    p.add_argument("--towers", type=int, default=1000)
+    p.add_argument("--first-seed", type=int, default=0)
+    p.add_argument("--teams", type=int, default=100, help="Enemy teams per tower.")
+    p.add_argument("--mode", default="BACK", choices=[mode.name for mode in MonsterTeam.TeamMode])
+    p.add_argument("--sort-key", default=None, choices=[mode.name for mode in MonsterTeam.SortMode])
+    p.add_argument("--monsters", nargs="*", default=None, help="Player monster names (default: random team per tower).")
+    p.add_argument("--max-battles", type=int, default=None)
+    p.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    p.add_argument("--chunksize", type=int, default=8)
+    args = p.parse_args()
+
+    specs = [
+        TowerSpec(seed, args.teams, args.mode, tuple(args.monsters) if args.monsters else None, args.sort_key, args.max_battles)
+        for seed in range(args.first_seed, args.first_seed + args.towers)
+    ]
+
+    def report(done: int, total: int | None) -> None:
+        sys.stderr.write(f"\r{done}/{total} towers")
+        sys.stderr.flush()
+
+    cancel = threading.Event()
+    stats = TowerStats()
+    try:
+        run_towers(specs, args.workers, args.chunksize, stats, progress=report, cancel=cancel)
+    except KeyboardInterrupt:
+        sys.stderr.write("\nCancelled, partial results:")
+    sys.stderr.write("\n")
+    print(stats)
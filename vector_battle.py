@@ -0,0 +1,476 @@
+"""
+Struct-of-arrays battle engine for mass simulation.
+
+Battle, MonsterTeam and MonsterBase spend most of their time on object and ADT
+overhead. BatchBattle instead encodes many battles as flat parallel arrays:
+
+* a monster pool, one column each for class id, stats mode, level, initial level and hp
+* per team (two per battle) the pool indices of its monsters, its mode, cursor and length
+* per battle the monster each side has out, the result and the turn count
+
+Every call to step() advances all unfinished battles by one turn using the default
+MonsterTeam.choose_action policy and the damage formula of MonsterBase.attack,
+so results match Battle.battle() exactly. Finished battles are masked out of the
+active list.
+
+NumPy is not available to this project, so columns are plain Python lists and a
+step is one tight loop over the active battles rather than whole-array operations.
+
+Usage:
+```
+batch = BatchBattle()
+for team1, team2 in matchups:
+    batch.add(team1, team2)
+batch.run()
+print(batch.result(0), batch.turns[0])
+```
+"""
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING
+
+from battle import Battle
+from elements import Element, EffectivenessCalculator
+from helpers import get_all_monsters
+from team import MonsterTeam
+
+from data_structures.referential_array import ArrayR
+
+if TYPE_CHECKING:
+    from monster_base import MonsterBase
+
+
+FRONT = 0
+BACK = 1
+OPTIMISE = 2
+
+RUNNING = 0
+TEAM1 = Battle.Result.TEAM1.value
+TEAM2 = Battle.Result.TEAM2.value
+DRAW = Battle.Result.DRAW.value
+
+HP, ATTACK, DEFENSE, SPEED, LEVEL = (mode.value for mode in MonsterTeam.SortMode)
+
+
+class BatchBattle:
+    """
+    Many battles between default-policy teams, stored as parallel arrays.
+
+    Attributes:
+        results (list[int]): Battle.Result value of each battle, 0 while running
+        turns (list[int]): turns taken by each battle so far
+        active (list[int]): indices of the battles that are still running
+    """
+
+    CAPACITY = MonsterTeam.TEAM_LIMIT
+
+    def __init__(self) -> None:
+        """
+        Builds the per-class tables shared by every battle.
+
+        :complexity: O(a^2) where a is the number of monster classes
+        """
+        EffectivenessCalculator.make_singleton()
+        monsters = get_all_monsters()
+        self.classes = monsters
+        self.class_id = {}
+        self.evolution = [-1] * len(monsters)
+        for i in range(len(monsters)):
+            self.class_id[monsters[i]] = i
+        for i in range(len(monsters)):
+            evolution = monsters[i].get_evolution()
+            if evolution is not None:
+                self.evolution[i] = self.class_id[evolution]
+
+        # Element multipliers for every attacking/defending class pair.
+        elements = [Element.from_string(monsters[i].get_element()) for i in range(len(monsters))]
+        self.multiplier = [
+            [EffectivenessCalculator.get_effectiveness(elements[i], elements[j]) for j in range(len(monsters))]
+            for i in range(len(monsters))
+        ]
+        self._stats = {}
+
+        # Monster pool
+        self.m_class = []
+        self.m_simple = []
+        self.m_level = []
+        self.m_init = []
+        self.m_hp = []
+
+        # Teams, two per battle (index 2 * battle + side)
+        self.t_mode = []
+        self.t_sort = []
+        self.t_descending = []
+        self.t_head = []
+        self.t_len = []
+        self.t_slots = []
+        self.t_keys = []
+
+        # Battles
+        self.out = []
+        self.results = []
+        self.turns = []
+        self.active = []
+
+    def __len__(self) -> int:
+        """Number of battles in the batch"""
+        return len(self.results)
+
+    def stats(self, monster: int) -> tuple:
+        """
+        The (attack, defense, speed, max hp) of a pool monster at its current level.
+
+        :complexity: O(1) amortised, stats are computed once per class, mode and level
+        """
+        key = (self.m_class[monster], self.m_simple[monster], self.m_level[monster])
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = self._compute_stats(*key)
+        return stats
+
+    def _compute_stats(self, class_id: int, simple_mode: bool, level: int) -> tuple:
+        """
+        Reads the stats of a class from its monster definition.
+
+        :complexity: O(f) where f is the length of the longest complex formula
+        """
+        stats = self.classes[class_id].get_simple_stats() if simple_mode else self.classes[class_id].get_complex_stats()
+        if simple_mode:
+            return stats.get_attack(), stats.get_defense(), stats.get_speed(), stats.get_max_hp()
+        return stats.get_attack(level), stats.get_defense(level), stats.get_speed(level), stats.get_max_hp(level)
+
+    def _new_monster(self, class_id: int, simple_mode: bool, level: int, init_level: int, hp: int) -> int:
+        """
+        Adds a monster to the pool and returns its index.
+
+        :complexity: O(1) amortised
+        """
+        self.m_class.append(class_id)
+        self.m_simple.append(simple_mode)
+        self.m_level.append(level)
+        self.m_init.append(init_level)
+        self.m_hp.append(hp)
+        return len(self.m_class) - 1
+
+    def _encode_monster(self, monster: MonsterBase) -> int:
+        """
+        Copies a live monster into the pool.
+
+        :raises ValueError: if the monster is not one of the classes defined in monsters.yaml
+        :complexity: O(1)
+        """
+        class_id = self.class_id.get(type(monster))
+        if class_id is None:
+            raise ValueError(f"{type(monster).__name__} is not a monster defined in monsters.yaml")
+        return self._new_monster(class_id, monster.simple_mode, monster.curr_level, monster.init_level, monster.get_hp())
+
+    def _encode_team(self, team: MonsterTeam) -> None:
+        """
+        Appends a team's mode and monsters to the team columns.
+
+        :raises ValueError: if the team does not use the default policy
+        :complexity: O(n) where n is the number of monsters in the team
+        """
+        if getattr(team.choose_action, "__func__", None) is not MonsterTeam.choose_action:
+            raise ValueError("BatchBattle only simulates the default choose_action policy")
+
+        ordered = team.monsters_in_order()
+        slots = [-1] * self.CAPACITY
+        keys = [0] * self.CAPACITY
+        if team.team_mode == MonsterTeam.TeamMode.FRONT:
+            mode = FRONT
+            for i in range(len(ordered)):
+                slots[len(ordered) - 1 - i] = self._encode_monster(ordered[i])
+        elif team.team_mode == MonsterTeam.TeamMode.BACK:
+            mode = BACK
+            for i in range(len(ordered)):
+                slots[i] = self._encode_monster(ordered[i])
+        else:
+            mode = OPTIMISE
+            for i in range(len(ordered)):
+                slots[i] = self._encode_monster(ordered[i])
+                keys[i] = team.team.key_at(i)
+
+        self.t_mode.append(mode)
+        self.t_sort.append(team.sort_mode.value if mode == OPTIMISE else 0)
+        self.t_descending.append(mode == OPTIMISE and team.descending)
+        self.t_head.append(0)
+        self.t_len.append(len(ordered))
+        self.t_slots.extend(slots)
+        self.t_keys.extend(keys)
+
+    def add(self, team1: MonsterTeam, team2: MonsterTeam) -> int:
+        """
+        Adds a battle between two teams, which are left untouched.
+
+        :returns: The index of the new battle
+        :raises ValueError: if either team cannot be simulated by this engine
+        :complexity: O(n + m) where n and m are the sizes of the teams
+        """
+        if len(team1) == 0 or len(team2) == 0:
+            raise ValueError("Both teams need at least one monster")
+        b = len(self.results)
+        self._encode_team(team1)
+        self._encode_team(team2)
+        self.out.append(self._retrieve(2 * b))
+        self.out.append(self._retrieve(2 * b + 1))
+        self.results.append(RUNNING)
+        self.turns.append(0)
+        self.active.append(b)
+        return b
+
+    def result(self, b: int) -> Battle.Result | None:
+        """The result of a battle, or None while it is running"""
+        if self.results[b] == RUNNING:
+            return None
+        return Battle.Result(self.results[b])
+
+    ### Team operations, mirroring MonsterTeam for each mode.
+
+    def _sort_key(self, t: int, monster: int):
+        """
+        Key used to order a monster in an OPTIMISE team, see MonsterTeam.mapping
+
+        :complexity: O(1)
+        """
+        sort = self.t_sort[t]
+        if sort == HP:
+            key = self.m_hp[monster]
+        elif sort == LEVEL:
+            key = self.m_level[monster]
+        else:
+            stats = self.stats(monster)
+            key = stats[0] if sort == ATTACK else stats[1] if sort == DEFENSE else stats[2]
+        return -1 * key if self.t_descending[t] else key
+
+    def _add(self, t: int, monster: int) -> None:
+        """
+        Adds a monster to a team, see MonsterTeam.add_to_team
+
+        :complexity: O(1) for FRONT/BACK, O(n) for OPTIMISE
+        """
+        base = t * self.CAPACITY
+        length = self.t_len[t]
+        mode = self.t_mode[t]
+        slots = self.t_slots
+        if mode == FRONT:
+            slots[base + length] = monster
+        elif mode == BACK:
+            slots[base + (self.t_head[t] + length) % self.CAPACITY] = monster
+        else:
+            keys = self.t_keys
+            key = self._sort_key(t, monster)
+            # Same search as ArraySortedList._index_to_add, so equal keys land in the same place.
+            low = 0
+            high = length - 1
+            position = -1
+            while low <= high:
+                mid = (low + high) // 2
+                if keys[base + mid] < key:
+                    low = mid + 1
+                elif keys[base + mid] > key:
+                    high = mid - 1
+                else:
+                    position = mid
+                    break
+            if position == -1:
+                position = low
+            for i in range(length, position, -1):
+                slots[base + i] = slots[base + i - 1]
+                keys[base + i] = keys[base + i - 1]
+            slots[base + position] = monster
+            keys[base + position] = key
+        self.t_len[t] = length + 1
+
+    def _retrieve(self, t: int) -> int:
+        """
+        Removes the next monster from a team, see MonsterTeam.retrieve_from_team
+
+        :complexity: O(1) for FRONT/BACK, O(n) for OPTIMISE
+        """
+        base = t * self.CAPACITY
+        length = self.t_len[t] - 1
+        self.t_len[t] = length
+        mode = self.t_mode[t]
+        slots = self.t_slots
+        if mode == FRONT:
+            return slots[base + length]
+        elif mode == BACK:
+            head = self.t_head[t]
+            self.t_head[t] = (head + 1) % self.CAPACITY
+            return slots[base + head]
+        else:
+            keys = self.t_keys
+            monster = slots[base]
+            for i in range(length):
+                slots[base + i] = slots[base + i + 1]
+                keys[base + i] = keys[base + i + 1]
+            return monster
+
+    ### Monster operations, mirroring MonsterBase.
+
+    def _attack(self, attacker: int, defender: int) -> None:
+        """
+        Same damage formula as MonsterBase.attack
+
+        :complexity: O(1)
+        """
+        multiplier = self.multiplier[self.m_class[attacker]][self.m_class[defender]]
+        attack = self.stats(attacker)[0]
+        defense = self.stats(defender)[1]
+        if defense < attack / 2:
+            damage = multiplier * (attack - defense)
+        elif defense < attack:
+            damage = multiplier * (5/8 * attack - defense / 4)
+        else:
+            damage = multiplier * attack / 4
+        self.m_hp[defender] -= math.ceil(damage)
+
+    def _level_up(self, monster: int) -> None:
+        """
+        Same as MonsterBase.level_up
+
+        :complexity: O(1)
+        """
+        prev_max_hp = self.stats(monster)[3]
+        self.m_level[monster] += 1
+        self.m_hp[monster] = self.stats(monster)[3] - (prev_max_hp - self.m_hp[monster])
+
+    def _evolve(self, monster: int) -> int:
+        """
+        Same as MonsterBase.evolve, adding the evolution to the pool.
+
+        :complexity: O(1)
+        """
+        level = self.m_level[monster]
+        evolution = self._new_monster(self.evolution[self.m_class[monster]], self.m_simple[monster], level, level, 0)
+        self.m_hp[evolution] = self.stats(evolution)[3] - (self.stats(monster)[3] - self.m_hp[monster])
+        return evolution
+
+    def _choose_attack(self, t: int, own: int, enemy: int) -> bool:
+        """
+        The default MonsterTeam.choose_action policy. True to attack, False to swap.
+
+        :complexity: O(1)
+        """
+        return (
+            self.stats(own)[2] >= self.stats(enemy)[2]
+            or self.m_hp[own] >= self.m_hp[enemy]
+            or self.t_len[t] == 0
+        )
+
+    ### Turn processing, mirroring Battle.
+
+    def _post_attack(self, b: int, attacked: int, side: int, attacker: int, use_draw_logic: bool = False) -> None:
+        """
+        Same as Battle.process_post_attack
+
+        :complexity: O(1) for FRONT/BACK, O(n) for OPTIMISE
+        """
+        if self.m_hp[attacked] <= 0:
+            t = 2 * b + side
+            if self.t_len[t] == 0:
+                if self.results[b] != RUNNING:
+                    self.results[b] = DRAW
+                else:
+                    self.results[b] = TEAM2 if side == 0 else TEAM1
+            else:
+                self.out[t] = self._retrieve(t)
+
+            if self.m_hp[attacker]:
+                self._level_up(attacker)
+                if self.m_level[attacker] > self.m_init[attacker] and self.evolution[self.m_class[attacker]] != -1:
+                    if not use_draw_logic or self.m_hp[attacker]:
+                        self.out[2 * b + 1 - side] = self._evolve(attacker)
+
+    def _turn(self, b: int) -> None:
+        """
+        Same as Battle.process_turn for two teams using the default policy.
+
+        :complexity: O(1) for FRONT/BACK, O(n) for OPTIMISE
+        """
+        t1 = 2 * b
+        t2 = t1 + 1
+        out = self.out
+        hp = self.m_hp
+
+        if not self._choose_attack(t1, out[t1], out[t2]):
+            temp = out[t1]
+            out[t1] = self._retrieve(t1)
+            self._add(t1, temp)
+        if not self._choose_attack(t2, out[t2], out[t1]):
+            temp = out[t2]
+            out[t2] = self._retrieve(t2)
+            self._add(t2, temp)
+
+        monster1 = out[t1]
+        monster2 = out[t2]
+        attack1 = self._choose_attack(t1, monster1, monster2)
+        attack2 = self._choose_attack(t2, monster2, monster1)
+        if attack1 and attack2:
+            speed1 = self.stats(monster1)[2]
+            speed2 = self.stats(monster2)[2]
+            if speed1 > speed2:
+                self._attack(monster1, monster2)
+                self._post_attack(b, monster2, 1, monster1)
+                if hp[monster2] > 0:
+                    self._attack(monster2, monster1)
+                    self._post_attack(b, monster1, 0, monster2)
+            elif speed1 < speed2:
+                self._attack(monster2, monster1)
+                self._post_attack(b, monster1, 0, monster2)
+                if hp[monster1] > 0:
+                    self._attack(monster1, monster2)
+                    self._post_attack(b, monster2, 1, monster1)
+            else:
+                self._attack(monster1, monster2)
+                self._attack(monster2, monster1)
+                self._post_attack(b, monster1, 0, monster2, True)
+                self._post_attack(b, monster2, 1, monster1, True)
+        elif attack2:
+            self._attack(monster2, monster1)
+            self._post_attack(b, monster1, 0, monster2)
+        elif attack1:
+            self._attack(monster1, monster2)
+            self._post_attack(b, monster2, 1, monster1)
+
+        if hp[monster1] > 0 and hp[monster2] > 0:
+            hp[monster2] -= 1
+            hp[monster1] -= 1
+            self._post_attack(b, monster2, 1, monster1, True)
+            self._post_attack(b, monster1, 0, monster2, True)
+
+    def step(self) -> int:
+        """
+        Advances every running battle by one turn.
+
+        :returns: The number of battles still running
+        :complexity: O(r) for FRONT/BACK teams where r is the number of running battles
+        """
+        results = self.results
+        turns = self.turns
+        still_active = []
+        for b in self.active:
+            self._turn(b)
+            turns[b] += 1
+            if results[b] == RUNNING:
+                still_active.append(b)
+        self.active = still_active
+        return len(still_active)
+
+    def run(self, max_turns: int | None = None) -> ArrayR[Battle.Result | None]:
+        """
+        Steps until every battle has finished, or max_turns steps have been taken.
+
+        :returns: The result of every battle, None for battles still running
+        :complexity: O(t * b) where t is the length of the longest battle and b the number of battles
+        """
+        steps = 0
+        while self.active and (max_turns is None or steps < max_turns):
+            self.step()
+            steps += 1
+        results = ArrayR(len(self))
+        for b in range(len(self)):
+            results[b] = self.result(b)
+        return results